@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""End-to-end load test of the bot against the fake Bot API server.
+
+Starts benchmarks.fake_telegram on a local port and the real bot
+(``python -m src.main``) pointed at it with BOT_API_URL and a fresh
+database. Every simulated chat sends the usual command mix in a loop,
+waiting for each reply before the next message, and the latency from the
+update becoming available to getUpdates until the bot's reply is recorded.
+Pass --no-spawn to load a bot you started yourself with
+``BOT_API_URL=http://127.0.0.1:<port>``.
+
+Usage:
+    python -m benchmarks.bot_load [--chats 1000] [--messages 10] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from aiohttp import web
+
+from benchmarks.dataset import ZipfSampler, make_titles
+from benchmarks.fake_telegram import FakeTelegramServer
+
+# (scenario, weight); "посмотрели" without a rating is answered with rating
+# buttons, and the button press is timed as its own step
+SCENARIOS = [
+    ("хочу посмотреть", 35),
+    ("что смотрим", 25),
+    ("мой список", 15),
+    ("посмотрели + оценка", 15),
+    ("история", 10),
+]
+FIRST_CHAT_ID = 500_000
+
+
+class LoadGenerator:
+    def __init__(self, server: FakeTelegramServer, titles: list[str], seed: int, timeout: float):
+        self.server = server
+        self.titles = titles
+        self.sampler = ZipfSampler(random.Random(seed), len(titles), 1.1)
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.timeouts = 0
+
+    async def _step(self, label: str, waiter: asyncio.Future):
+        started = time.perf_counter()
+        try:
+            reply = await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        self.latencies[label].append((reply.received_at - started) * 1000)
+        return reply
+
+    async def chat(self, chat_id: int, messages: int) -> None:
+        scenarios, weights = zip(*SCENARIOS)
+        name = f"Гость {chat_id}"
+        for _ in range(messages):
+            scenario = self.rng.choices(scenarios, weights)[0]
+            title = self.titles[self.sampler.draw(1)[0]]
+            if scenario == "хочу посмотреть":
+                await self._step(scenario, self.server.send_message(chat_id, f"хочу посмотреть {title}", name))
+            elif scenario == "что смотрим":
+                await self._step(scenario, self.server.send_message(chat_id, "🎲 Что смотрим?", name))
+            elif scenario == "мой список":
+                await self._step(scenario, self.server.send_message(chat_id, "📋 Мой список", name))
+            elif scenario == "история":
+                await self._step(scenario, self.server.send_message(chat_id, "📚 История", name))
+            else:
+                reply = await self._step("посмотрели", self.server.send_message(chat_id, f"посмотрели {title}", name))
+                if reply is not None and reply.reply_markup:
+                    rating = f"rate:{self.rng.randint(1, 10)}"
+                    await self._step("кнопка оценки", self.server.press_button(reply, rating, name))
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def report(generator: LoadGenerator, elapsed: float) -> None:
+    everything = sorted(value for values in generator.latencies.values() for value in values)
+    print(f"{len(everything)} replies in {elapsed:.1f} s: {len(everything) / elapsed:.0f} replies/s, "
+          f"{generator.timeouts} timeouts")
+    print(f"{'step':<22}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    rows = sorted(generator.latencies.items()) + [("всего", everything)]
+    for label, values in rows:
+        if not values:
+            continue
+        values = sorted(values)
+        print(
+            f"{label:<22}{len(values):>8}{statistics.median(values):>10.1f}{percentile(values, 0.9):>10.1f}"
+            f"{percentile(values, 0.99):>10.1f}{values[-1]:>10.1f}"
+        )
+
+
+def spawn_bot(port: int, workers: int, db_path: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "BOT_TOKEN": "42:LOAD",
+        "BOT_MODE": "polling",
+        "BOT_API_URL": f"http://127.0.0.1:{port}",
+        "DB_PATH": str(db_path),
+        "WORKER_PROCESSES": str(workers),
+    }
+    return subprocess.Popen([sys.executable, "-m", "src.main"], env=env, stderr=subprocess.DEVNULL)
+
+
+def stop_bot(bot: subprocess.Popen) -> None:
+    bot.send_signal(signal.SIGINT)
+    try:
+        bot.wait(10)
+    except subprocess.TimeoutExpired:
+        bot.kill()
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = FakeTelegramServer()
+    runner = web.AppRunner(server.create_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = None if args.no_spawn else spawn_bot(args.port, args.workers, Path(tmp) / "load.db")
+        try:
+            print(f"Fake Bot API on http://127.0.0.1:{args.port}, waiting for the bot to poll...")
+            await server.polling.wait()
+            titles = make_titles(random.Random(args.seed), args.titles)
+            generator = LoadGenerator(server, titles, args.seed, args.timeout)
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(generator.chat(FIRST_CHAT_ID + n, args.messages) for n in range(args.chats))
+            )
+            report(generator, time.perf_counter() - started)
+        finally:
+            if bot is not None:
+                await asyncio.to_thread(stop_bot, bot)
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=1000, help="simulated chats sending at the same time")
+    parser.add_argument("--messages", type=int, default=10, help="commands sent by each chat")
+    parser.add_argument("--titles", type=int, default=2000, help="distinct titles to pick from")
+    parser.add_argument("--workers", type=int, default=1, help="WORKER_PROCESSES of the spawned bot")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for a reply")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-spawn", action="store_true", help="do not start the bot, wait for one to poll")
+    asyncio.run(main(parser.parse_args()))
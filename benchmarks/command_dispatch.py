@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Cost of routing a text message to its handler.
+
+Builds two dispatchers with no-op handlers in the bot's router order: one
+with the previous chain of F.text.lower() filters and regexps, one with
+CommandMiddleware + IsCommand. Times feed_update per message type.
+
+Usage:
+    python -m benchmarks.command_dispatch [--rounds 2000]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Update
+
+from src.bot.filters import IsCommand
+from src.bot.middlewares import CommandMiddleware
+from src.utils.commands import (
+    AddMovie,
+    AskMovieTitle,
+    DeleteMovie,
+    MarkWatched,
+    PickMovie,
+    SearchHistory,
+    ShowHistory,
+    ShowMyList,
+    ShowOurList,
+    ShowStats,
+)
+
+MESSAGES = {
+    "хочу посмотреть": "хочу посмотреть Дюна",
+    "мой список": "📋 Мой список",
+    "удали": "удали Барби",
+    "что смотрим": "🎲 Что смотрим?",
+    "посмотрели": "посмотрели Дюна 2, оценка 8/10",
+    "история": "история март 2025",
+    "мы смотрели": "мы смотрели Дюну?",
+    "статистика": "статистика 2025",
+    "unknown": "привет, как дела?",
+}
+
+_RATING_PATTERNS = [
+    re.compile(r"(.+?),\s*(?:оценка\s*)?(\d+)(?:/10)?$", re.IGNORECASE),
+    re.compile(r"(.+?)\s+(?:оценка\s*)?(\d+)/10$", re.IGNORECASE),
+]
+
+
+async def noop(message) -> None:
+    pass
+
+
+async def parse_rating(message) -> None:
+    """The watching handler used to parse the rating itself."""
+    text = message.text[len("посмотрели") :].strip()
+    _RATING_PATTERNS[0].match(text) or _RATING_PATTERNS[1].match(text)
+
+
+def legacy_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+    filters = [
+        F.text.lower().in_({"➕ добавить фильм", "добавить фильм"}),
+        F.text.lower().startswith("хочу посмотреть"),
+        F.text.lower().in_({"мой список", "📋 мой список"}),
+        F.text.lower().in_({"наш список", "💑 наш список"}),
+        F.text.lower().startswith("удали"),
+        F.text.lower().regexp(r"^(🎲\s*)?что смотрим"),
+    ]
+    for magic in filters:
+        dp.message.register(noop, magic)
+    dp.message.register(parse_rating, F.text.lower().startswith("посмотрели"))
+    for pattern in [
+        r"^(?:📚\s*)?история(?:\s+(?P<period>.*))?$",
+        r"^(?:мы\s+)?смотрели\s+(?P<query>.+?)\s*\?*$",
+        r"^(?:📊\s*)?статистика(?:\s+(?P<year>\d{4}))?$",
+    ]:
+        dp.message.register(noop, F.text.regexp(pattern, flags=re.IGNORECASE).as_("match"))
+    dp.message.register(noop)
+    return dp
+
+
+def command_dispatcher() -> Dispatcher:
+    dp = Dispatcher()
+    dp.message.outer_middleware(CommandMiddleware())
+    for kind in [
+        AskMovieTitle,
+        AddMovie,
+        ShowMyList,
+        ShowOurList,
+        DeleteMovie,
+        PickMovie,
+        MarkWatched,
+        ShowHistory,
+        SearchHistory,
+        ShowStats,
+    ]:
+        dp.message.register(noop, IsCommand(kind))
+    dp.message.register(noop)
+    return dp
+
+
+def make_update(bot: Bot, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 1760800000,
+                "chat": {"id": 1001, "type": "private"},
+                "from": {"id": 1001, "is_bot": False, "first_name": "Андрей"},
+                "text": text,
+            },
+        },
+        context={"bot": bot},
+    )
+
+
+async def timed(dp: Dispatcher, bot: Bot, update: Update, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+async def main(rounds: int) -> None:
+    bot = Bot(token="42:TEST")
+    legacy, commands = legacy_dispatcher(), command_dispatcher()
+    print(f"{'message':<20}{'F.text filters':>16}{'parse + IsCommand':>20}")
+    for label, text in MESSAGES.items():
+        update = make_update(bot, text)
+        before = await timed(legacy, bot, update, rounds)
+        after = await timed(commands, bot, update, rounds)
+        print(f"{label:<20}{before:>13.1f} µs{after:>17.1f} µs")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000, help="updates per message type")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Synthetic MovieBot data for benchmarks.
+
+Titles are drawn from a Zipf distribution, so a few popular titles are in
+many wishlists and in the history while the long tail is rarely shared -
+the overlap real groups have. Rows are bulk-inserted; triggers keep the
+derived tables (shared wishlist, monthly rollups, full-text index) in sync
+exactly as with writes made by the bot.
+"""
+
+import itertools
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from src.database import DEFAULT_GROUP_ID, Database
+from src.database.repositories import User
+from src.utils import normalize_title
+
+CONSONANTS = "бвгджзклмнпрстфхцчш"
+VOWELS = "аеиоуыэюя"
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 2
+    titles: int = 5000  # Distinct titles to draw from
+    wishlist_size: int = 50  # Titles per user
+    history_rows: int = 1000
+    zipf_s: float = 1.1  # Skew: higher means more overlap between users
+    history_years: int = 10
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def make_titles(rng: random.Random, count: int) -> list[str]:
+    """Distinct capitalized pseudo-Russian titles, most popular first."""
+    titles = []
+    for rank in range(count):
+        words = [
+            "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        title = " ".join(words)
+        titles.append(f"{title[0].upper()}{title[1:]} {rank}")
+    return titles
+
+
+class ZipfSampler:
+    """Draws indexes 0..n-1 with probability proportional to 1 / (rank ** s)."""
+
+    def __init__(self, rng: random.Random, n: int, s: float):
+        self.rng = rng
+        self.population = range(n)
+        self.cum_weights = list(itertools.accumulate(1 / (rank**s) for rank in range(1, n + 1)))
+
+    def draw(self, k: int) -> list[int]:
+        return self.rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def draw_distinct(self, k: int) -> list[int]:
+        k = min(k, len(self.population))
+        seen: dict[int, None] = {}
+        while len(seen) < k:
+            for index in self.draw(k - len(seen)):
+                seen.setdefault(index, None)
+        return list(seen)
+
+
+def generate(db: Database, spec: DatasetSpec, group_id: int = DEFAULT_GROUP_ID) -> list[User]:
+    """Fill an empty, migrated database and return the created users."""
+    rng = random.Random(spec.seed)
+    titles = make_titles(rng, spec.titles)
+    sampler = ZipfSampler(rng, spec.titles, spec.zipf_s)
+
+    db.executemany(
+        "INSERT INTO users (group_id, telegram_id, display_name) VALUES (?, ?, ?)",
+        [(group_id, 10_000 + n, f"Пользователь {n}") for n in range(spec.users)],
+    )
+    users = [
+        User(id=row["id"], telegram_id=row["telegram_id"], display_name=row["display_name"], group_id=group_id)
+        for row in db.execute(
+            "SELECT id, telegram_id, display_name FROM users WHERE group_id = ? ORDER BY id", (group_id,)
+        )
+    ]
+
+    db.executemany(
+        "INSERT INTO wishlist (group_id, user_id, movie_title, title_key) VALUES (?, ?, ?, ?)",
+        [
+            (group_id, user.id, titles[index], normalize_title(titles[index]))
+            for user in users
+            for index in sampler.draw_distinct(spec.wishlist_size)
+        ],
+    )
+
+    start = date.today() - timedelta(days=365 * spec.history_years)
+    days = 365 * spec.history_years
+    rows = []
+    for index in sampler.draw(spec.history_rows):
+        rows.append(
+            (
+                group_id,
+                titles[index],
+                normalize_title(titles[index]),
+                rng.randint(1, 10),
+                (start + timedelta(days=rng.randrange(days))).isoformat(),
+                rng.choice(users).id,
+            )
+        )
+    db.executemany(
+        """INSERT INTO watch_history
+           (group_id, movie_title, title_key, rating, watched_at, marked_by_user_id)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+    db.commit()
+    return users
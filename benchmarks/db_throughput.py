@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Throughput of the async data layer under different SQLite settings.
+
+Simulates concurrent chats doing a read-heavy mix ("мой список", "наш список",
+"история") with occasional "хочу посмотреть" writes, and reports operations per
+second and latency percentiles for each configuration.
+
+Usage:
+    python -m benchmarks.db_throughput [--ops 4000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.database import (
+    AsyncService,
+    Database,
+    DatabaseSettings,
+    DatabaseWorker,
+    run_migrations,
+)
+from src.database.repositories import HistoryRepository, UserRepository, WishlistRepository
+from src.services import HistoryService, UserService, WishlistService
+
+MODES = {
+    "default": DatabaseSettings(),
+    "wal": DatabaseSettings(journal_mode="WAL", synchronous="NORMAL"),
+    "wal+readers": DatabaseSettings(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=64 * 1024 * 1024,
+        cache_size=-16000,
+        busy_timeout=5000,
+        read_pool_size=4,
+    ),
+}
+
+WRITE_SHARE = 0.2
+USERS = 8
+SEED_TITLES = 200
+
+
+async def run_mode(name: str, settings: DatabaseSettings, ops: int, concurrency: int, workdir: Path) -> dict:
+    db = Database(str(workdir / f"{name}.db"), settings)
+    worker = DatabaseWorker(db)
+    await worker.run(run_migrations, db)
+
+    user_service = UserService(UserRepository(db))
+    wishlist_service = AsyncService(WishlistService(WishlistRepository(db)), worker)
+    history_service = AsyncService(HistoryService(HistoryRepository(db)), worker)
+
+    users = [await worker.run(lambda i=i: user_service.register(5000 + i, f"User {i}").user) for i in range(USERS)]
+    for i in range(SEED_TITLES):
+        await wishlist_service.add_movie(users[i % USERS], f"Seed movie {i}")
+
+    rng = random.Random(42)
+    latencies: list[float] = []
+    counter = iter(range(ops))
+
+    async def chat():
+        for n in counter:
+            user = rng.choice(users)
+            started = time.perf_counter()
+            if rng.random() < WRITE_SHARE:
+                await wishlist_service.add_movie(user, f"Movie {n}")
+            else:
+                op = rng.randrange(3)
+                if op == 0:
+                    await wishlist_service.get_user_wishlist(user)
+                elif op == 1:
+                    await wishlist_service.get_intersection(user.group_id)
+                else:
+                    await history_service.get_history(user.group_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(chat() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await worker.close()
+
+    latencies.sort()
+    return {
+        "mode": name,
+        "ops_per_sec": ops / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(ops: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            await run_mode(name, settings, ops, concurrency, Path(tmp))
+            for name, settings in MODES.items()
+        ]
+
+    print(f"{'mode':<14}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['ops_per_sec']:>10.0f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=4000, help="total operations per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent chats")
+    args = parser.parse_args()
+    asyncio.run(main(args.ops, args.concurrency))
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the Telegram Bot API.
+
+Implements the methods the bot uses - getMe, deleteWebhook, getUpdates,
+sendMessage, sendDocument, editMessageText and answerCallbackQuery - for
+any token.
+Tests and the load generator push updates with ``send_message`` /
+``press_button`` and await the bot's first reply to that chat. Start the bot
+with ``BOT_API_URL=http://127.0.0.1:<port>`` to make it talk to this server.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from aiohttp import web
+
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "MovieBot", "username": "movie_test_bot"}
+
+
+@dataclass
+class BotCall:
+    """A Bot API request made by the bot."""
+
+    method: str
+    params: dict[str, Any]
+    received_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.params.get("text")
+
+    @property
+    def reply_markup(self) -> Optional[dict]:
+        markup = self.params.get("reply_markup")
+        return json.loads(markup) if isinstance(markup, str) else markup
+
+
+class FakeTelegramServer:
+    """In-memory Bot API: an update queue for getUpdates and a log of replies.
+
+    Each chat may wait for one reply at a time: the first sendMessage,
+    sendDocument, editMessageText or answerCallbackQuery that refers to the
+    chat after an update was pushed completes the awaitable returned for
+    that update. An uploaded document is kept as bytes in the call params.
+    """
+
+    def __init__(self, max_updates: int = 100):
+        self.max_updates = max_updates
+        self.calls: dict[str, int] = defaultdict(int)  # method -> count
+        self._updates: deque[dict] = deque()
+        self._new_updates = asyncio.Event()
+        self._update_ids = itertools.count(1)
+        self._message_ids: dict[int, itertools.count] = defaultdict(lambda: itertools.count(1))
+        self._callback_ids = itertools.count(1)
+        self._callback_chats: dict[str, int] = {}
+        self._waiters: dict[int, asyncio.Future] = {}
+        self.polling = asyncio.Event()  # Set on the first getUpdates
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle_method)
+        return app
+
+    # Client side: what a Telegram user does
+
+    def send_message(self, chat_id: int, text: str, first_name: str = "Гость") -> "asyncio.Future[BotCall]":
+        """Deliver a text message from user chat_id (a private chat)."""
+        return self._push(
+            chat_id,
+            {
+                "message": {
+                    "message_id": next(self._message_ids[chat_id]),
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private", "first_name": first_name},
+                    "from": {"id": chat_id, "is_bot": False, "first_name": first_name},
+                    "text": text,
+                }
+            },
+        )
+
+    def press_button(self, reply: BotCall, data: str, first_name: str = "Гость") -> "asyncio.Future[BotCall]":
+        """Press an inline button of a message the bot sent."""
+        message = reply.params["result"]
+        chat_id = message["chat"]["id"]
+        callback_id = str(next(self._callback_ids))
+        self._callback_chats[callback_id] = chat_id
+        return self._push(
+            chat_id,
+            {
+                "callback_query": {
+                    "id": callback_id,
+                    "from": {"id": chat_id, "is_bot": False, "first_name": first_name},
+                    "chat_instance": str(chat_id),
+                    "message": message,
+                    "data": data,
+                }
+            },
+        )
+
+    def _push(self, chat_id: int, update: dict) -> "asyncio.Future[BotCall]":
+        previous = self._waiters.get(chat_id)
+        if previous is not None and not previous.done():
+            raise RuntimeError(f"Chat {chat_id} is still waiting for a reply")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id] = waiter
+        update["update_id"] = next(self._update_ids)
+        self._updates.append(update)
+        self._new_updates.set()
+        return waiter
+
+    # Server side: Bot API methods
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        handler = getattr(self, f"_{method}", None)
+        if handler is None:
+            return web.json_response(
+                {"ok": False, "error_code": 404, "description": "Not Found: method not found"}, status=404
+            )
+        self.calls[method] += 1
+        return web.json_response({"ok": True, "result": await handler(params)})
+
+    async def _getMe(self, params: dict) -> dict:
+        return BOT_USER
+
+    async def _deleteWebhook(self, params: dict) -> bool:
+        return True
+
+    async def _getUpdates(self, params: dict) -> list[dict]:
+        self.polling.set()
+        offset = int(params.get("offset") or 0)
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                return []
+        limit = min(int(params.get("limit") or self.max_updates), self.max_updates)
+        return list(itertools.islice(self._updates, limit))
+
+    async def _sendMessage(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        message = {
+            "message_id": next(self._message_ids[chat_id]),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if "reply_markup" in params:
+            message["reply_markup"] = json.loads(params["reply_markup"])
+        self._reply(chat_id, "sendMessage", params, message)
+        return message
+
+    async def _sendDocument(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        # aiogram posts "attach://<field>" and the file in that multipart field
+        document = params.pop(params["document"].removeprefix("attach://"))
+        content = document.file.read()
+        message = {
+            "message_id": next(self._message_ids[chat_id]),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "caption": params.get("caption", ""),
+            "document": {
+                "file_id": f"doc-{chat_id}-{self.calls['sendDocument']}",
+                "file_unique_id": f"doc-{chat_id}-{self.calls['sendDocument']}",
+                "file_name": document.filename,
+                "file_size": len(content),
+            },
+        }
+        self._reply(chat_id, "sendDocument", {**params, "document": content}, message)
+        return message
+
+    async def _editMessageText(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        message = {
+            "message_id": int(params["message_id"]),
+            "date": int(time.time()),
+            "edit_date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        self._reply(chat_id, "editMessageText", params, message)
+        return message
+
+    async def _answerCallbackQuery(self, params: dict) -> bool:
+        chat_id = self._callback_chats.pop(params["callback_query_id"], None)
+        if chat_id is not None:
+            self._reply(chat_id, "answerCallbackQuery", params, True)
+        return True
+
+    def _reply(self, chat_id: int, method: str, params: dict, result: Any) -> None:
+        waiter = self._waiters.pop(chat_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(BotCall(method, {**params, "result": result}))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Lookup time of the typo-tolerant title index.
+
+Builds a TrigramIndex over generated titles and times ``closest`` for
+titles with one or two typos and for unknown titles, against a linear
+scan with edit_distance.
+
+Usage:
+    python -m benchmarks.fuzzy_titles [--titles 100000] [--queries 2000]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.utils import TrigramIndex, edit_distance
+from src.utils.fuzzy import max_typos
+
+CONSONANTS = "бвгджзклмнпрстфхцчшщ"
+VOWELS = "аеиоуыэюя"
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4)))
+
+
+def make_title(rng: random.Random) -> str:
+    return " ".join(make_word(rng) for _ in range(rng.randint(1, 3)))
+
+
+def add_typo(rng: random.Random, title: str) -> str:
+    position = rng.randrange(len(title))
+    kind = rng.randrange(3)
+    if kind == 0:  # Missing letter
+        return title[:position] + title[position + 1 :]
+    letter = rng.choice("абвгдежзиклмнопрстуфхцчшэюя")
+    if kind == 1:  # Wrong letter
+        return title[:position] + letter + title[position + 1 :]
+    return title[:position] + letter + title[position:]  # Extra letter
+
+
+def linear_closest(titles: list[str], query: str) -> None:
+    limit = max_typos(query)
+    min((edit_distance(query, title, limit), title) for title in titles)
+
+
+def timings(func, queries: list[str]) -> list[float]:
+    result = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        result.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def report(label: str, values: list[float]) -> None:
+    values = sorted(values)
+    p99 = values[int(len(values) * 0.99) - 1]
+    print(f"{label:<24}{statistics.mean(values):>9.3f} ms mean{p99:>9.3f} ms p99")
+
+
+def main(count: int, queries: int) -> None:
+    rng = random.Random(42)
+    titles = list({make_title(rng) for _ in range(count)})
+    index = TrigramIndex()
+    started = time.perf_counter()
+    for title in titles:
+        index.add(title)
+    print(f"{len(titles)} titles, index built in {time.perf_counter() - started:.2f} s")
+
+    typos = [add_typo(rng, rng.choice(titles)) for _ in range(queries)]
+    misses = [make_title(rng) for _ in range(queries)]
+    found = sum(index.closest(query) is not None for query in typos)
+    report("one typo", timings(index.closest, typos))
+    report("two typos", timings(index.closest, [add_typo(rng, q) for q in typos]))
+    report("unknown title", timings(index.closest, misses))
+    report("linear scan", timings(lambda q: linear_closest(titles, q), typos[:5]))
+    print(f"matched {found}/{queries} titles with one typo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=100_000, help="titles in the index")
+    parser.add_argument("--queries", type=int, default=2000, help="lookups per case")
+    args = parser.parse_args()
+    main(args.titles, args.queries)
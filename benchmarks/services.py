@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Service-level benchmark suite with a JSON baseline.
+
+For every history size a fresh SQLite file is filled by benchmarks.dataset
+and each service method is timed on it. ``run`` writes the medians and
+95th percentiles to JSON; ``compare`` flags operations that got slower than
+a baseline by more than a threshold and exits with status 1 if any did.
+
+Usage:
+    python -m benchmarks.services run [--history 100 10000 1000000] [--out results.json]
+    python -m benchmarks.services compare baseline.json results.json [--threshold 0.25]
+"""
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from src.database import Database, run_migrations
+from src.database.repositories import (
+    HistoryRepository,
+    SelectionRepository,
+    StateRepository,
+    TitleRepository,
+    WishlistRepository,
+)
+from src.services import HistoryService, SelectionService, StatsService, WatchService, WishlistService
+
+from benchmarks.dataset import DatasetSpec, generate
+
+HISTORY_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+# Differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+
+def build_operations(db: Database, spec: DatasetSpec) -> dict[str, Callable[[int], object]]:
+    """Service calls to time; each gets the repetition number."""
+    users = generate(db, spec)
+    user, other = users[0], users[-1]
+    group_id = user.group_id
+
+    wishlist_repo = WishlistRepository(db)
+    history_repo = HistoryRepository(db)
+    title_repo = TitleRepository(db)
+    wishlist = WishlistService(wishlist_repo, title_repo)
+    watch = WatchService(wishlist_repo, history_repo, title_repo)
+    selection = SelectionService(SelectionRepository(db), StateRepository(db))
+    history = HistoryService(history_repo)
+    stats = StatsService(history_repo)
+    first_page = history.get_history(group_id)
+    search_word = first_page.months[0].movies[0].movie_title.split()[0][:4] if first_page.months else "а"
+
+    def mark_watched(n: int):
+        titles = wishlist.get_user_wishlist(other)
+        return watch.mark_watched(other, titles[n % len(titles)] if titles else f"Просмотр {n}", 8)
+
+    return {
+        # New titles every call; the digits keep them from matching each other
+        "add_movie_suggest": lambda n: wishlist.add_movie(user, f"Премьера {n}"),
+        "add_movie": lambda n: wishlist.add_movie(user, f"Новинка {n}", suggest=False),
+        "delete_movie": lambda n: wishlist.delete_movie(user, f"Новинка {n}"),
+        "get_user_wishlist": lambda n: wishlist.get_user_wishlist(user),
+        "get_intersection": lambda n: wishlist.get_intersection(group_id),
+        "pick_movie": lambda n: selection.pick_movie(user),
+        "mark_watched": mark_watched,
+        "get_history": lambda n: history.get_history(group_id),
+        "get_history_next_page": lambda n: history.get_history(group_id, older_than=first_page.older),
+        "search_history": lambda n: history.search(group_id, search_word),
+        "get_stats": lambda n: stats.get_stats(group_id),
+    }
+
+
+def measure(func: Callable[[int], object], repeat: int) -> dict:
+    func(-1)  # Warm caches as a running bot would have them
+    samples = []
+    for n in range(repeat):
+        started = time.perf_counter()
+        func(n)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)], 4),
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    base = DatasetSpec(
+        users=args.users, titles=args.titles, wishlist_size=args.wishlist_size, zipf_s=args.zipf_s
+    )
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.history:
+            db = Database(str(Path(tmp) / f"history-{size}.db"))
+            run_migrations(db)
+            started = time.perf_counter()
+            operations = build_operations(db, replace(base, history_rows=size))
+            print(f"history={size}: generated in {time.perf_counter() - started:.1f} s")
+            results[str(size)] = {}
+            for name, func in operations.items():
+                timing = measure(func, args.repeat)
+                results[str(size)][name] = timing
+                print(f"  {name:<24}{timing['median_ms']:>10.3f} ms{timing['p95_ms']:>10.3f} ms p95")
+            db.close()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "spec": base.as_dict(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", "utf-8")
+    print(f"Saved to {args.out}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text("utf-8"))["results"]
+    current = json.loads(Path(args.current).read_text("utf-8"))["results"]
+    regressions = 0
+    print(f"{'history':>8}  {'operation':<24}{'baseline':>12}{'current':>12}{'change':>9}")
+    for size, operations in current.items():
+        for name, timing in operations.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            old, new = before["median_ms"], timing["median_ms"]
+            change = (new - old) / old if old else 0.0
+            slower = change > args.threshold and new - old > NOISE_FLOOR_MS
+            regressions += slower
+            flag = "  REGRESSION" if slower else ""
+            print(f"{size:>8}  {name:<24}{old:>9.3f} ms{new:>9.3f} ms{change:>+8.0%}{flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time service methods and save JSON")
+    run_parser.add_argument("--history", type=int, nargs="+", default=HISTORY_SIZES, help="history sizes")
+    run_parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    run_parser.add_argument("--titles", type=int, default=DatasetSpec.titles, help="distinct titles")
+    run_parser.add_argument("--wishlist-size", type=int, default=DatasetSpec.wishlist_size)
+    run_parser.add_argument("--zipf-s", type=float, default=DatasetSpec.zipf_s, help="title popularity skew")
+    run_parser.add_argument("--repeat", type=int, default=50, help="calls per operation")
+    run_parser.add_argument("--out", default="benchmark-results.json")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare results with a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
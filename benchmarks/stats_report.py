@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Time of the "статистика" report over a large watch history.
+
+Compares aggregating HistoryItem objects loaded with get_all() against the
+StatsService over the monthly rollups (first call, repeated call, one new row).
+
+Usage:
+    python -m benchmarks.stats_report [--rows 300000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.database import Database, run_migrations
+from src.database.repositories import HistoryRepository, UserRepository
+from src.services import StatsService
+
+
+def seed(db: Database, rows: int) -> None:
+    user = UserRepository(db).create(1001, "Андрей")
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    db.executemany(
+        """INSERT INTO watch_history
+           (group_id, movie_title, title_key, rating, watched_at, marked_by_user_id)
+           VALUES (0, ?, ?, ?, ?, ?)""",
+        [
+            (
+                f"Фильм {n % 5000}",
+                f"фильм {n % 5000}",
+                rng.randint(1, 10),
+                (start + timedelta(days=rng.randrange(4000))).isoformat(),
+                user.id,
+            )
+            for n in range(rows)
+        ],
+    )
+    db.commit()
+
+
+def dataclass_report(history: HistoryRepository) -> dict:
+    """Baseline: the same aggregation over HistoryItem objects."""
+    years: dict[int, list] = defaultdict(lambda: [0, 0, None])
+    for item in history.get_all():
+        acc = years[item.watched_at.year]
+        acc[0] += 1
+        acc[1] += item.rating
+        if acc[2] is None or (item.rating, item.watched_at) >= (acc[2].rating, acc[2].watched_at):
+            acc[2] = item
+    return years
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def main(rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "stats.db"))
+        run_migrations(db)
+        seed(db, rows)
+        history = HistoryRepository(db)
+        service = StatsService(history)
+
+        print(f"{rows} history rows")
+        print(f"{'HistoryItem objects':<28}{timed(lambda: dataclass_report(history)):>10.1f} ms")
+        print(f"{'rollups, first call':<28}{timed(service.get_stats):>10.1f} ms")
+        print(f"{'rollups, repeated':<28}{timed(service.get_stats):>10.1f} ms")
+        history.add("Новый фильм", 9, date(2026, 1, 1), user_id=1)
+        print(f"{'rollups, one insert':<28}{timed(service.get_stats):>10.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300_000, help="history rows to generate")
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Application wiring shared by the single-process and worker modes."""
+
+from typing import Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+
+from src.config import (
+    BOT_TOKEN,
+    BOT_API_URL,
+    DB_PATH,
+    DB_COMMIT_DELAY_MS,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_MMAP_SIZE,
+    DB_CACHE_SIZE,
+    DB_BUSY_TIMEOUT_MS,
+    DB_READ_POOL_SIZE,
+    DB_SLOW_QUERY_MS,
+    DB_QUERY_REPEAT_THRESHOLD,
+    USER_CACHE_SIZE,
+    RENDER_CACHE_SIZE,
+    RENDER_CACHE_MAX_BYTES,
+)
+from src.database import (
+    Database,
+    DatabaseSettings,
+    QueryTracer,
+    DatabaseWorker,
+    AsyncService,
+)
+from src.database.repositories import (
+    UserRepository,
+    WishlistRepository,
+    HistoryRepository,
+    StateRepository,
+    SelectionRepository,
+    TitleRepository,
+)
+from src.services import (
+    UserService,
+    WishlistService,
+    SelectionService,
+    WatchService,
+    HistoryService,
+    StatsService,
+    ExportService,
+)
+from src.bot.handlers import (
+    commands_router,
+    wishlist_router,
+    selection_router,
+    watching_router,
+    history_router,
+    stats_router,
+    export_router,
+    fallback_router,
+)
+from src.bot.conversation import ConversationStore
+from src.bot.metrics import BotMetrics
+from src.bot.render_cache import RenderCache
+from src.bot.middlewares import (
+    CommandMiddleware,
+    HandlerNameMiddleware,
+    IdentityMiddleware,
+    MetricsMiddleware,
+)
+
+
+def create_bot(token: str = BOT_TOKEN, api_url: str = BOT_API_URL) -> Bot:
+    """Create the Telegram bot client, talking to api_url if it is set."""
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api_url)) if api_url else None
+    return Bot(token=token, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+
+def create_database(instrumented: bool = False) -> Database:
+    """Create the database with SQLite settings from config.
+
+    An instrumented database counts SQL work per update for BotMetrics.
+    Setting DB_SLOW_QUERY_MS turns on statement tracing.
+    """
+    tracer = None
+    if DB_SLOW_QUERY_MS is not None:
+        tracer = QueryTracer(slow_ms=DB_SLOW_QUERY_MS, repeat_threshold=DB_QUERY_REPEAT_THRESHOLD)
+    return Database(
+        DB_PATH,
+        DatabaseSettings(
+            journal_mode=DB_JOURNAL_MODE,
+            synchronous=DB_SYNCHRONOUS,
+            mmap_size=DB_MMAP_SIZE,
+            cache_size=DB_CACHE_SIZE,
+            busy_timeout=DB_BUSY_TIMEOUT_MS,
+            read_pool_size=DB_READ_POOL_SIZE,
+        ),
+        instrumented=instrumented,
+        tracer=tracer,
+    )
+
+
+def create_db_worker(instrumented: bool = False) -> DatabaseWorker:
+    """Create the database and its worker thread with settings from config.
+
+    Used by main() and by every supervisor worker process alike.
+    """
+    return DatabaseWorker(create_database(instrumented), commit_delay=DB_COMMIT_DELAY_MS / 1000)
+
+
+def create_dispatcher(
+    db_worker: Optional[DatabaseWorker] = None,
+    conversation: Optional[ConversationStore] = None,
+    metrics: Optional[BotMetrics] = None,
+) -> Dispatcher:
+    """Create a dispatcher with all routers.
+
+    Without a database worker only the routers are set up, which is enough
+    to resolve the used update types. With ``metrics`` every update is timed
+    and its SQL work counted under the name of the handler that took it.
+    """
+    dp = Dispatcher()
+
+    # Register routers (order matters - fallback should be last)
+    dp.include_router(commands_router)
+    dp.include_router(wishlist_router)
+    dp.include_router(selection_router)
+    dp.include_router(watching_router)
+    dp.include_router(history_router)
+    dp.include_router(stats_router)
+    dp.include_router(export_router)
+    dp.include_router(fallback_router)
+    # Classify message text once; handlers select on the result with IsCommand
+    dp.message.outer_middleware(CommandMiddleware())
+
+    if db_worker is None:
+        return dp
+    db = db_worker.db
+
+    # Create repositories
+    user_repo = UserRepository(db)
+    wishlist_repo = WishlistRepository(db)
+    history_repo = HistoryRepository(db)
+    state_repo = StateRepository(db)
+    selection_repo = SelectionRepository(db)
+    title_repo = TitleRepository(db)
+
+    # Create services
+    user_service = UserService(user_repo)
+    wishlist_service = WishlistService(wishlist_repo, title_repo)
+    selection_service = SelectionService(selection_repo, state_repo)
+    watch_service = WatchService(wishlist_repo, history_repo, title_repo)
+    history_service = HistoryService(history_repo)
+    stats_service = StatsService(history_repo)
+    export_service = ExportService(history_repo, wishlist_repo)
+
+    # Inject dependencies (all database work runs on the DB worker thread)
+    dp["user_service"] = AsyncService(user_service, db_worker)
+    dp["wishlist_service"] = AsyncService(wishlist_service, db_worker)
+    dp["selection_service"] = AsyncService(selection_service, db_worker)
+    dp["watch_service"] = AsyncService(watch_service, db_worker)
+    dp["history_service"] = AsyncService(history_service, db_worker)
+    dp["stats_service"] = AsyncService(stats_service, db_worker)
+    dp["export_service"] = AsyncService(export_service, db_worker)
+
+    # Dialog state lives in memory, not in bot_state
+    dp["conversation"] = conversation or ConversationStore()
+    # List replies are rebuilt only after the data they show has changed
+    dp["render_cache"] = RenderCache(db.versions, RENDER_CACHE_SIZE, RENDER_CACHE_MAX_BYTES)
+
+    if metrics is not None or db.tracer is not None:
+        # Outermost, so the time and queries of the commit are included
+        dp.update.outer_middleware(MetricsMiddleware(metrics, db.tracer))
+        dp.message.middleware(HandlerNameMiddleware())
+        dp.callback_query.middleware(HandlerNameMiddleware())
+    # Resolve the sender once per update and pass it to handlers as `user`
+    identity = IdentityMiddleware(dp["user_service"], USER_CACHE_SIZE)
+    dp.update.outer_middleware(identity)
+
+    if metrics is not None:
+        metrics.registry.track_cache("users", identity.cache.stats)
+        metrics.registry.track_cache("wishlist_titles", wishlist_repo.cache_stats)
+        metrics.registry.track_cache("fuzzy_titles", title_repo.cache_stats)
+        metrics.registry.track_cache("rendered_lists", dp["render_cache"].stats)
+    return dp
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Conversation store - short-lived dialog state kept in memory."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.database.repositories import User
+
+logger = logging.getLogger(__name__)
+
+# (group_id, telegram_id, slot)
+Key = tuple[int, int, str]
+
+
+class ConversationStore:
+    """Per-user dialog state with a time-to-live.
+
+    Entries expire ``ttl`` seconds after they were set; a background task
+    started with ``start()`` sweeps expired ones. If ``path`` is given, the
+    store is written there lazily by the sweeper (and on ``stop()``) and
+    loaded back on ``start()``, so a restart does not lose open dialogs.
+    """
+
+    AWAITING_MOVIE = "awaiting_movie"  # "Добавить фильм" pressed, title expected
+    PENDING_MOVIE = "pending_movie"  # Title waiting for a rating button
+    SUGGESTED_MOVIE = "suggested_movie"  # [typed title, suggestion] waiting for a choice
+    SUGGESTED_WATCH = "suggested_watch"  # [typed title, suggestion, rating] waiting for a choice
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        sweep_interval: float = 60,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._entries: dict[Key, tuple[str, float]] = {}  # key -> (value, expires_at)
+        self._dirty = False
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _key(user: User, slot: str) -> Key:
+        return (user.group_id, user.telegram_id, slot)
+
+    def get(self, user: User, slot: str) -> Optional[str]:
+        """Get user's value for slot, None if missing or expired."""
+        entry = self._entries.get(self._key(user, slot))
+        if entry is None or entry[1] <= self._clock():
+            return None
+        return entry[0]
+
+    def set(self, user: User, slot: str, value: str) -> None:
+        """Set user's value for slot, (re)starting its TTL."""
+        self._entries[self._key(user, slot)] = (value, self._clock() + self.ttl)
+        self._dirty = True
+
+    def pop(self, user: User, slot: str) -> Optional[str]:
+        """Remove user's slot and return its value, None if missing or expired."""
+        value = self.get(user, slot)
+        if self._entries.pop(self._key(user, slot), None) is not None:
+            self._dirty = True
+        return value
+
+    def sweep(self) -> int:
+        """Drop expired entries. Returns number of removed entries."""
+        now = self._clock()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._dirty = True
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Restore unexpired entries from the snapshot file."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            rows = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable conversation snapshot %s", self.path)
+            return
+        now = self._clock()
+        for group_id, telegram_id, slot, value, expires_at in rows:
+            if expires_at > now:
+                self._entries[(group_id, telegram_id, slot)] = (value, expires_at)
+
+    def _snapshot(self) -> Optional[list[list]]:
+        """Take rows to save, None if the file is up to date."""
+        if self.path is None or not self._dirty:
+            return None
+        self._dirty = False
+        return [[*key, value, expires_at] for key, (value, expires_at) in self._entries.items()]
+
+    def _write(self, rows: list[list]) -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def save(self) -> None:
+        """Write the snapshot file if anything changed since the last save."""
+        rows = self._snapshot()
+        if rows is not None:
+            self._write(rows)
+
+    async def start(self) -> None:
+        """Load the snapshot and start the background sweeper."""
+        self.load()
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def stop(self) -> None:
+        """Stop the sweeper and write a final snapshot."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        self.sweep()
+        self.save()
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep()
+            rows = self._snapshot()
+            if rows is None:
+                continue
+            try:
+                # Rows are taken on the loop, only the file write runs in a thread
+                await asyncio.to_thread(self._write, rows)
+            except OSError:
+                self._dirty = True
+                logger.exception("Failed to save conversation snapshot")
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Handler filters."""
+
+from typing import Optional
+
+from aiogram.filters import BaseFilter
+from aiogram.types import Message
+
+from src.utils.commands import Command
+
+
+class IsCommand(BaseFilter):
+    """Passes messages parsed by CommandMiddleware into one of the given commands.
+
+    The handler gets the command object as ``text_command``.
+    """
+
+    def __init__(self, *kinds: type):
+        self.kinds = kinds
+
+    async def __call__(
+        self, message: Message, text_command: Optional[Command] = None
+    ) -> bool:
+        return isinstance(text_command, self.kinds)
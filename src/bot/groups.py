@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Mapping of Telegram chats to data partitions (groups)."""
+
+import logging
+
+from aiogram.types import Chat
+
+from src.config import LEGACY_GROUP_CHAT_ID
+from src.database import DEFAULT_GROUP_ID, Database
+from src.database.repositories import HistoryRepository, WishlistRepository
+
+logger = logging.getLogger(__name__)
+
+
+def chat_group_id(chat: Chat) -> int:
+    """Get group id for a chat.
+
+    Every chat is its own partition: a group chat is one family, a private
+    chat keeps one person's lists apart from everybody else using the bot
+    one-on-one. Telegram chat ids are never 0; the default group holds data
+    recorded before chats were partitioned and is served to
+    LEGACY_GROUP_CHAT_ID if that is set.
+    """
+    if chat.id == LEGACY_GROUP_CHAT_ID:
+        return DEFAULT_GROUP_ID
+    return chat.id
+
+
+def warn_if_legacy_group_unassigned(db: Database) -> None:
+    """Log a warning if data recorded before chats were partitioned is unreachable."""
+    if LEGACY_GROUP_CHAT_ID is not None:
+        return
+    if HistoryRepository(db).get_total_count(DEFAULT_GROUP_ID) or WishlistRepository(db).get_all_movies(
+        DEFAULT_GROUP_ID
+    ):
+        logger.warning(
+            "Lists and history recorded before per-chat groups are not shown in any chat; "
+            "set LEGACY_GROUP_CHAT_ID to the chat that should keep them"
+        )
@@ -6,6 +6,8 @@ from .wishlist import router as wishlist_router
 from .selection import router as selection_router
 from .watching import router as watching_router
 from .history import router as history_router
+from .stats import router as stats_router
+from .export import router as export_router
 from .fallback import router as fallback_router
 
 __all__ = [
@@ -14,5 +16,7 @@ __all__ = [
     "selection_router",
     "watching_router",
     "history_router",
+    "stats_router",
+    "export_router",
     "fallback_router",
 ]
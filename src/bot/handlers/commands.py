@@ -7,20 +7,17 @@ from aiogram.types import Message
 
 from src.bot.messages import Messages
 from src.bot.keyboards import main_keyboard
-from src.services import UserService
 
 router = Router()
 
 
 @router.message(Command("start"))
-async def cmd_start(message: Message, user_service: UserService):
-    """Handle /start command - register user and send welcome."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
+async def cmd_start(message: Message):
+    """Handle /start command - user is registered by IdentityMiddleware."""
     await message.answer(Messages.WELCOME, reply_markup=main_keyboard())
 
 
 @router.message(Command("help"))
-async def cmd_help(message: Message, user_service: UserService):
+async def cmd_help(message: Message):
     """Handle /help command - send help message."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
     await message.answer(Messages.HELP)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Export handler - 'экспорт [история|списки] [csv|json]'."""
+
+import asyncio
+from typing import IO, AsyncGenerator
+
+from aiogram import Bot, Router
+from aiogram.types import InputFile, Message
+
+from src.bot.filters import IsCommand
+from src.bot.messages import Messages
+from src.services import ExportService
+from src.database.repositories import User
+from src.database import AsyncService
+from src.utils.commands import ExportData
+
+router = Router()
+
+
+class SpooledInputFile(InputFile):
+    """Upload from an open binary file, reading chunks off the event loop."""
+
+    def __init__(self, file: IO[bytes], filename: str):
+        super().__init__(filename=filename)
+        self.file = file
+
+    async def read(self, bot: Bot) -> AsyncGenerator[bytes, None]:
+        # A spooled file that rolled over to disk reads with blocking I/O
+        while chunk := await asyncio.to_thread(self.file.read, self.chunk_size):
+            yield chunk
+
+
+@router.message(IsCommand(ExportData))
+async def export_data(
+    message: Message,
+    text_command: ExportData,
+    user: User,
+    export_service: AsyncService[ExportService],
+):
+    """Handle 'экспорт' - send history or wishlists of the group as a file."""
+    export = await export_service.export(text_command.what, text_command.fmt, user.group_id)
+    try:
+        if not export.rows:
+            await message.answer(Messages.EMPTY_EXPORT)
+            return
+        await message.answer_document(
+            SpooledInputFile(export.file, export.filename),
+            caption=Messages.export_caption(text_command.what, export.rows),
+        )
+    finally:
+        export.file.close()
@@ -4,9 +4,12 @@
 from aiogram import Router
 from aiogram.types import Message
 
+from src.bot.conversation import ConversationStore
+from src.bot.handlers.wishlist import answer_add_result
 from src.bot.messages import Messages
-from src.services import UserService, WishlistService
-from src.database.repositories import StateRepository
+from src.services import WishlistService
+from src.database.repositories import User
+from src.database import AsyncService
 
 router = Router()
 
@@ -14,24 +17,17 @@ router = Router()
 @router.message()
 async def unknown_command(
     message: Message,
-    user_service: UserService,
-    wishlist_service: WishlistService,
-    state_repo: StateRepository,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+    conversation: ConversationStore,
 ):
     """Handle unknown messages or awaited input."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-
     # Check if user is awaiting movie input
-    awaiting_key = f"awaiting_movie:{message.from_user.id}"
-    if state_repo.get(awaiting_key):
-        state_repo.delete(awaiting_key)
+    if conversation.pop(user, ConversationStore.AWAITING_MOVIE):
         movie_name = message.text.strip()
         if movie_name:
-            result = wishlist_service.add_movie(message.from_user.id, movie_name)
-            if result.already_exists:
-                await message.answer(Messages.movie_already_exists(result.movie_title))
-            else:
-                await message.answer(Messages.movie_added(result.movie_title))
+            result = await wishlist_service.add_movie(user, movie_name)
+            await answer_add_result(message, user, result, conversation)
             return
 
     await message.answer(Messages.UNKNOWN_COMMAND)
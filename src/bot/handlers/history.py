@@ -1,40 +1,103 @@
 # -*- coding: utf-8 -*-
-"""History handler - 'история'"""
+"""History handler - 'история' + page navigation callbacks, 'мы смотрели ...?'"""
+
+from datetime import date
 
 from aiogram import Router, F
-from aiogram.types import Message
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
+from src.bot.filters import IsCommand
 from src.bot.messages import Messages
-from src.services import UserService, HistoryService
+from src.bot.keyboards import history_keyboard
+from src.services import HistoryService
+from src.services.history_service import HistoryResult
+from src.database.repositories import HistoryCursor, User
+from src.database import AsyncService
+from src.utils.commands import SearchHistory, ShowHistory
 
 router = Router()
 
 
-@router.message(F.text.lower().in_({"история", "📚 история"}))
+def render_history(result: HistoryResult) -> tuple[str, InlineKeyboardMarkup | None]:
+    """Render a history page and its navigation buttons."""
+    if result.is_empty:
+        return Messages.EMPTY_HISTORY, None
+    if result.total_count == 0:
+        return Messages.empty_history_period(result.period.label), None
+
+    lines = ["📚 История просмотров:"]
+    for month in result.months:
+        lines.append("")
+        lines.append(f"{month.month_name}:")
+        for movie in month.movies:
+            date_str = HistoryService.format_date(movie.watched_at)
+            lines.append(
+                f"• {movie.movie_title} — {movie.rating}/10 ({date_str})"
+            )
+
+    lines.append("")
+    lines.append(
+        f"Всего за {result.period.label}: {result.total_count} фильма, "
+        f"средняя оценка: {result.average_rating}"
+    )
+
+    def position(cursor: HistoryCursor | None) -> tuple[int, int] | None:
+        return (cursor.watched_at.toordinal(), cursor.id) if cursor else None
+
+    keyboard = history_keyboard(result.period.code, position(result.newer), position(result.older))
+    return "\n".join(lines), keyboard
+
+
+@router.message(IsCommand(ShowHistory))
 async def show_history(
-    message: Message, user_service: UserService, history_service: HistoryService
+    message: Message,
+    text_command: ShowHistory,
+    user: User,
+    history_service: AsyncService[HistoryService],
 ):
-    """Handle 'история' - show watch history."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
+    """Handle 'история [период]' - show first page of watch history."""
+    period = HistoryService.parse_period(text_command.period)
+    if period is None:
+        await message.answer(Messages.INVALID_HISTORY_PERIOD)
+        return
 
-    result = history_service.get_history()
+    result = await history_service.get_history(user.group_id, period)
+    text, keyboard = render_history(result)
+    await message.answer(text, reply_markup=keyboard)
 
-    if result.is_empty:
-        await message.answer(Messages.EMPTY_HISTORY)
+
+@router.callback_query(F.data.startswith("hist:"))
+async def turn_history_page(
+    callback: CallbackQuery, user: User, history_service: AsyncService[HistoryService]
+):
+    """Handle '◀ ▶' buttons - show neighbouring history page."""
+    try:
+        _, code, direction, ordinal, item_id = callback.data.split(":")
+        cursor = HistoryCursor(watched_at=date.fromordinal(int(ordinal)), id=int(item_id))
+    except ValueError:
+        await callback.answer()
+        return
+    period = HistoryService.get_period(code)
+    if period is None:
+        await callback.answer()
+        return
+
+    if direction == "n":
+        result = await history_service.get_history(user.group_id, period, newer_than=cursor)
     else:
-        lines = ["📚 История просмотров:"]
-        for month in result.months:
-            lines.append("")
-            lines.append(f"{month.month_name}:")
-            for movie in month.movies:
-                date_str = HistoryService.format_date(movie.watched_at)
-                lines.append(
-                    f"• {movie.movie_title} — {movie.rating}/10 ({date_str})"
-                )
+        result = await history_service.get_history(user.group_id, period, older_than=cursor)
+    text, keyboard = render_history(result)
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
 
-        lines.append("")
-        lines.append(
-            f"Всего за год: {result.total_count} фильма, средняя оценка: {result.average_rating}"
-        )
 
-        await message.answer("\n".join(lines))
+@router.message(IsCommand(SearchHistory))
+async def search_history(
+    message: Message,
+    text_command: SearchHistory,
+    user: User,
+    history_service: AsyncService[HistoryService],
+):
+    """Handle 'мы смотрели [название]?' - search watch history by title."""
+    items = await history_service.search(user.group_id, text_command.query)
+    await message.answer(Messages.format_search_results(text_command.query, items))
@@ -1,23 +1,25 @@
 # -*- coding: utf-8 -*-
 """Selection handler - 'что смотрим?'"""
 
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message
 
+from src.bot.filters import IsCommand
 from src.bot.messages import Messages
-from src.services import UserService, SelectionService
+from src.services import SelectionService
+from src.database.repositories import User
+from src.database import AsyncService
+from src.utils.commands import PickMovie
 
 router = Router()
 
 
-@router.message(F.text.lower().regexp(r"^(🎲\s*)?что смотрим"))
+@router.message(IsCommand(PickMovie))
 async def what_to_watch(
-    message: Message, user_service: UserService, selection_service: SelectionService
+    message: Message, user: User, selection_service: AsyncService[SelectionService]
 ):
     """Handle 'что смотрим?' - pick a movie."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-
-    result = selection_service.pick_movie(message.from_user.id)
+    result = await selection_service.pick_movie(user)
 
     if result.movie is None:
         await message.answer(Messages.ALL_LISTS_EMPTY)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Stats handler - 'статистика'"""
+
+from aiogram import Router
+from aiogram.types import Message
+
+from src.bot.filters import IsCommand
+from src.bot.messages import Messages
+from src.services import StatsService
+from src.database.repositories import User
+from src.database import AsyncService
+from src.utils.commands import ShowStats
+
+router = Router()
+
+
+@router.message(IsCommand(ShowStats))
+async def show_stats(
+    message: Message,
+    text_command: ShowStats,
+    user: User,
+    stats_service: AsyncService[StatsService],
+):
+    """Handle 'статистика [год]' - show yearly watch statistics."""
+    result = await stats_service.get_stats(user.group_id, text_command.year)
+    await message.answer(Messages.format_stats(result))
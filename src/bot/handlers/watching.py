@@ -1,105 +1,118 @@
 # -*- coding: utf-8 -*-
 """Watching handler - 'посмотрели' + rating callbacks."""
 
-import re
+import json
 
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 
+from src.bot.conversation import ConversationStore
+from src.bot.filters import IsCommand
 from src.bot.messages import Messages
-from src.bot.keyboards import rating_keyboard
-from src.services import UserService, WishlistService, WatchService
-from src.database.repositories import StateRepository
+from src.bot.keyboards import rating_keyboard, suggestion_keyboard
+from src.services import WatchService
+from src.services.watch_service import WatchResult
+from src.database.repositories import User
+from src.database import AsyncService
+from src.utils.commands import MarkWatched, MarkWatchedMany
 
 router = Router()
 
 
-@router.message(F.text.lower().startswith("посмотрели"))
+def watch_reply(user: User, result: WatchResult, conversation: ConversationStore) -> dict:
+    """Reply text and markup for mark_watched; a likely typo is offered for confirmation."""
+    if result.suggestion:
+        conversation.set(
+            user,
+            ConversationStore.SUGGESTED_WATCH,
+            json.dumps([result.movie_title, result.suggestion, result.rating], ensure_ascii=False),
+        )
+        return {
+            "text": Messages.watched_suggestion(result.movie_title, result.suggestion),
+            "reply_markup": suggestion_keyboard(result.movie_title, result.suggestion, action="watchfix"),
+        }
+    if result.in_wishlist:
+        return {"text": Messages.movie_watched(result.movie_title, result.rating)}
+    return {"text": Messages.movie_added_to_history(result.movie_title, result.rating)}
+
+
+@router.message(IsCommand(MarkWatched))
 async def mark_watched(
     message: Message,
-    user_service: UserService,
-    wishlist_service: WishlistService,
-    watch_service: WatchService,
-    state_repo: StateRepository,
+    text_command: MarkWatched,
+    user: User,
+    watch_service: AsyncService[WatchService],
+    conversation: ConversationStore,
 ):
     """Handle 'посмотрели [название], [оценка]' - mark movie as watched."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-
-    text = message.text[len("посмотрели") :].strip()
-
-    # Rating requires comma before number OR /10 suffix
-    # This prevents "Дюна 2" from being parsed as rating=2
-    # Also handles optional word "оценка" before the number
-    match = re.match(r"(.+?),\s*(?:оценка\s*)?(\d+)(?:/10)?$", text, re.IGNORECASE) or re.match(
-        r"(.+?)\s+(?:оценка\s*)?(\d+)/10$", text, re.IGNORECASE
-    )
-
-    if match:
-        movie_name = match.group(1).strip()
-        rating = int(match.group(2))
+    movie_name = text_command.title
+    rating = text_command.rating
 
+    if rating is not None:
         if rating < 1 or rating > 10:
             await message.answer(Messages.INVALID_RATING)
             return
 
-        # Check if movie is in wishlist
-        all_movies = wishlist_service.get_all_movies()
-        in_wishlist = movie_name.lower() in [m.lower() for m in all_movies]
-
-        result = watch_service.mark_watched(message.from_user.id, movie_name, rating)
-
-        if in_wishlist:
-            await message.answer(Messages.movie_watched(result.movie_title, rating))
-        else:
-            await message.answer(
-                Messages.movie_added_to_history(result.movie_title, rating)
-            )
+        result = await watch_service.mark_watched(user, movie_name, rating)
+        await message.answer(**watch_reply(user, result, conversation))
     else:
         # No rating provided - ask for it
-        movie_name = text.strip()
         if movie_name:
             # Store pending movie for rating
-            state_repo.set(f"pending_movie:{message.from_user.id}", movie_name)
+            conversation.set(user, ConversationStore.PENDING_MOVIE, movie_name)
             await message.answer(Messages.ASK_RATING, reply_markup=rating_keyboard())
         else:
             await message.answer(Messages.ASK_RATING)
 
 
+@router.message(IsCommand(MarkWatchedMany))
+async def mark_watched_many(
+    message: Message,
+    text_command: MarkWatchedMany,
+    user: User,
+    watch_service: AsyncService[WatchService],
+):
+    """Handle 'посмотрели' with one title per line and an optional rating line - mark them all."""
+    result = await watch_service.mark_watched_many(user, list(text_command.movies))
+    await message.answer(Messages.movies_watched(result))
+
+
 @router.callback_query(F.data.startswith("rate:"))
 async def handle_rating(
     callback: CallbackQuery,
-    user_service: UserService,
-    wishlist_service: WishlistService,
-    watch_service: WatchService,
-    state_repo: StateRepository,
+    user: User,
+    watch_service: AsyncService[WatchService],
+    conversation: ConversationStore,
 ):
     """Handle rating button press."""
-    user_service.register(callback.from_user.id, callback.from_user.full_name)
-
     rating = int(callback.data.split(":")[1])
 
-    # Get pending movie
-    movie_name = state_repo.get(f"pending_movie:{callback.from_user.id}")
+    # Take and clear pending movie
+    movie_name = conversation.pop(user, ConversationStore.PENDING_MOVIE)
     if not movie_name:
         await callback.answer("No pending movie to rate")
         return
 
-    # Clear pending state
-    state_repo.delete(f"pending_movie:{callback.from_user.id}")
-
-    # Check if movie is in wishlist
-    all_movies = wishlist_service.get_all_movies()
-    in_wishlist = movie_name.lower() in [m.lower() for m in all_movies]
+    result = await watch_service.mark_watched(user, movie_name, rating)
+    await callback.message.edit_text(**watch_reply(user, result, conversation))
+    await callback.answer()
 
-    result = watch_service.mark_watched(callback.from_user.id, movie_name, rating)
 
-    if in_wishlist:
-        await callback.message.edit_text(
-            Messages.movie_watched(result.movie_title, rating)
-        )
-    else:
-        await callback.message.edit_text(
-            Messages.movie_added_to_history(result.movie_title, rating)
-        )
+@router.callback_query(F.data.startswith("watchfix:"))
+async def choose_watch_suggestion(
+    callback: CallbackQuery,
+    user: User,
+    watch_service: AsyncService[WatchService],
+    conversation: ConversationStore,
+):
+    """Handle the choice between a suggested title and the typed one; mark it watched."""
+    pending = conversation.pop(user, ConversationStore.SUGGESTED_WATCH)
+    if not pending:
+        await callback.answer()
+        return
 
+    title, suggestion, rating = json.loads(pending)
+    chosen = suggestion if callback.data == "watchfix:yes" else title
+    result = await watch_service.mark_watched(user, chosen, rating, suggest=False)
+    await callback.message.edit_text(**watch_reply(user, result, conversation))
     await callback.answer()
@@ -1,80 +1,172 @@
 # -*- coding: utf-8 -*-
 """Wishlist handlers - add/remove/list movies."""
 
+import json
+
 from aiogram import Router, F
-from aiogram.types import Message
+from aiogram.types import Message, CallbackQuery
 
+from src.bot.conversation import ConversationStore
+from src.bot.render_cache import RenderCache
+from src.bot.filters import IsCommand
+from src.bot.keyboards import suggestion_keyboard
 from src.bot.messages import Messages
-from src.services import UserService, WishlistService
-from src.database.repositories import StateRepository
+from src.services import WishlistService
+from src.services.wishlist_service import AddMovieResult
+from src.utils.commands import (
+    AddMovie,
+    AddMovies,
+    AskMovieTitle,
+    DeleteMovie,
+    DeleteMovies,
+    ShowMyList,
+    ShowOurList,
+)
+from src.database.repositories import User
+from src.database import AsyncService
 
 router = Router()
 
 
-@router.message(F.text.lower().in_({"➕ добавить фильм", "добавить фильм"}))
-async def ask_movie_name(
-    message: Message, user_service: UserService, state_repo: StateRepository
-):
+@router.message(IsCommand(AskMovieTitle))
+async def ask_movie_name(message: Message, user: User, conversation: ConversationStore):
     """Handle 'Добавить фильм' button - ask for movie name."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-    state_repo.set(f"awaiting_movie:{message.from_user.id}", "1")
+    conversation.set(user, ConversationStore.AWAITING_MOVIE, "1")
     await message.answer("🎬 Какой фильм хочешь посмотреть?")
 
 
-@router.message(F.text.lower().startswith("хочу посмотреть"))
+async def answer_add_result(
+    message: Message, user: User, result: AddMovieResult, conversation: ConversationStore
+) -> None:
+    """Reply to add_movie; a likely typo is offered for confirmation."""
+    if result.suggestion:
+        conversation.set(
+            user,
+            ConversationStore.SUGGESTED_MOVIE,
+            json.dumps([result.movie_title, result.suggestion], ensure_ascii=False),
+        )
+        await message.answer(
+            Messages.movie_suggestion(result.movie_title, result.suggestion),
+            reply_markup=suggestion_keyboard(result.movie_title, result.suggestion),
+        )
+    elif result.already_exists:
+        await message.answer(Messages.movie_already_exists(result.movie_title))
+    else:
+        await message.answer(Messages.movie_added(result.movie_title))
+
+
+@router.message(IsCommand(AddMovie))
 async def add_movie(
-    message: Message, user_service: UserService, wishlist_service: WishlistService
+    message: Message,
+    text_command: AddMovie,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+    conversation: ConversationStore,
 ):
     """Handle 'хочу посмотреть [название]' - add movie to wishlist."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-
-    movie_name = message.text[len("хочу посмотреть") :].strip()
-    if not movie_name:
+    if not text_command.title:
         await message.answer(Messages.EMPTY_MOVIE_NAME)
         return
 
-    result = wishlist_service.add_movie(message.from_user.id, movie_name)
+    result = await wishlist_service.add_movie(user, text_command.title)
+    await answer_add_result(message, user, result, conversation)
+
+
+@router.message(IsCommand(AddMovies))
+async def add_movies(
+    message: Message,
+    text_command: AddMovies,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+):
+    """Handle 'хочу посмотреть' with one title per line - add them all."""
+    result = await wishlist_service.add_movies(user, list(text_command.titles))
+    await message.answer(Messages.movies_added(result))
+
+
+@router.callback_query(F.data.startswith("fix:"))
+async def choose_suggestion(
+    callback: CallbackQuery,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+    conversation: ConversationStore,
+):
+    """Handle the choice between a suggested title and the typed one."""
+    pending = conversation.pop(user, ConversationStore.SUGGESTED_MOVIE)
+    if not pending:
+        await callback.answer()
+        return
+
+    title, suggestion = json.loads(pending)
+    chosen = suggestion if callback.data == "fix:yes" else title
+    result = await wishlist_service.add_movie(user, chosen, suggest=False)
     if result.already_exists:
-        await message.answer(Messages.movie_already_exists(result.movie_title))
+        await callback.message.edit_text(Messages.movie_already_exists(result.movie_title))
     else:
-        await message.answer(Messages.movie_added(result.movie_title))
+        await callback.message.edit_text(Messages.movie_added(result.movie_title))
+    await callback.answer()
 
 
-@router.message(F.text.lower().in_({"мой список", "📋 мой список"}))
+@router.message(IsCommand(ShowMyList))
 async def my_list(
-    message: Message, user_service: UserService, wishlist_service: WishlistService
+    message: Message,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+    render_cache: RenderCache,
 ):
     """Handle 'мой список' - show user's wishlist."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
 
-    movies = wishlist_service.get_user_wishlist(message.from_user.id)
-    await message.answer(Messages.format_my_list(movies))
+    async def build() -> str:
+        return Messages.format_my_list(await wishlist_service.get_user_wishlist(user))
 
+    await message.answer(await render_cache.render(("my_list", user.id), ("user", user.id), build))
 
-@router.message(F.text.lower().in_({"наш список", "💑 наш список"}))
+
+@router.message(IsCommand(ShowOurList))
 async def our_list(
-    message: Message, user_service: UserService, wishlist_service: WishlistService
+    message: Message,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+    render_cache: RenderCache,
 ):
     """Handle 'наш список' - show intersection of wishlists."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
 
-    movies = wishlist_service.get_intersection()
-    await message.answer(Messages.format_our_list(movies))
+    async def build() -> str:
+        return Messages.format_our_list(await wishlist_service.get_intersection(user.group_id))
+
+    scope = ("group", user.group_id)
+    await message.answer(await render_cache.render(("our_list", user.group_id), scope, build))
 
 
-@router.message(F.text.lower().startswith("удали"))
+@router.message(IsCommand(DeleteMovie))
 async def delete_movie(
-    message: Message, user_service: UserService, wishlist_service: WishlistService
+    message: Message,
+    text_command: DeleteMovie,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
 ):
     """Handle 'удали [название]' - remove movie from wishlist."""
-    user_service.register(message.from_user.id, message.from_user.full_name)
-
-    movie_name = message.text[len("удали") :].strip()
-    if not movie_name:
+    if not text_command.title:
         return
 
-    result = wishlist_service.delete_movie(message.from_user.id, movie_name)
+    result = await wishlist_service.delete_movie(user, text_command.title)
     if result.deleted:
         await message.answer(Messages.movie_deleted(result.movie_title))
+    elif result.suggestion:
+        await message.answer(
+            Messages.movie_not_found_suggestion(result.movie_title, result.suggestion)
+        )
     else:
         await message.answer(Messages.movie_not_found(result.movie_title))
+
+
+@router.message(IsCommand(DeleteMovies))
+async def delete_movies(
+    message: Message,
+    text_command: DeleteMovies,
+    user: User,
+    wishlist_service: AsyncService[WishlistService],
+):
+    """Handle 'удали' with one title per line - remove several movies from wishlist."""
+    result = await wishlist_service.delete_movies(user, list(text_command.titles))
+    await message.answer(Messages.movies_deleted(result))
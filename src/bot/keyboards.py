@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Keyboards for the bot."""
 
+from typing import Optional
+
 from aiogram.types import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
@@ -24,6 +26,36 @@ def rating_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[row1, row2])
 
 
+def suggestion_keyboard(title: str, suggestion: str, action: str = "fix") -> InlineKeyboardMarkup:
+    """Create "take the known title / keep mine" choice for a likely typo.
+
+    ``action`` prefixes the callback data ("fix:yes" / "fix:no") and tells
+    apart the handler that completes the choice.
+    """
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=f"✅ {suggestion}", callback_data=f"{action}:yes")],
+            [InlineKeyboardButton(text=f"➕ {title}", callback_data=f"{action}:no")],
+        ]
+    )
+
+
+def history_keyboard(
+    period_code: str, newer: Optional[tuple[int, int]], older: Optional[tuple[int, int]]
+) -> Optional[InlineKeyboardMarkup]:
+    """Create "◀ ▶" history navigation; cursors are (day ordinal, id) pairs."""
+    buttons = []
+    if newer:
+        buttons.append(
+            InlineKeyboardButton(text="◀", callback_data=f"hist:{period_code}:n:{newer[0]}:{newer[1]}")
+        )
+    if older:
+        buttons.append(
+            InlineKeyboardButton(text="▶", callback_data=f"hist:{period_code}:o:{older[0]}:{older[1]}")
+        )
+    return InlineKeyboardMarkup(inline_keyboard=[buttons]) if buttons else None
+
+
 def main_keyboard() -> ReplyKeyboardMarkup:
     """Create persistent keyboard with main commands."""
     return ReplyKeyboardMarkup(
@@ -1,5 +1,11 @@
 """Bot response message templates."""
 
+from src.database.repositories import HistoryItem
+from src.services.history_service import MONTH_NAMES, HistoryService
+from src.services.stats_service import StatsResult
+from src.services.watch_service import BulkWatchResult
+from src.services.wishlist_service import BulkAddResult, BulkDeleteResult
+
 
 class Messages:
     """All bot response templates."""
@@ -19,7 +25,13 @@ class Messages:
 • «что смотрим?» — выбрать фильм на вечер
 • «посмотрели [название], [оценка]» — отметить просмотр
 • «история» — что смотрели за год
-• «удали [название]» — убрать из списка"""
+• «статистика» — итоги по годам
+• «мы смотрели [название]?» — поиск по истории
+• «удали [название]» — убрать из списка
+• «экспорт [история|списки] [csv|json]» — выгрузить файлом
+
+Несколько фильмов пишите каждый с новой строки после команды; общую оценку
+для «посмотрели» — последней строкой"""
 
     UNKNOWN_COMMAND = "🤔 Не понял. Напиши /help чтобы увидеть доступные команды"
     EMPTY_MOVIE_NAME = "🎬 Какой фильм добавить? Напиши «хочу посмотреть [название]»"
@@ -27,8 +39,12 @@ class Messages:
     EMPTY_INTERSECTION = "💑 Пока нет фильмов которые хотите оба"
     ALL_LISTS_EMPTY = "😅 Списки пусты! Добавьте фильмы командой «хочу посмотреть [название]»"
     EMPTY_HISTORY = "📚 История пуста. Самое время что-нибудь посмотреть! 🍿"
+    INVALID_HISTORY_PERIOD = "🤔 Не понял период. Например: «история 2025» или «история март 2025»"
     ASK_RATING = "Как вам фильм? Оцените от 1 до 10"
     INVALID_RATING = "🤔 Оценка должна быть от 1 до 10"
+    EMPTY_EXPORT = "📭 Выгружать пока нечего"
+    # One title per line, the common rating on the last one
+    BULK_WATCH_EXAMPLE = "посмотрели\nДюна\nБарби\n8"
 
     @staticmethod
     def movie_added(title: str) -> str:
@@ -46,6 +62,18 @@ class Messages:
     def movie_not_found(title: str) -> str:
         return f"🤷 «{title}» нет в твоём списке"
 
+    @staticmethod
+    def movie_suggestion(title: str, suggestion: str) -> str:
+        return f"🤔 Похоже на «{suggestion}». Добавить его вместо «{title}»?"
+
+    @staticmethod
+    def watched_suggestion(title: str, suggestion: str) -> str:
+        return f"🤔 Похоже на «{suggestion}». Отметить его вместо «{title}»?"
+
+    @staticmethod
+    def movie_not_found_suggestion(title: str, suggestion: str) -> str:
+        return f"🤷 «{title}» нет в твоём списке. Может, «{suggestion}»?"
+
     @staticmethod
     def movie_not_in_wishlist(title: str) -> str:
         return f"ℹ️ Фильма «{title}» нет в твоём списке"
@@ -87,3 +115,75 @@ class Messages:
     @staticmethod
     def movie_added_to_history(title: str, rating: int) -> str:
         return f"✅ Добавил «{title}» в архив с оценкой {rating}/10"
+
+    @staticmethod
+    def _quoted(titles: list[str]) -> str:
+        return ", ".join(f"«{title}»" for title in titles)
+
+    @staticmethod
+    def movies_added(result: BulkAddResult) -> str:
+        lines = []
+        if result.added:
+            lines.append(f"✅ Добавил в твой список: {Messages._quoted(result.added)}")
+        if result.skipped:
+            lines.append(f"ℹ️ Уже есть в списке: {Messages._quoted(result.skipped)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def movies_deleted(result: BulkDeleteResult) -> str:
+        lines = []
+        if result.deleted:
+            lines.append(f"🗑 Удалил из твоего списка: {Messages._quoted(result.deleted)}")
+        if result.not_found:
+            lines.append(f"🤷 Нет в твоём списке: {Messages._quoted(result.not_found)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def movies_watched(result: BulkWatchResult) -> str:
+        lines = []
+        if result.watched:
+            lines.append("✅ В архиве:")
+            lines.extend(f"• {item.movie_title} — {item.rating}/10" for item in result.watched)
+        if result.unrated:
+            lines.append(
+                f"🤔 Без оценки от 1 до 10, не отметил: {Messages._quoted(result.unrated)}. "
+                f"Например:\n{Messages.BULK_WATCH_EXAMPLE}"
+            )
+        return "\n".join(lines)
+
+    @staticmethod
+    def export_caption(what: str, rows: int) -> str:
+        label = "История просмотров" if what == "history" else "Списки фильмов"
+        return f"📦 {label}, строк: {rows}"
+
+    @staticmethod
+    def format_stats(result: StatsResult) -> str:
+        if result.is_empty:
+            return Messages.EMPTY_HISTORY
+        lines = ["📊 Статистика:"]
+        for year in result.years:
+            lines.append("")
+            lines.append(f"{year.year}:")
+            lines.append(f"• Посмотрели: {year.count}, средняя оценка: {year.average_rating}")
+            if year.best_movie:
+                lines.append(f"• Лучший фильм: «{year.best_movie}» — {year.best_rating}/10")
+            month = MONTH_NAMES[year.most_active_month].lower()
+            lines.append(f"• Самый активный месяц: {month} ({year.most_active_count})")
+        if len(result.years) > 1:
+            lines.append("")
+            lines.append(f"Всего: {result.total_count}, средняя оценка: {result.average_rating}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_search_results(query: str, items: list[HistoryItem]) -> str:
+        if not items:
+            return f"🤷 «{query}» ещё не смотрели"
+        lines = ["🔍 Да, смотрели:"]
+        for item in items:
+            date_str = f"{HistoryService.format_date(item.watched_at)} {item.watched_at.year}"
+            lines.append(f"• {item.movie_title} — {item.rating}/10 ({date_str})")
+        return "\n".join(lines)
+
+    @staticmethod
+    def empty_history_period(period_label: str) -> str:
+        return f"📚 За {period_label} ничего не смотрели"
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Bot metrics and the local HTTP endpoint that exposes them."""
+
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from src.utils import MetricsRegistry
+from src.utils.metrics import UpdateStats
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class BotMetrics:
+    """Per-handler latency, errors and SQL work, recorded once per update."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.update_seconds = registry.histogram(
+            "update_seconds", "Time to handle an update, by the handler that took it.", ["handler"]
+        )
+        self.update_errors = registry.counter("update_errors_total", "Updates whose handler raised.", ["handler"])
+        self.sql_queries = registry.counter("sql_queries_total", "SQL statements executed.", ["handler"])
+        self.update_queries = registry.histogram(
+            "update_sql_queries", "SQL statements per update.", ["handler"], buckets=QUERY_BUCKETS
+        )
+        self.sql_rows = registry.counter("sql_rows_total", "Rows fetched (read) or changed (written).", ["handler", "kind"])
+        self.sql_commit_seconds = registry.counter(
+            "sql_commit_seconds_total", "Time spent in COMMIT.", ["handler"]
+        )
+
+    def record(self, stats: UpdateStats, seconds: float, failed: bool) -> None:
+        handler = stats.handler
+        self.update_seconds.observe(seconds, handler)
+        if failed:
+            self.update_errors.inc(handler)
+        self.sql_queries.inc(handler, amount=stats.queries)
+        self.update_queries.observe(stats.queries, handler)
+        self.sql_rows.inc(handler, "read", amount=stats.rows_read)
+        self.sql_rows.inc(handler, "written", amount=stats.rows_written)
+        self.sql_commit_seconds.inc(handler, amount=stats.commit_seconds)
+
+
+async def start_metrics_server(registry: MetricsRegistry, host: str, port: int) -> web.AppRunner:
+    """Serve GET /metrics in the Prometheus text format; cleanup() the runner to stop."""
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
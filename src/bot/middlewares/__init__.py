@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Bot middlewares."""
+
+from .command import CommandMiddleware
+from .identity import IdentityMiddleware
+from .metrics import HandlerNameMiddleware, MetricsMiddleware
+
+__all__ = [
+    "CommandMiddleware",
+    "HandlerNameMiddleware",
+    "IdentityMiddleware",
+    "MetricsMiddleware",
+]
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Command middleware - parses message text once per update."""
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, TelegramObject
+
+from src.utils.commands import parse_command
+
+
+class CommandMiddleware(BaseMiddleware):
+    """Injects the parsed text command into handler data as ``text_command``.
+
+    Handlers select on it with the ``IsCommand`` filter instead of each
+    lowercasing and matching the text again.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Message):
+            data["text_command"] = parse_command(event.text)
+        return await handler(event, data)
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Identity middleware - resolves the sender once per update."""
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.bot.groups import chat_group_id
+from src.database import AsyncService
+from src.database.repositories import User
+from src.services import UserService
+from src.utils import LRUCache
+
+
+class IdentityMiddleware(BaseMiddleware):
+    """Injects the registered sender into handler data as ``user``.
+
+    Users are kept in an LRU cache keyed by (group_id, telegram_id), so the
+    database is only touched on a miss or when the Telegram name changes.
+    """
+
+    def __init__(self, user_service: AsyncService[UserService], maxsize: int = 1024):
+        self.user_service = user_service
+        self.cache: LRUCache[tuple[int, int], User] = LRUCache(maxsize)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        from_user = data.get("event_from_user")
+        if from_user is not None:
+            chat = data.get("event_chat")
+            # Without a chat (e.g. inline queries) the sender is a group of one
+            group_id = chat_group_id(chat) if chat else from_user.id
+            key = (group_id, from_user.id)
+
+            user = self.cache.get(key)
+            if user is None or user.display_name != from_user.full_name:
+                result = await self.user_service.register(from_user.id, from_user.full_name, group_id)
+                user = result.user
+                self.cache.put(key, user)
+            data["user"] = user
+
+        return await handler(event, data)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Metrics middlewares - latency and database work per handler."""
+
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from src.bot.metrics import BotMetrics
+from src.database import QueryTracer
+from src.utils.metrics import UpdateStats, current_update_stats
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """Outer update middleware: times the whole update, commit included.
+
+    Database queries made meanwhile are counted into the update's
+    UpdateStats; HandlerNameMiddleware labels it with the handler taken.
+    With a query tracer, statements repeated within the update are reported.
+    """
+
+    def __init__(self, metrics: Optional[BotMetrics] = None, tracer: Optional[QueryTracer] = None):
+        self.metrics = metrics
+        self.tracer = tracer
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        stats = UpdateStats(update_id=event.update_id if isinstance(event, Update) else None)
+        token = current_update_stats.set(stats)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await handler(event, data)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            current_update_stats.reset(token)
+            if self.metrics is not None:
+                self.metrics.record(stats, time.perf_counter() - started, failed)
+            if self.tracer is not None:
+                self.tracer.finish_update(stats)
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Inner middleware: records which handler took the update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        stats = current_update_stats.get()
+        if stats is not None:
+            stats.handler = data["handler"].callback.__name__
+        return await handler(event, data)
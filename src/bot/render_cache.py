@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Cache of rendered replies, valid while their data version is current."""
+
+import sys
+from typing import Awaitable, Callable, Hashable
+
+from src.database import DataVersions
+from src.utils import CacheStats, LRUCache
+
+
+class RenderCache:
+    """Rendered reply texts stored with the data version they were built from.
+
+    A lookup is one dictionary hit plus an integer comparison against the
+    scope's current version (see DataVersions); a stale entry is rebuilt.
+    Entries are evicted least recently used first, within both an entry
+    count and a total size limit.
+    """
+
+    def __init__(self, versions: DataVersions, maxsize: int = 4096, max_bytes: int = 8 * 1024 * 1024):
+        self.versions = versions
+        self._cache: LRUCache[Hashable, tuple[int, str]] = LRUCache(
+            maxsize, max_weight=max_bytes, weigh=lambda entry: sys.getsizeof(entry[1])
+        )
+        self.stats = CacheStats()  # A stale entry counts as a miss
+
+    async def render(self, key: Hashable, scope: Hashable, build: Callable[[], Awaitable[str]]) -> str:
+        """Cached text for key, or the result of build() if scope changed since."""
+        version = self.versions.get(scope)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            self.stats.hits += 1
+            return entry[1]
+        self.stats.misses += 1
+        # Stored under the version read before building: a change committed
+        # meanwhile bumps the version and the next view rebuilds
+        text = await build()
+        self._cache.put(key, (version, text))
+        return text
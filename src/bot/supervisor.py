@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Supervisor mode - spreads updates over several worker processes."""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import queue
+import time
+from typing import Any, Callable, Optional
+
+from aiogram import Bot
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+
+from src.app import create_bot, create_db_worker, create_dispatcher
+from src.bot.conversation import ConversationStore
+from src.bot.groups import chat_group_id
+from src.bot.metrics import BotMetrics, start_metrics_server
+from src.config import BOT_TOKEN, CONVERSATION_STATE_PATH, CONVERSATION_TTL, METRICS_HOST, METRICS_PORT
+from src.database import DEFAULT_GROUP_ID
+
+logger = logging.getLogger(__name__)
+
+
+def shard_key(update: Update) -> int:
+    """Group the update belongs to.
+
+    Everything of a group is handled by one worker, so per-process caches
+    (wishlist index, known users, dialog state) stay consistent.
+    """
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat:
+        return chat_group_id(context.chat)
+    return context.user.id if context.user else DEFAULT_GROUP_ID
+
+
+def shard_for(update: Update, workers: int) -> int:
+    """Index of the worker that handles the update."""
+    return shard_key(update) % workers
+
+
+def order_key(update: Update) -> int:
+    """Updates with the same key are processed one after another."""
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat:
+        return context.chat.id
+    return context.user.id if context.user else 0
+
+
+class Supervisor:
+    """Starts worker processes, routes updates to them and restarts them.
+
+    Each worker owns a queue; an update goes to ``shard_for`` its chat, so
+    a chat is always served by the same worker. Workers report a heartbeat
+    and are restarted when they exit or stop reporting.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        heartbeat_timeout: float = 30.0,
+        queue_size: int = 1000,
+        target: Optional[Callable[..., Any]] = None,
+    ):
+        # spawn: workers must not inherit the event loop or sqlite connections
+        self._context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.heartbeat_timeout = heartbeat_timeout
+        self.target = target or worker_main
+        self.queues = [self._context.Queue(queue_size) for _ in range(workers)]
+        self.heartbeats = [self._context.Value("d", 0.0) for _ in range(workers)]
+        self.processes: list[Any] = [None] * workers
+        self.restarts = 0
+        self._monitor: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start all workers and the health check."""
+        for index in range(self.workers):
+            self._spawn(index)
+        self._monitor = asyncio.create_task(self._watch())
+
+    def _spawn(self, index: int) -> None:
+        self.heartbeats[index].value = time.time()
+        process = self._context.Process(
+            target=self.target,
+            args=(index, self.queues[index], self.heartbeats[index], self.heartbeat_timeout / 3),
+            name=f"moviebot-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.heartbeat_timeout / 3, 5.0))
+            for index, process in enumerate(self.processes):
+                stale = time.time() - self.heartbeats[index].value > self.heartbeat_timeout
+                if process.is_alive() and not stale:
+                    continue
+                logger.warning(
+                    "Worker %d %s, restarting", index, "is not responding" if stale else "exited"
+                )
+                if process.is_alive():
+                    process.kill()
+                await asyncio.to_thread(process.join, 5)
+                self.restarts += 1
+                self._spawn(index)
+
+    async def feed_update(self, bot: Bot, update: Update) -> None:
+        """Pass an update to its worker (same interface as Dispatcher.feed_update)."""
+        worker_queue = self.queues[shard_for(update, self.workers)]
+        data = update.model_dump_json(exclude_unset=True)
+        try:
+            worker_queue.put_nowait(data)
+        except queue.Full:
+            # Back-pressure: wait for the worker without blocking the loop
+            await asyncio.to_thread(worker_queue.put, data)
+
+    def resolve_used_update_types(self) -> list[str]:
+        """Update types the handlers need (used when registering the webhook)."""
+        return create_dispatcher().resolve_used_update_types()
+
+    async def start_polling(self, bot: Bot, polling_timeout: int = 30) -> None:
+        """Long-poll Telegram and route every update to its worker."""
+        offset: Optional[int] = None
+        allowed_updates = self.resolve_used_update_types()
+        while True:
+            try:
+                updates = await bot.get_updates(
+                    offset=offset, timeout=polling_timeout, allowed_updates=allowed_updates
+                )
+            except Exception:
+                logger.exception("Failed to fetch updates")
+                await asyncio.sleep(5)
+                continue
+            for update in updates:
+                await self.feed_update(bot, update)
+                offset = update.update_id + 1
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let workers finish their queues and stop them."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+        await asyncio.gather(*(self._send_stop(worker_queue, timeout) for worker_queue in self.queues))
+        for process in self.processes:
+            if process is None:
+                continue
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                process.kill()
+
+    @staticmethod
+    async def _send_stop(worker_queue: Any, timeout: float) -> None:
+        try:
+            worker_queue.put_nowait(None)
+        except queue.Full:
+            try:
+                # A full queue waits for its worker off the loop, but not forever
+                await asyncio.to_thread(worker_queue.put, None, True, timeout)
+            except queue.Full:
+                logger.warning("Worker queue is still full, the worker will be killed")
+
+
+def worker_main(index: int, updates: Any, heartbeat: Any, heartbeat_interval: float) -> None:
+    """Worker process entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - worker-{index} - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(_run_worker(index, updates, heartbeat, heartbeat_interval))
+
+
+async def _run_worker(index: int, updates: Any, heartbeat: Any, heartbeat_interval: float) -> None:
+    db_worker = create_db_worker(instrumented=METRICS_PORT is not None)
+    conversation = ConversationStore(
+        ttl=CONVERSATION_TTL,
+        path=f"{CONVERSATION_STATE_PATH}.{index}" if CONVERSATION_STATE_PATH else None,
+    )
+    bot = create_bot(BOT_TOKEN)
+    metrics = BotMetrics() if METRICS_PORT else None
+    dp = create_dispatcher(db_worker, conversation, metrics=metrics)
+    await conversation.start()
+    metrics_server = None
+    if metrics is not None:
+        # The supervisor itself handles no updates; each worker has its own port
+        metrics_server = await start_metrics_server(metrics.registry, METRICS_HOST, METRICS_PORT + 1 + index)
+
+    async def beat() -> None:
+        while True:
+            heartbeat.value = time.time()
+            await asyncio.sleep(heartbeat_interval)
+
+    async def process(previous: Optional[asyncio.Task], update: Update) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await dp.feed_update(bot, update)
+        except Exception:
+            logger.exception("Failed to process update %s", update.update_id)
+
+    # Last task of every chat; a new update of the chat waits for it
+    tails: dict[int, asyncio.Task] = {}
+
+    def forget(key: int, task: asyncio.Task) -> None:
+        if tails.get(key) is task:
+            del tails[key]
+
+    beat_task = asyncio.create_task(beat())
+    try:
+        while True:
+            data = await asyncio.to_thread(updates.get)
+            if data is None:
+                break
+            update = Update.model_validate_json(data, context={"bot": bot})
+            key = order_key(update)
+            task = asyncio.create_task(process(tails.get(key), update))
+            tails[key] = task
+            task.add_done_callback(functools.partial(forget, key))
+        await asyncio.gather(*tails.values())
+    finally:
+        beat_task.cancel()
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+        await conversation.stop()
+        await db_worker.close()
+        if db_worker.db.tracer is not None:
+            db_worker.db.tracer.log_summary()
+        await bot.session.close()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Webhook server - receives updates over HTTP instead of long polling."""
+
+import asyncio
+import hmac
+import logging
+import ssl
+from typing import Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import FSInputFile, Update
+from aiohttp import web
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """aiohttp application feeding webhook updates into a Dispatcher.
+
+    Requests are checked against the secret token and put on a bounded
+    queue; a fixed number of consumer tasks process them. When the queue
+    is full the request gets 503 and Telegram delivers the update again
+    later, so a burst cannot grow memory without limit.
+
+    Run one server per database: caches and dialog state are per process.
+    To spread the work, put it in front of the supervisor (WORKER_PROCESSES),
+    which routes every chat group to a single worker process.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        secret_token: str,
+        path: str = "/webhook",
+        queue_size: int = 1000,
+        workers: int = 8,
+    ):
+        self.dp = dp
+        self.bot = bot
+        self.secret_token = secret_token
+        self.path = path
+        self.workers = workers
+        self.queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=queue_size)
+        self._consumers: list[asyncio.Task] = []
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application with webhook and health routes."""
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get("/healthz", self.handle_health)
+        app.on_startup.append(self._start_consumers)
+        app.on_shutdown.append(self._stop_consumers)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Validate an incoming update and queue it."""
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, self.secret_token):
+            return web.Response(status=401)
+
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            return web.Response(status=400)
+
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            logger.warning("Webhook queue is full, rejecting update %s", update.update_id)
+            return web.Response(status=503)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Report queue load for the load balancer."""
+        return web.json_response({"queued": self.queue.qsize(), "capacity": self.queue.maxsize})
+
+    async def _consume(self) -> None:
+        while True:
+            update = await self.queue.get()
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception:
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                self.queue.task_done()
+
+    async def _start_consumers(self, app: web.Application) -> None:
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def _stop_consumers(self, app: web.Application) -> None:
+        # Let accepted updates finish before shutting down
+        await self.queue.join()
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+
+async def run_webhook(
+    server: WebhookServer,
+    url: str,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    ssl_cert: Optional[str] = None,
+    ssl_key: Optional[str] = None,
+) -> None:
+    """Register the webhook with Telegram and serve until cancelled.
+
+    Behind a TLS-terminating proxy ``url`` is the public https address and
+    the server listens on plain HTTP; with ``ssl_cert``/``ssl_key`` it
+    terminates TLS itself and uploads the certificate to Telegram.
+    """
+    ssl_context = None
+    certificate = None
+    if ssl_cert and ssl_key:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(ssl_cert, ssl_key)
+        certificate = FSInputFile(ssl_cert)
+
+    runner = web.AppRunner(server.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, ssl_context=ssl_context)
+    await site.start()
+    await server.bot.set_webhook(
+        url=url.rstrip("/") + server.path,
+        secret_token=server.secret_token,
+        certificate=certificate,
+        allowed_updates=server.dp.resolve_used_update_types(),
+    )
+    logger.info(f"Webhook server listening on {host}:{port}{server.path}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -9,8 +9,74 @@ from dotenv import load_dotenv
 # Load .env file if it exists
 load_dotenv()
 
+
+def _optional_int(name: str, default: str) -> int | None:
+    """Read integer setting; an empty value means "not set"."""
+    value = os.getenv(name, default)
+    return int(value) if value else None
+
+
 # Bot token from environment
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
 
+# Bot API base URL; empty means api.telegram.org (set to a local server for load tests)
+BOT_API_URL = os.getenv("BOT_API_URL", "")
+
+# How updates are received: "polling" or "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+
+# Webhook mode: public https URL (usually a TLS-terminating proxy), secret
+# token checked on every request, and the local address to listen on
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Only needed when the bot terminates TLS itself (self-signed certificate)
+WEBHOOK_SSL_CERT = os.getenv("WEBHOOK_SSL_CERT", "") or None
+WEBHOOK_SSL_KEY = os.getenv("WEBHOOK_SSL_KEY", "") or None
+# Updates accepted but not yet processed; more are rejected with 503
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+
+# Local Prometheus endpoint (GET /metrics); empty port disables metrics.
+# With WORKER_PROCESSES > 1 worker N listens on METRICS_PORT + 1 + N instead
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "") or 0) or None
+
+# Chat that keeps the lists recorded before chats were partitioned (group 0),
+# e.g. the id of a group chat created for the people who used the bot before
+LEGACY_GROUP_CHAT_ID = int(os.getenv("LEGACY_GROUP_CHAT_ID", "") or 0) or None
+
+# Worker processes; with more than one, updates are sharded by chat group
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "1"))
+
 # Database path
 DB_PATH = os.getenv("DB_PATH", str(Path(__file__).parent.parent / "moviebot.db"))
+
+# Number of users kept in the identity middleware cache
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+# Rendered "мой список" / "наш список" replies kept until the list changes
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "4096"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Dialog state ("добавить фильм", rating buttons) lifetime in seconds
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", "3600"))
+# Optional snapshot file that keeps open dialogs across restarts
+CONVERSATION_STATE_PATH = os.getenv("CONVERSATION_STATE_PATH", "") or None
+
+# SQLite tuning (empty value keeps the SQLite default)
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL") or None
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL") or None
+DB_MMAP_SIZE = _optional_int("DB_MMAP_SIZE", str(64 * 1024 * 1024))
+DB_CACHE_SIZE = _optional_int("DB_CACHE_SIZE", "-16000")  # negative = KiB
+DB_BUSY_TIMEOUT_MS = _optional_int("DB_BUSY_TIMEOUT_MS", "5000")
+# Read-only connections used next to the single writer
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+# Log statements slower than this with their query plan (empty = no tracing)
+DB_SLOW_QUERY_MS = _optional_int("DB_SLOW_QUERY_MS", "")
+# While tracing, report a statement run this many times in one update (N+1)
+DB_QUERY_REPEAT_THRESHOLD = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", "10"))
+# Commits of writes finishing within this window are merged into one (0 = off)
+DB_COMMIT_DELAY_MS = int(os.getenv("DB_COMMIT_DELAY_MS", "0"))
@@ -1,4 +1,17 @@
-from .connection import Database
-from .migrations import run_migrations
+from .connection import Database, DatabaseSettings
+from .migrations import DEFAULT_GROUP_ID, run_migrations
+from .tracing import QueryTracer
+from .versions import DataVersions
+from .worker import DatabaseWorker, AsyncService, read_only
 
-__all__ = ["Database", "run_migrations"]
+__all__ = [
+    "Database",
+    "DatabaseSettings",
+    "DEFAULT_GROUP_ID",
+    "run_migrations",
+    "QueryTracer",
+    "DataVersions",
+    "DatabaseWorker",
+    "AsyncService",
+    "read_only",
+]
@@ -1,41 +1,256 @@
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
+
+from src.utils import normalize_title
+from src.utils.metrics import current_update_stats
+from .tracing import QueryTracer, TracedCursor
+from .versions import DataVersions
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _normalize_title(value: Optional[str]) -> Optional[str]:
+    return normalize_title(value) if value is not None else None
+
+
+def _counting_row(cursor: sqlite3.Cursor, row: tuple) -> sqlite3.Row:
+    """sqlite3.Row factory that counts fetched rows for the current update."""
+    stats = current_update_stats.get()
+    if stats is not None:
+        stats.rows_read += 1
+    return sqlite3.Row(cursor, row)
+
+
+@dataclass
+class DatabaseSettings:
+    """SQLite tuning options. None keeps the SQLite default."""
+
+    journal_mode: Optional[str] = None  # e.g. "WAL"
+    synchronous: Optional[str] = None  # e.g. "NORMAL"
+    mmap_size: Optional[int] = None  # bytes
+    cache_size: Optional[int] = None  # pages, or KiB if negative
+    busy_timeout: Optional[int] = None  # milliseconds
+    read_pool_size: int = 0  # read-only connections next to the writer
+
+    def __post_init__(self):
+        if self.journal_mode is not None:
+            self.journal_mode = self.journal_mode.upper()
+            if self.journal_mode not in JOURNAL_MODES:
+                raise ValueError(f"Unknown journal mode: {self.journal_mode}")
+        if self.synchronous is not None:
+            self.synchronous = self.synchronous.upper()
+            if self.synchronous not in SYNCHRONOUS_MODES:
+                raise ValueError(f"Unknown synchronous mode: {self.synchronous}")
 
 
 class Database:
-    """SQLite database connection manager."""
+    """SQLite database connection manager.
+
+    Owns one writer connection and, if configured, a pool of read-only
+    connections. Inside ``with db.reader():`` the calling thread's queries
+    run on a pooled reader instead of the writer. Inside
+    ``with db.transaction():`` writes are atomic and ``commit()`` is deferred.
+    An instrumented database counts queries, rows and commit time into the
+    current update's UpdateStats (see src.utils.metrics); a ``tracer`` times
+    every statement and logs slow ones with their query plan. ``versions``
+    counts committed changes per scope for caches of derived data.
+    """
 
-    def __init__(self, db_path: str = "moviebot.db"):
+    def __init__(
+        self,
+        db_path: str = "moviebot.db",
+        settings: Optional[DatabaseSettings] = None,
+        instrumented: bool = False,
+        tracer: Optional[QueryTracer] = None,
+    ):
         self.db_path = db_path
+        self.settings = settings or DatabaseSettings()
+        self.instrumented = instrumented
+        self.tracer = tracer
         self._connection: Optional[sqlite3.Connection] = None
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._all_readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._local = threading.local()
+        self._tx_depth = 0
+        self._rollback_hooks: list[Callable[[], None]] = []
+        self.versions = DataVersions()
 
     def connect(self) -> sqlite3.Connection:
-        """Get or create database connection."""
+        """Get or create database connection for the current thread."""
+        reader = getattr(self._local, "reader", None)
+        if reader is not None:
+            return reader
         if self._connection is None:
             self._connection = sqlite3.connect(self.db_path)
-            self._connection.row_factory = sqlite3.Row
-            self._connection.execute("PRAGMA foreign_keys = ON")
+            self._configure(self._connection)
+            if self.settings.journal_mode:
+                self._connection.execute(f"PRAGMA journal_mode = {self.settings.journal_mode}")
         return self._connection
 
+    def _configure(self, connection: sqlite3.Connection) -> None:
+        """Apply row factory, pragmas and SQL functions to a new connection."""
+        connection.row_factory = _counting_row if self.instrumented else sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        settings = self.settings
+        if settings.busy_timeout is not None:
+            connection.execute(f"PRAGMA busy_timeout = {int(settings.busy_timeout)}")
+        if settings.synchronous:
+            connection.execute(f"PRAGMA synchronous = {settings.synchronous}")
+        if settings.cache_size is not None:
+            connection.execute(f"PRAGMA cache_size = {int(settings.cache_size)}")
+        if settings.mmap_size is not None:
+            connection.execute(f"PRAGMA mmap_size = {int(settings.mmap_size)}")
+        # Same title key as in Python (SQLite's lower() only folds ASCII)
+        connection.create_function("normalize_title", 1, _normalize_title, deterministic=True)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._configure(connection)
+        return connection
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Route the current thread's queries to a pooled read-only connection.
+
+        Falls back to the writer when no read pool is configured.
+        """
+        if self.settings.read_pool_size <= 0 or getattr(self._local, "reader", None) is not None:
+            yield self.connect()
+            return
+
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            with self._readers_lock:
+                can_open = len(self._all_readers) < self.settings.read_pool_size
+                if can_open:
+                    connection = self._open_reader()
+                    self._all_readers.append(connection)
+            if not can_open:
+                connection = self._readers.get()
+
+        self._local.reader = connection
+        try:
+            yield connection
+        finally:
+            self._local.reader = None
+            if connection.in_transaction:
+                connection.rollback()
+            self._readers.put(connection)
+
+    @contextmanager
+    def transaction(self, commit: bool = True) -> Iterator[sqlite3.Connection]:
+        """Run a block of writes atomically on the writer connection.
+
+        Each block is a savepoint, so nested blocks and blocks of different
+        callers sharing one open transaction roll back independently.
+        ``commit()`` calls inside are no-ops; the outermost block commits on
+        exit unless ``commit=False`` leaves that to a later ``commit()``.
+        """
+        connection = self.connect()
+        if self._tx_depth == 0 and not connection.in_transaction:
+            # Take the write lock up front: a deferred transaction that reads
+            # first cannot wait for another process's writer and fails instead
+            connection.execute("BEGIN IMMEDIATE")
+        savepoint = f"sp_{self._tx_depth}"
+        connection.execute(f"SAVEPOINT {savepoint}")
+        self._tx_depth += 1
+        try:
+            yield connection
+        except BaseException:
+            connection.execute(f"ROLLBACK TO {savepoint}")
+            self.versions.publish(committed=False)
+            for hook in self._rollback_hooks:
+                hook()
+            raise
+        finally:
+            connection.execute(f"RELEASE {savepoint}")
+            self._tx_depth -= 1
+            if commit and self._tx_depth == 0:
+                self._commit(connection)
+
+    def on_rollback(self, hook: Callable[[], None]) -> None:
+        """Register a callback run after a transaction block is rolled back."""
+        self._rollback_hooks.append(hook)
+
     def close(self) -> None:
-        """Close database connection."""
+        """Close all database connections."""
         if self._connection is not None:
             self._connection.close()
             self._connection = None
+        with self._readers_lock:
+            for connection in self._all_readers:
+                connection.close()
+            self._all_readers.clear()
+            self._readers = queue.Queue()
 
     def execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
         """Execute SQL query."""
-        return self.connect().execute(sql, params)
+        connection = self.connect()
+        if self.tracer is None:
+            cursor = connection.execute(sql, params)
+        else:
+            # Recorded once the rows are fetched, so the time includes them
+            cursor = connection.cursor(TracedCursor).run(self.tracer, sql, params)
+        if self.instrumented:
+            self._count_query(cursor)
+        return cursor
 
     def executemany(self, sql: str, params_list: list) -> sqlite3.Cursor:
         """Execute SQL query with multiple parameter sets."""
-        return self.connect().executemany(sql, params_list)
+        connection = self.connect()
+        if self.tracer is None:
+            cursor = connection.executemany(sql, params_list)
+        else:
+            started = time.perf_counter()
+            cursor = connection.executemany(sql, params_list)
+            self.tracer.record(connection, sql, None, time.perf_counter() - started)
+        if self.instrumented:
+            self._count_query(cursor)
+        return cursor
 
     def commit(self) -> None:
-        """Commit current transaction."""
-        if self._connection is not None:
-            self._connection.commit()
+        """Commit current transaction (deferred inside ``transaction()``)."""
+        if self._connection is not None and self._tx_depth == 0:
+            self._commit(self._connection)
+
+    def rollback(self) -> None:
+        """Roll back the open transaction (outside ``transaction()`` blocks)."""
+        if self._connection is None or self._tx_depth:
+            return
+        self._connection.rollback()
+        self.versions.publish()
+        for hook in self._rollback_hooks:
+            hook()
+
+    def _commit(self, connection: sqlite3.Connection) -> None:
+        if not self.instrumented:
+            connection.commit()
+        else:
+            started = time.perf_counter()
+            connection.commit()
+            stats = current_update_stats.get()
+            if stats is not None:
+                stats.commit_seconds += time.perf_counter() - started
+        self.versions.publish()
+
+    @staticmethod
+    def _count_query(cursor: sqlite3.Cursor) -> None:
+        stats = current_update_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            # rowcount is -1 for SELECT; fetched rows are counted by _counting_row
+            if cursor.rowcount > 0:
+                stats.rows_written += cursor.rowcount
 
     def __enter__(self) -> "Database":
         self.connect()
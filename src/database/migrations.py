@@ -1,7 +1,12 @@
 """Database schema and migrations."""
 
+import sqlite3
+
 from .connection import Database
 
+# Partition used for private chats and rows created before group scoping
+DEFAULT_GROUP_ID = 0
+
 SCHEMA = """
 -- Users (auto-register on /start)
 CREATE TABLE IF NOT EXISTS users (
@@ -57,8 +62,273 @@ CREATE INDEX IF NOT EXISTS idx_history_date ON watch_history(watched_at);
 CREATE INDEX IF NOT EXISTS idx_history_title ON watch_history(movie_title_lower);
 """
 
+# Incremental migrations applied on top of SCHEMA.
+# Each entry bumps PRAGMA user_version by one; never edit an applied entry.
+MIGRATIONS = [
+    # 1: Chat-scoped partitions - every table gets a leading group_id
+    """
+    CREATE TABLE users_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        group_id INTEGER NOT NULL DEFAULT 0,
+        telegram_id INTEGER NOT NULL,
+        display_name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(group_id, telegram_id)
+    );
+    INSERT INTO users_new (id, telegram_id, display_name, created_at)
+        SELECT id, telegram_id, display_name, created_at FROM users;
+    DROP TABLE users;
+    ALTER TABLE users_new RENAME TO users;
+
+    ALTER TABLE wishlist ADD COLUMN group_id INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE watch_history ADD COLUMN group_id INTEGER NOT NULL DEFAULT 0;
+
+    CREATE TABLE bot_state_new (
+        group_id INTEGER NOT NULL DEFAULT 0,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (group_id, key)
+    );
+    INSERT INTO bot_state_new (key, value) SELECT key, value FROM bot_state;
+    DROP TABLE bot_state;
+    ALTER TABLE bot_state_new RENAME TO bot_state;
+
+    DROP INDEX IF EXISTS idx_wishlist_title;
+    DROP INDEX IF EXISTS idx_history_date;
+    DROP INDEX IF EXISTS idx_history_title;
+    CREATE INDEX idx_wishlist_group_title ON wishlist(group_id, movie_title_lower);
+    CREATE INDEX idx_history_group_date ON watch_history(group_id, watched_at);
+    CREATE INDEX idx_history_group_title ON watch_history(group_id, movie_title_lower);
+    """,
+    # 2: Materialized "наш список" - wanted-by counts maintained by triggers
+    """
+    CREATE TABLE shared_wishlist (
+        group_id INTEGER NOT NULL,
+        movie_title_lower TEXT NOT NULL,
+        movie_title TEXT NOT NULL,
+        user_count INTEGER NOT NULL,
+        PRIMARY KEY (group_id, movie_title_lower)
+    );
+    CREATE INDEX idx_shared_group_count ON shared_wishlist(group_id, user_count);
+
+    -- Number of users with a non-empty wishlist per group
+    CREATE TABLE wishlist_group_stats (
+        group_id INTEGER PRIMARY KEY,
+        active_users INTEGER NOT NULL
+    );
+
+    INSERT INTO shared_wishlist (group_id, movie_title_lower, movie_title, user_count)
+        SELECT group_id, movie_title_lower, MIN(movie_title), COUNT(*)
+        FROM wishlist GROUP BY group_id, movie_title_lower;
+    INSERT INTO wishlist_group_stats (group_id, active_users)
+        SELECT group_id, COUNT(DISTINCT user_id) FROM wishlist GROUP BY group_id;
+
+    -- Deleting a user cascades to wishlist, which fires the delete trigger
+    CREATE TRIGGER trg_wishlist_insert_shared AFTER INSERT ON wishlist
+    BEGIN
+        INSERT INTO shared_wishlist (group_id, movie_title_lower, movie_title, user_count)
+            VALUES (NEW.group_id, NEW.movie_title_lower, NEW.movie_title, 1)
+            ON CONFLICT (group_id, movie_title_lower) DO UPDATE SET user_count = user_count + 1;
+        INSERT INTO wishlist_group_stats (group_id, active_users)
+            SELECT NEW.group_id, 1
+            WHERE NOT EXISTS (SELECT 1 FROM wishlist WHERE user_id = NEW.user_id AND id != NEW.id)
+            ON CONFLICT (group_id) DO UPDATE SET active_users = active_users + 1;
+    END;
+
+    CREATE TRIGGER trg_wishlist_delete_shared AFTER DELETE ON wishlist
+    BEGIN
+        UPDATE shared_wishlist SET user_count = user_count - 1
+            WHERE group_id = OLD.group_id AND movie_title_lower = OLD.movie_title_lower;
+        DELETE FROM shared_wishlist
+            WHERE group_id = OLD.group_id AND movie_title_lower = OLD.movie_title_lower
+              AND user_count <= 0;
+        UPDATE wishlist_group_stats SET active_users = active_users - 1
+            WHERE group_id = OLD.group_id
+              AND NOT EXISTS (SELECT 1 FROM wishlist WHERE user_id = OLD.user_id);
+    END;
+
+    -- Moving a user to another group moves their titles with them
+    CREATE TRIGGER trg_users_group_shared AFTER UPDATE OF group_id ON users
+    WHEN NEW.group_id != OLD.group_id
+        AND EXISTS (SELECT 1 FROM wishlist WHERE user_id = NEW.id)
+    BEGIN
+        UPDATE wishlist_group_stats SET active_users = active_users - 1
+            WHERE group_id = OLD.group_id;
+        INSERT INTO wishlist_group_stats (group_id, active_users) VALUES (NEW.group_id, 1)
+            ON CONFLICT (group_id) DO UPDATE SET active_users = active_users + 1;
+        UPDATE wishlist SET group_id = NEW.group_id WHERE user_id = NEW.id;
+    END;
+
+    CREATE TRIGGER trg_wishlist_update_shared AFTER UPDATE OF group_id, movie_title_lower ON wishlist
+    BEGIN
+        UPDATE shared_wishlist SET user_count = user_count - 1
+            WHERE group_id = OLD.group_id AND movie_title_lower = OLD.movie_title_lower;
+        DELETE FROM shared_wishlist
+            WHERE group_id = OLD.group_id AND movie_title_lower = OLD.movie_title_lower
+              AND user_count <= 0;
+        INSERT INTO shared_wishlist (group_id, movie_title_lower, movie_title, user_count)
+            VALUES (NEW.group_id, NEW.movie_title_lower, NEW.movie_title, 1)
+            ON CONFLICT (group_id, movie_title_lower) DO UPDATE SET user_count = user_count + 1;
+    END;
+    """,
+    # 3: Dialog state moved to the in-memory conversation store
+    """
+    DELETE FROM bot_state WHERE key LIKE 'awaiting_movie:%' OR key LIKE 'pending_movie:%';
+    """,
+    # 4: Monthly history rollups - watched count per (group, month, rating),
+    # rating 0 = unrated; totals, averages and histograms sum these rows
+    """
+    CREATE TABLE history_stats_monthly (
+        group_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        rating INTEGER NOT NULL,
+        watched_count INTEGER NOT NULL,
+        PRIMARY KEY (group_id, month, rating)
+    ) WITHOUT ROWID;
+
+    INSERT INTO history_stats_monthly (group_id, month, rating, watched_count)
+        SELECT group_id, substr(watched_at, 1, 7), COALESCE(rating, 0), COUNT(*)
+        FROM watch_history GROUP BY 1, 2, 3;
+
+    CREATE TRIGGER trg_history_insert_stats AFTER INSERT ON watch_history
+    BEGIN
+        INSERT INTO history_stats_monthly (group_id, month, rating, watched_count)
+            VALUES (NEW.group_id, substr(NEW.watched_at, 1, 7), COALESCE(NEW.rating, 0), 1)
+            ON CONFLICT (group_id, month, rating) DO UPDATE SET watched_count = watched_count + 1;
+    END;
+
+    CREATE TRIGGER trg_history_delete_stats AFTER DELETE ON watch_history
+    BEGIN
+        UPDATE history_stats_monthly SET watched_count = watched_count - 1
+            WHERE group_id = OLD.group_id AND month = substr(OLD.watched_at, 1, 7)
+              AND rating = COALESCE(OLD.rating, 0);
+        DELETE FROM history_stats_monthly
+            WHERE group_id = OLD.group_id AND month = substr(OLD.watched_at, 1, 7)
+              AND rating = COALESCE(OLD.rating, 0) AND watched_count <= 0;
+    END;
+
+    CREATE TRIGGER trg_history_update_stats
+    AFTER UPDATE OF group_id, watched_at, rating ON watch_history
+    BEGIN
+        UPDATE history_stats_monthly SET watched_count = watched_count - 1
+            WHERE group_id = OLD.group_id AND month = substr(OLD.watched_at, 1, 7)
+              AND rating = COALESCE(OLD.rating, 0);
+        DELETE FROM history_stats_monthly
+            WHERE group_id = OLD.group_id AND month = substr(OLD.watched_at, 1, 7)
+              AND rating = COALESCE(OLD.rating, 0) AND watched_count <= 0;
+        INSERT INTO history_stats_monthly (group_id, month, rating, watched_count)
+            VALUES (NEW.group_id, substr(NEW.watched_at, 1, 7), COALESCE(NEW.rating, 0), 1)
+            ON CONFLICT (group_id, month, rating) DO UPDATE SET watched_count = watched_count + 1;
+    END;
+    """,
+    # 5: Full-text index of history titles for "мы смотрели ...?" search;
+    # external content table, rows are the watch_history ids
+    """
+    CREATE VIRTUAL TABLE history_fts USING fts5(
+        movie_title,
+        content = 'watch_history',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+    INSERT INTO history_fts (history_fts) VALUES ('rebuild');
+
+    CREATE TRIGGER trg_history_insert_fts AFTER INSERT ON watch_history
+    BEGIN
+        INSERT INTO history_fts (rowid, movie_title) VALUES (NEW.id, NEW.movie_title);
+    END;
+
+    CREATE TRIGGER trg_history_delete_fts AFTER DELETE ON watch_history
+    BEGIN
+        INSERT INTO history_fts (history_fts, rowid, movie_title)
+            VALUES ('delete', OLD.id, OLD.movie_title);
+    END;
+
+    CREATE TRIGGER trg_history_update_fts AFTER UPDATE OF movie_title ON watch_history
+    BEGIN
+        INSERT INTO history_fts (history_fts, rowid, movie_title)
+            VALUES ('delete', OLD.id, OLD.movie_title);
+        INSERT INTO history_fts (rowid, movie_title) VALUES (NEW.id, NEW.movie_title);
+    END;
+    """,
+    # 6: Titles compare by normalize_title() (NFKC, casefold, ё -> е, single
+    # spaces) stored in title_key; the full-text index moves to the key too
+    """
+    DROP TRIGGER trg_history_insert_fts;
+    DROP TRIGGER trg_history_delete_fts;
+    DROP TRIGGER trg_history_update_fts;
+    DROP TABLE history_fts;
+
+    ALTER TABLE wishlist RENAME COLUMN movie_title_lower TO title_key;
+    ALTER TABLE watch_history RENAME COLUMN movie_title_lower TO title_key;
+    ALTER TABLE shared_wishlist RENAME COLUMN movie_title_lower TO title_key;
+
+    -- "Ёлки" and "Елки" in one wishlist are now the same movie
+    DELETE FROM wishlist WHERE id NOT IN (
+        SELECT MIN(id) FROM wishlist GROUP BY user_id, normalize_title(movie_title)
+    );
+    UPDATE wishlist SET title_key = normalize_title(movie_title)
+        WHERE title_key != normalize_title(movie_title);
+    UPDATE watch_history SET title_key = normalize_title(movie_title)
+        WHERE title_key != normalize_title(movie_title);
+
+    CREATE VIRTUAL TABLE history_fts USING fts5(
+        title_key,
+        content = 'watch_history',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+    INSERT INTO history_fts (history_fts) VALUES ('rebuild');
+
+    CREATE TRIGGER trg_history_insert_fts AFTER INSERT ON watch_history
+    BEGIN
+        INSERT INTO history_fts (rowid, title_key) VALUES (NEW.id, NEW.title_key);
+    END;
+
+    CREATE TRIGGER trg_history_delete_fts AFTER DELETE ON watch_history
+    BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title_key)
+            VALUES ('delete', OLD.id, OLD.title_key);
+    END;
+
+    CREATE TRIGGER trg_history_update_fts AFTER UPDATE OF title_key ON watch_history
+    BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title_key)
+            VALUES ('delete', OLD.id, OLD.title_key);
+        INSERT INTO history_fts (rowid, title_key) VALUES (NEW.id, NEW.title_key);
+    END;
+    """,
+    # 7: Best movie of a period: the latest one with a given rating is an
+    # index seek (id, the rowid, breaks ties within a day)
+    """
+    CREATE INDEX idx_history_group_rating_date ON watch_history(group_id, rating, watched_at);
+    """,
+]
+
+
+def get_schema_version(db: Database) -> int:
+    """Get number of applied migrations."""
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
 
 def run_migrations(db: Database) -> None:
-    """Initialize database schema."""
-    db.connect().executescript(SCHEMA)
-    db.commit()
+    """Initialize database schema and apply pending migrations."""
+    connection = db.connect()
+    if get_schema_version(db) == 0:
+        # Baseline schema; later migrations may drop its indexes
+        connection.executescript(SCHEMA)
+        db.commit()
+
+    for version, script in enumerate(MIGRATIONS, 1):
+        if version <= get_schema_version(db):
+            continue
+        # Table rebuilds must not trigger ON DELETE CASCADE
+        connection.execute("PRAGMA foreign_keys = OFF")
+        try:
+            connection.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            connection.rollback()
+            raise
+        finally:
+            connection.execute("PRAGMA foreign_keys = ON")
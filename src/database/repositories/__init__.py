@@ -1,7 +1,9 @@
 from .user_repo import UserRepository, User
 from .wishlist_repo import WishlistRepository, WishlistItem
-from .history_repo import HistoryRepository, HistoryItem
+from .history_repo import HistoryRepository, HistoryItem, HistoryCursor, PeriodStats, MonthStats
 from .state_repo import StateRepository
+from .selection_repo import SelectionRepository, PickStats
+from .title_repo import TitleRepository
 
 __all__ = [
     "UserRepository",
@@ -10,5 +12,11 @@ __all__ = [
     "WishlistItem",
     "HistoryRepository",
     "HistoryItem",
+    "HistoryCursor",
+    "PeriodStats",
+    "MonthStats",
     "StateRepository",
+    "SelectionRepository",
+    "PickStats",
+    "TitleRepository",
 ]
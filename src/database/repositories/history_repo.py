@@ -1,9 +1,23 @@
 """Watch history repository for database operations."""
 
-from dataclasses import dataclass
-from datetime import date
-from typing import Optional
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Iterator, Optional
+from src.utils import normalize_title
 from ..connection import Database
+from ..migrations import DEFAULT_GROUP_ID
+
+_WORD = re.compile(r"\w+")
+
+
+def _match_query(text: str) -> Optional[str]:
+    """FTS5 query matching every word of text as a prefix, or None."""
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
 
 
 @dataclass
@@ -14,20 +28,64 @@ class HistoryItem:
     watched_at: date
 
 
+@dataclass(frozen=True)
+class HistoryCursor:
+    """Position in history ordered by (watched_at, id)."""
+
+    watched_at: date
+    id: int
+
+    @classmethod
+    def of(cls, item: HistoryItem) -> "HistoryCursor":
+        return cls(watched_at=item.watched_at, id=item.id)
+
+
+@dataclass
+class PeriodStats:
+    count: int
+    average_rating: float
+
+
+@dataclass
+class MonthStats:
+    """Rollup of one month of a group's history."""
+
+    month: date  # First day of the month
+    count: int = 0
+    rated_count: int = 0
+    rating_sum: int = 0
+    histogram: dict[int, int] = field(default_factory=dict)  # rating -> count
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rated_count if self.rated_count else 0.0
+
+
 class HistoryRepository:
-    """Repository for watch_history table operations."""
+    """Repository for watch_history table operations.
+
+    Writes touch the ``("group", id)`` data version.
+    """
 
     def __init__(self, db: Database):
         self.db = db
 
-    def add(self, movie_title: str, rating: int, watched_at: date, user_id: int) -> HistoryItem:
-        """Add movie to watch history."""
+    def add(
+        self,
+        movie_title: str,
+        rating: int,
+        watched_at: date,
+        user_id: int,
+        group_id: int = DEFAULT_GROUP_ID,
+    ) -> HistoryItem:
+        """Add movie to group's watch history."""
         cursor = self.db.execute(
             """INSERT INTO watch_history
-               (movie_title, movie_title_lower, rating, watched_at, marked_by_user_id)
-               VALUES (?, ?, ?, ?, ?)""",
-            (movie_title, movie_title.lower(), rating, watched_at.isoformat(), user_id),
+               (group_id, movie_title, title_key, rating, watched_at, marked_by_user_id)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (group_id, movie_title, normalize_title(movie_title), rating, watched_at.isoformat(), user_id),
         )
+        self.db.versions.touch(("group", group_id))
         self.db.commit()
         return HistoryItem(
             id=cursor.lastrowid,
@@ -36,10 +94,186 @@ class HistoryRepository:
             watched_at=watched_at,
         )
 
-    def get_all(self) -> list[HistoryItem]:
-        """Get all watch history ordered by date descending."""
+    def add_many(
+        self,
+        movies: list[tuple[str, int]],
+        watched_at: date,
+        user_id: int,
+        group_id: int = DEFAULT_GROUP_ID,
+    ) -> None:
+        """Add several (title, rating) pairs to group's watch history with one executemany."""
+        if not movies:
+            return
+        self.db.executemany(
+            """INSERT INTO watch_history
+               (group_id, movie_title, title_key, rating, watched_at, marked_by_user_id)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            [
+                (group_id, title, normalize_title(title), rating, watched_at.isoformat(), user_id)
+                for title, rating in movies
+            ],
+        )
+        self.db.versions.touch(("group", group_id))
+        self.db.commit()
+
+    def get_all(self, group_id: int = DEFAULT_GROUP_ID) -> list[HistoryItem]:
+        """Get group's watch history ordered by date descending."""
+        cursor = self.db.execute(
+            """SELECT id, movie_title, rating, watched_at FROM watch_history
+               WHERE group_id = ? ORDER BY watched_at DESC""",
+            (group_id,),
+        )
+        return [
+            HistoryItem(
+                id=row["id"],
+                movie_title=row["movie_title"],
+                rating=row["rating"],
+                watched_at=date.fromisoformat(row["watched_at"]),
+            )
+            for row in cursor.fetchall()
+        ]
+
+    def get_page(
+        self,
+        group_id: int,
+        since: date,
+        until: date,
+        limit: int,
+        older_than: Optional[HistoryCursor] = None,
+        newer_than: Optional[HistoryCursor] = None,
+    ) -> list[HistoryItem]:
+        """Get up to limit items watched in [since, until), newest first.
+
+        Keyset pagination: pass the last item of a page as ``older_than`` for
+        the next page, or the first one as ``newer_than`` for the previous.
+        Only the returned rows are read (idx_history_group_date).
+        """
+        conditions = ["group_id = ?", "watched_at >= ?", "watched_at < ?"]
+        params: list = [group_id, since.isoformat(), until.isoformat()]
+        order = "DESC"
+        if older_than is not None:
+            conditions.append("(watched_at, id) < (?, ?)")
+            params += [older_than.watched_at.isoformat(), older_than.id]
+        elif newer_than is not None:
+            conditions.append("(watched_at, id) > (?, ?)")
+            params += [newer_than.watched_at.isoformat(), newer_than.id]
+            order = "ASC"
+
+        cursor = self.db.execute(
+            f"""SELECT id, movie_title, rating, watched_at FROM watch_history
+               WHERE {" AND ".join(conditions)}
+               ORDER BY watched_at {order}, id {order} LIMIT ?""",
+            (*params, limit),
+        )
+        items = [
+            HistoryItem(
+                id=row["id"],
+                movie_title=row["movie_title"],
+                rating=row["rating"],
+                watched_at=date.fromisoformat(row["watched_at"]),
+            )
+            for row in cursor.fetchall()
+        ]
+        if order == "ASC":
+            items.reverse()
+        return items
+
+    def get_monthly_stats(self, group_id: int, since: date, until: date) -> list[MonthStats]:
+        """Get rollups of months overlapping [since, until), oldest first.
+
+        Reads history_stats_monthly (kept up to date by triggers), so the
+        cost depends on the number of months, not of watched movies.
+        """
+        cursor = self.db.execute(
+            """SELECT month, rating, watched_count FROM history_stats_monthly
+               WHERE group_id = ? AND month >= ? AND month <= ?
+               ORDER BY month""",
+            (group_id, since.isoformat()[:7], (until - timedelta(days=1)).isoformat()[:7]),
+        )
+        months: dict[str, MonthStats] = {}
+        for row in cursor.fetchall():
+            stats = months.get(row["month"])
+            if stats is None:
+                stats = months[row["month"]] = MonthStats(month=date.fromisoformat(row["month"] + "-01"))
+            count = row["watched_count"]
+            stats.count += count
+            if row["rating"]:
+                stats.rated_count += count
+                stats.rating_sum += row["rating"] * count
+                stats.histogram[row["rating"]] = count
+        return list(months.values())
+
+    def get_period_stats(self, group_id: int, since: date, until: date) -> PeriodStats:
+        """Get count and average rating of items watched in [since, until).
+
+        Whole-month periods are summed from the monthly rollups.
+        """
+        if since.day == 1 and until.day == 1:
+            months = self.get_monthly_stats(group_id, since, until)
+            rated_count = sum(m.rated_count for m in months)
+            return PeriodStats(
+                count=sum(m.count for m in months),
+                average_rating=sum(m.rating_sum for m in months) / rated_count if rated_count else 0.0,
+            )
+
+        row = self.db.execute(
+            """SELECT COUNT(*) AS cnt, AVG(rating) AS avg_rating FROM watch_history
+               WHERE group_id = ? AND watched_at >= ? AND watched_at < ?""",
+            (group_id, since.isoformat(), until.isoformat()),
+        ).fetchone()
+        return PeriodStats(count=row["cnt"], average_rating=row["avg_rating"] or 0.0)
+
+    def get_latest_with_rating(self, group_id: int, rating: int, since: date, until: date) -> Optional[str]:
+        """Title of the latest item rated ``rating`` in [since, until), or None.
+
+        One seek in idx_history_group_rating_date; same-day items go by id.
+        """
+        row = self.db.execute(
+            """SELECT movie_title FROM watch_history
+               WHERE group_id = ? AND rating = ? AND watched_at >= ? AND watched_at < ?
+               ORDER BY watched_at DESC, id DESC LIMIT 1""",
+            (group_id, rating, since.isoformat(), until.isoformat()),
+        ).fetchone()
+        return row["movie_title"] if row else None
+
+    def iter_export(self, group_id: int, batch_size: int = 500) -> Iterator[sqlite3.Row]:
+        """Stream (watched_at, movie_title, rating, marked_by) of a group's history, oldest first.
+
+        Rows are fetched ``batch_size`` at a time, so memory does not grow
+        with the history.
+        """
         cursor = self.db.execute(
-            "SELECT id, movie_title, rating, watched_at FROM watch_history ORDER BY watched_at DESC"
+            """SELECT h.watched_at, h.movie_title, h.rating, u.display_name AS marked_by
+               FROM watch_history h LEFT JOIN users u ON u.id = h.marked_by_user_id
+               WHERE h.group_id = ? ORDER BY h.watched_at, h.id""",
+            (group_id,),
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+
+    def get_total_count(self, group_id: int = DEFAULT_GROUP_ID) -> int:
+        """Get number of items in group's history (from the monthly rollups)."""
+        row = self.db.execute(
+            "SELECT COALESCE(SUM(watched_count), 0) AS cnt FROM history_stats_monthly WHERE group_id = ?",
+            (group_id,),
+        ).fetchone()
+        return row["cnt"]
+
+    def search(self, text: str, group_id: int = DEFAULT_GROUP_ID, limit: int = 10) -> list[HistoryItem]:
+        """Find history items whose title has words starting with every word of text.
+
+        Uses the history_fts full-text index; best matches first, then newest.
+        """
+        query = _match_query(normalize_title(text))
+        if query is None:
+            return []
+        cursor = self.db.execute(
+            """SELECT h.id, h.movie_title, h.rating, h.watched_at
+               FROM history_fts JOIN watch_history h ON h.id = history_fts.rowid
+               WHERE history_fts MATCH ? AND h.group_id = ?
+               ORDER BY history_fts.rank, h.watched_at DESC, h.id DESC
+               LIMIT ?""",
+            (query, group_id, limit),
         )
         return [
             HistoryItem(
@@ -51,16 +285,20 @@ class HistoryRepository:
             for row in cursor.fetchall()
         ]
 
-    def get_watched_titles_lower(self) -> set[str]:
-        """Get set of all watched movie titles (lowercase) for filtering."""
-        cursor = self.db.execute("SELECT DISTINCT movie_title_lower FROM watch_history")
-        return {row["movie_title_lower"] for row in cursor.fetchall()}
+    def get_watched_title_keys(self, group_id: int = DEFAULT_GROUP_ID) -> set[str]:
+        """Get set of group's watched title keys (normalize_title) for filtering."""
+        cursor = self.db.execute(
+            "SELECT DISTINCT title_key FROM watch_history WHERE group_id = ?",
+            (group_id,),
+        )
+        return {row["title_key"] for row in cursor.fetchall()}
 
-    def find_by_title(self, movie_title: str) -> Optional[HistoryItem]:
-        """Find movie in history by title (case-insensitive)."""
+    def find_by_title(self, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> Optional[HistoryItem]:
+        """Find movie in group's history by title (compared by normalize_title)."""
         cursor = self.db.execute(
-            "SELECT id, movie_title, rating, watched_at FROM watch_history WHERE movie_title_lower = ?",
-            (movie_title.lower(),),
+            """SELECT id, movie_title, rating, watched_at FROM watch_history
+               WHERE group_id = ? AND title_key = ?""",
+            (group_id, normalize_title(movie_title)),
         )
         row = cursor.fetchone()
         if row:
@@ -72,7 +310,10 @@ class HistoryRepository:
             )
         return None
 
-    def is_empty(self) -> bool:
-        """Check if history is empty."""
-        cursor = self.db.execute("SELECT COUNT(*) as cnt FROM watch_history")
+    def is_empty(self, group_id: int = DEFAULT_GROUP_ID) -> bool:
+        """Check if group's history is empty."""
+        cursor = self.db.execute(
+            "SELECT COUNT(*) as cnt FROM watch_history WHERE group_id = ?",
+            (group_id,),
+        )
         return cursor.fetchone()["cnt"] == 0
@@ -0,0 +1,105 @@
+"""Selection repository - movie night candidates computed inside SQLite."""
+
+from dataclasses import dataclass
+from typing import Optional
+from ..connection import Database
+
+# Candidate titles of a group (:group_id) for a pick:
+# - titles: unwatched wishlist titles (anti-join on watch_history)
+# - participants: users with at least one unwatched title; a list holding
+#   only watched titles does not veto the intersection
+# - shared: titles every participant wants (the trigger-maintained
+#   user_count of an unwatched title only counts participants), if at least
+#   two users take part
+# - candidates: shared titles, or all titles when nothing is shared
+# - choices: candidates without the last pick (:last_key), unless it is the only one
+_CHOICES_CTE = """
+WITH titles AS (
+    SELECT s.title_key, s.movie_title, s.user_count
+    FROM shared_wishlist s
+    WHERE s.group_id = :group_id
+      AND NOT EXISTS (
+          SELECT 1 FROM watch_history h
+          WHERE h.group_id = :group_id AND h.title_key = s.title_key
+      )
+),
+participants AS (
+    SELECT COUNT(DISTINCT w.user_id) AS user_count
+    FROM wishlist w
+    WHERE w.group_id = :group_id AND w.title_key IN (SELECT title_key FROM titles)
+),
+shared AS (
+    SELECT title_key, movie_title
+    FROM titles
+    WHERE user_count = (SELECT user_count FROM participants WHERE user_count >= 2)
+),
+candidates AS (
+    SELECT title_key, movie_title, 1 AS from_intersection FROM shared
+    UNION ALL
+    SELECT title_key, movie_title, 0 FROM titles
+    WHERE NOT EXISTS (SELECT 1 FROM shared)
+),
+last AS (
+    SELECT normalize_title(value) AS title_key FROM bot_state
+    WHERE group_id = :group_id AND key = :last_key
+),
+choices AS (
+    SELECT * FROM candidates
+    WHERE (SELECT COUNT(*) FROM candidates) = 1
+       OR title_key IS NOT (SELECT title_key FROM last)
+)
+"""
+
+
+@dataclass
+class PickStats:
+    has_movies: bool  # Any wishlist rows in the group, watched or not
+    pool_size: int  # Unwatched titles
+    choice_count: int  # Titles the pick is made from
+    from_intersection: bool
+    other_user_name: Optional[str]  # Set if the requesting user's list is empty
+
+
+class SelectionRepository:
+    """Repository for movie selection queries spanning several tables."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def get_pick_stats(self, group_id: int, user_id: int, last_key: str) -> PickStats:
+        """Get sizes of the selection pools in one statement."""
+        row = self.db.execute(
+            _CHOICES_CTE
+            + """
+            SELECT
+                EXISTS (SELECT 1 FROM shared_wishlist WHERE group_id = :group_id) AS has_movies,
+                (SELECT COUNT(*) FROM titles) AS pool_size,
+                (SELECT COUNT(*) FROM choices) AS choice_count,
+                EXISTS (SELECT 1 FROM shared) AS from_intersection,
+                (
+                    SELECT o.display_name FROM users o
+                    WHERE o.group_id = :group_id AND o.id != :user_id
+                      AND EXISTS (SELECT 1 FROM wishlist w WHERE w.user_id = o.id)
+                      AND NOT EXISTS (SELECT 1 FROM wishlist w WHERE w.user_id = :user_id)
+                    ORDER BY o.id
+                    LIMIT 1
+                ) AS other_user_name
+            """,
+            {"group_id": group_id, "user_id": user_id, "last_key": last_key},
+        ).fetchone()
+        return PickStats(
+            has_movies=bool(row["has_movies"]),
+            pool_size=row["pool_size"],
+            choice_count=row["choice_count"],
+            from_intersection=bool(row["from_intersection"]),
+            other_user_name=row["other_user_name"],
+        )
+
+    def get_choice(self, group_id: int, last_key: str, offset: int) -> Optional[str]:
+        """Get title at offset among the choices ordered by title."""
+        row = self.db.execute(
+            _CHOICES_CTE
+            + "SELECT movie_title FROM choices ORDER BY title_key LIMIT 1 OFFSET :offset",
+            {"group_id": group_id, "last_key": last_key, "offset": offset},
+        ).fetchone()
+        return row["movie_title"] if row else None
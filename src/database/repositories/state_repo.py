@@ -2,6 +2,7 @@
 
 from typing import Optional
 from ..connection import Database
+from ..migrations import DEFAULT_GROUP_ID
 
 
 class StateRepository:
@@ -10,28 +11,28 @@ class StateRepository:
     def __init__(self, db: Database):
         self.db = db
 
-    def get(self, key: str) -> Optional[str]:
-        """Get value by key."""
+    def get(self, key: str, group_id: int = DEFAULT_GROUP_ID) -> Optional[str]:
+        """Get group's value by key."""
         cursor = self.db.execute(
-            "SELECT value FROM bot_state WHERE key = ?",
-            (key,),
+            "SELECT value FROM bot_state WHERE group_id = ? AND key = ?",
+            (group_id, key),
         )
         row = cursor.fetchone()
         return row["value"] if row else None
 
-    def set(self, key: str, value: str) -> None:
-        """Set value for key (insert or update)."""
+    def set(self, key: str, value: str, group_id: int = DEFAULT_GROUP_ID) -> None:
+        """Set group's value for key (insert or update)."""
         self.db.execute(
-            "INSERT OR REPLACE INTO bot_state (key, value) VALUES (?, ?)",
-            (key, value),
+            "INSERT OR REPLACE INTO bot_state (group_id, key, value) VALUES (?, ?, ?)",
+            (group_id, key, value),
         )
         self.db.commit()
 
-    def delete(self, key: str) -> bool:
-        """Delete key. Returns True if key existed."""
+    def delete(self, key: str, group_id: int = DEFAULT_GROUP_ID) -> bool:
+        """Delete group's key. Returns True if key existed."""
         cursor = self.db.execute(
-            "DELETE FROM bot_state WHERE key = ?",
-            (key,),
+            "DELETE FROM bot_state WHERE group_id = ? AND key = ?",
+            (group_id, key),
         )
         self.db.commit()
         return cursor.rowcount > 0
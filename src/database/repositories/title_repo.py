@@ -0,0 +1,79 @@
+"""Typo-tolerant lookup over every title a group has mentioned."""
+
+from typing import Collection, Optional
+
+from src.utils import CacheStats, TrigramIndex, normalize_title
+from ..connection import Database
+from ..migrations import DEFAULT_GROUP_ID
+
+
+class _GroupIndex:
+    """Trigram index of one group plus the canonical spelling of each key."""
+
+    def __init__(self) -> None:
+        self.index = TrigramIndex()
+        self.titles: dict[str, str] = {}  # title_key -> title
+
+    def add(self, movie_title: str) -> None:
+        key = normalize_title(movie_title)
+        if key not in self.titles:
+            self.titles[key] = movie_title
+            self.index.add(key)
+
+
+class TitleRepository:
+    """Fuzzy index of titles from a group's wishlists and watch history.
+
+    Titles stay known after they leave a wishlist, so a typo in a title
+    watched last year still finds it. The index of a group is loaded on
+    first use and extended by ``add`` after writes.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self._groups: dict[int, _GroupIndex] = {}
+        self.cache_stats = CacheStats()
+        db.on_rollback(self.invalidate_cache)
+
+    def _group_index(self, group_id: int) -> _GroupIndex:
+        """Get index of a group, loading it on first use."""
+        group = self._groups.get(group_id)
+        if group is not None:
+            self.cache_stats.hits += 1
+        else:
+            self.cache_stats.misses += 1
+            group = _GroupIndex()
+            cursor = self.db.execute(
+                """SELECT movie_title FROM wishlist WHERE group_id = ?
+                   UNION ALL
+                   SELECT movie_title FROM watch_history WHERE group_id = ?""",
+                (group_id, group_id),
+            )
+            for row in cursor.fetchall():
+                group.add(row["movie_title"])
+            self._groups[group_id] = group
+        return group
+
+    def invalidate_cache(self) -> None:
+        """Drop the in-memory index (e.g. after a rollback)."""
+        self._groups.clear()
+
+    def add(self, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> None:
+        """Remember a title that was just written to a wishlist or history."""
+        if group_id in self._groups:
+            self._groups[group_id].add(movie_title)
+
+    def find_closest(
+        self,
+        movie_title: str,
+        group_id: int = DEFAULT_GROUP_ID,
+        among: Optional[Collection[str]] = None,
+    ) -> Optional[str]:
+        """Known title a few typos away from movie_title, or None.
+
+        ``among`` limits the search to these title keys (normalize_title).
+        """
+        group = self._group_index(group_id)
+        accept = among.__contains__ if among is not None else None
+        key = group.index.closest(normalize_title(movie_title), accept=accept)
+        return group.titles[key] if key else None
@@ -3,6 +3,7 @@
 from dataclasses import dataclass
 from typing import Optional
 from ..connection import Database
+from ..migrations import DEFAULT_GROUP_ID
 
 
 @dataclass
@@ -10,6 +11,7 @@ class User:
     id: int
     telegram_id: int
     display_name: str
+    group_id: int = DEFAULT_GROUP_ID
 
 
 class UserRepository:
@@ -18,37 +20,55 @@ class UserRepository:
     def __init__(self, db: Database):
         self.db = db
 
-    def get_by_telegram_id(self, telegram_id: int) -> Optional[User]:
-        """Find user by Telegram ID."""
+    def get_by_telegram_id(self, telegram_id: int, group_id: int = DEFAULT_GROUP_ID) -> Optional[User]:
+        """Find user by Telegram ID within a group."""
         cursor = self.db.execute(
-            "SELECT id, telegram_id, display_name FROM users WHERE telegram_id = ?",
-            (telegram_id,),
+            """SELECT id, telegram_id, display_name, group_id FROM users
+               WHERE group_id = ? AND telegram_id = ?""",
+            (group_id, telegram_id),
         )
         row = cursor.fetchone()
         if row:
-            return User(id=row["id"], telegram_id=row["telegram_id"], display_name=row["display_name"])
+            return self._to_user(row)
         return None
 
-    def create(self, telegram_id: int, display_name: str) -> User:
-        """Create new user."""
+    def create(self, telegram_id: int, display_name: str, group_id: int = DEFAULT_GROUP_ID) -> User:
+        """Create new user in a group."""
         cursor = self.db.execute(
-            "INSERT INTO users (telegram_id, display_name) VALUES (?, ?)",
-            (telegram_id, display_name),
+            "INSERT INTO users (group_id, telegram_id, display_name) VALUES (?, ?, ?)",
+            (group_id, telegram_id, display_name),
         )
         self.db.commit()
-        return User(id=cursor.lastrowid, telegram_id=telegram_id, display_name=display_name)
+        return User(id=cursor.lastrowid, telegram_id=telegram_id, display_name=display_name, group_id=group_id)
 
-    def get_or_create(self, telegram_id: int, display_name: str) -> User:
+    def update_display_name(self, user_id: int, display_name: str) -> None:
+        """Update user's display name."""
+        self.db.execute(
+            "UPDATE users SET display_name = ? WHERE id = ?",
+            (display_name, user_id),
+        )
+        self.db.commit()
+
+    def get_or_create(self, telegram_id: int, display_name: str, group_id: int = DEFAULT_GROUP_ID) -> User:
         """Get existing user or create new one."""
-        user = self.get_by_telegram_id(telegram_id)
+        user = self.get_by_telegram_id(telegram_id, group_id)
         if user:
             return user
-        return self.create(telegram_id, display_name)
-
-    def get_all(self) -> list[User]:
-        """Get all users."""
-        cursor = self.db.execute("SELECT id, telegram_id, display_name FROM users")
-        return [
-            User(id=row["id"], telegram_id=row["telegram_id"], display_name=row["display_name"])
-            for row in cursor.fetchall()
-        ]
+        return self.create(telegram_id, display_name, group_id)
+
+    def get_all(self, group_id: int = DEFAULT_GROUP_ID) -> list[User]:
+        """Get all users of a group."""
+        cursor = self.db.execute(
+            "SELECT id, telegram_id, display_name, group_id FROM users WHERE group_id = ?",
+            (group_id,),
+        )
+        return [self._to_user(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _to_user(row) -> User:
+        return User(
+            id=row["id"],
+            telegram_id=row["telegram_id"],
+            display_name=row["display_name"],
+            group_id=row["group_id"],
+        )
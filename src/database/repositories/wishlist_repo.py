@@ -1,8 +1,11 @@
 """Wishlist repository for database operations."""
 
-from dataclasses import dataclass
-from typing import Optional
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from src.utils import CacheStats, normalize_title
 from ..connection import Database
+from ..migrations import DEFAULT_GROUP_ID
 
 
 @dataclass
@@ -12,26 +15,118 @@ class WishlistItem:
     movie_title: str
 
 
+@dataclass
+class _GroupTitles:
+    """In-memory title index of one group's wishlists."""
+
+    # title_key -> [canonical title, number of wishlists containing it]
+    titles: dict[str, list] = field(default_factory=dict)
+    # user_id -> set of title_key
+    users: dict[int, set[str]] = field(default_factory=dict)
+
+    def add(self, user_id: int, movie_title: str, title_key: str) -> None:
+        entry = self.titles.get(title_key)
+        if entry is None:
+            self.titles[title_key] = [movie_title, 1]
+        else:
+            entry[1] += 1
+        self.users.setdefault(user_id, set()).add(title_key)
+
+    def remove(self, user_id: int, title_key: str) -> None:
+        user_titles = self.users.get(user_id)
+        if user_titles is None or title_key not in user_titles:
+            return
+        user_titles.discard(title_key)
+        if not user_titles:
+            del self.users[user_id]
+        entry = self.titles[title_key]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.titles[title_key]
+
+    def remove_everywhere(self, title_key: str) -> None:
+        for user_id in [u for u, titles in self.users.items() if title_key in titles]:
+            self.remove(user_id, title_key)
+
+
 class WishlistRepository:
-    """Repository for wishlist table operations."""
+    """Repository for wishlist table operations.
+
+    Keeps a write-through index of titles per group so canonical-title and
+    membership lookups are dictionary hits instead of table scans. Writes
+    touch the ``("user", id)`` and ``("group", id)`` data versions.
+    """
 
     def __init__(self, db: Database):
         self.db = db
+        self._index: dict[int, _GroupTitles] = {}
+        self.cache_stats = CacheStats()
+        db.on_rollback(self.invalidate_cache)
+
+    def _group_titles(self, group_id: int) -> _GroupTitles:
+        """Get title index of a group, loading it on first use."""
+        index = self._index.get(group_id)
+        if index is not None:
+            self.cache_stats.hits += 1
+        else:
+            self.cache_stats.misses += 1
+            index = _GroupTitles()
+            cursor = self.db.execute(
+                """SELECT user_id, movie_title, title_key FROM wishlist
+                   WHERE group_id = ? ORDER BY id""",
+                (group_id,),
+            )
+            for row in cursor.fetchall():
+                index.add(row["user_id"], row["movie_title"], row["title_key"])
+            self._index[group_id] = index
+        return index
 
-    def add(self, user_id: int, movie_title: str) -> WishlistItem:
+    def invalidate_cache(self) -> None:
+        """Drop the in-memory index (e.g. after a rollback)."""
+        self._index.clear()
+
+    def get_canonical_title(self, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> Optional[str]:
+        """Get title as stored in group's wishlists (compared by normalize_title), or None."""
+        entry = self._group_titles(group_id).titles.get(normalize_title(movie_title))
+        return entry[0] if entry else None
+
+    def has_title(self, user_id: int, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> bool:
+        """Check if movie is in user's wishlist (compared by normalize_title)."""
+        return normalize_title(movie_title) in self._group_titles(group_id).users.get(user_id, ())
+
+    def add(self, user_id: int, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> WishlistItem:
         """Add movie to user's wishlist."""
+        title_key = normalize_title(movie_title)
         cursor = self.db.execute(
-            "INSERT INTO wishlist (user_id, movie_title, movie_title_lower) VALUES (?, ?, ?)",
-            (user_id, movie_title, movie_title.lower()),
+            "INSERT INTO wishlist (group_id, user_id, movie_title, title_key) VALUES (?, ?, ?, ?)",
+            (group_id, user_id, movie_title, title_key),
         )
+        self.db.versions.touch(("user", user_id), ("group", group_id))
         self.db.commit()
+        if group_id in self._index:
+            self._index[group_id].add(user_id, movie_title, title_key)
         return WishlistItem(id=cursor.lastrowid, user_id=user_id, movie_title=movie_title)
 
+    def add_many(self, user_id: int, movie_titles: list[str], group_id: int = DEFAULT_GROUP_ID) -> None:
+        """Add several movies to user's wishlist with one executemany."""
+        rows = [(group_id, user_id, title, normalize_title(title)) for title in movie_titles]
+        if not rows:
+            return
+        self.db.executemany(
+            "INSERT INTO wishlist (group_id, user_id, movie_title, title_key) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self.db.versions.touch(("user", user_id), ("group", group_id))
+        self.db.commit()
+        if group_id in self._index:
+            for _, _, movie_title, title_key in rows:
+                self._index[group_id].add(user_id, movie_title, title_key)
+
     def find_by_title(self, user_id: int, movie_title: str) -> Optional[WishlistItem]:
-        """Find movie in user's wishlist (case-insensitive)."""
+        """Find movie in user's wishlist (compared by normalize_title)."""
         cursor = self.db.execute(
-            "SELECT id, user_id, movie_title FROM wishlist WHERE user_id = ? AND movie_title_lower = ?",
-            (user_id, movie_title.lower()),
+            "SELECT id, user_id, movie_title FROM wishlist WHERE user_id = ? AND title_key = ?",
+            (user_id, normalize_title(movie_title)),
         )
         row = cursor.fetchone()
         if row:
@@ -49,35 +144,126 @@ class WishlistRepository:
             for row in cursor.fetchall()
         ]
 
-    def delete(self, user_id: int, movie_title: str) -> bool:
+    def delete(self, user_id: int, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> bool:
         """Remove movie from user's wishlist. Returns True if deleted."""
+        title_key = normalize_title(movie_title)
         cursor = self.db.execute(
-            "DELETE FROM wishlist WHERE user_id = ? AND movie_title_lower = ?",
-            (user_id, movie_title.lower()),
+            "DELETE FROM wishlist WHERE user_id = ? AND title_key = ?",
+            (user_id, title_key),
         )
+        if cursor.rowcount > 0:
+            self.db.versions.touch(("user", user_id), ("group", group_id))
         self.db.commit()
+        if group_id in self._index:
+            self._index[group_id].remove(user_id, title_key)
         return cursor.rowcount > 0
 
-    def delete_from_all(self, movie_title: str) -> int:
-        """Remove movie from all wishlists. Returns count of deleted items."""
-        cursor = self.db.execute(
-            "DELETE FROM wishlist WHERE movie_title_lower = ?",
-            (movie_title.lower(),),
+    def delete_many(self, user_id: int, movie_titles: list[str], group_id: int = DEFAULT_GROUP_ID) -> int:
+        """Remove several movies from user's wishlist. Returns count of deleted items."""
+        title_keys = [normalize_title(title) for title in movie_titles]
+        if not title_keys:
+            return 0
+        cursor = self.db.executemany(
+            "DELETE FROM wishlist WHERE user_id = ? AND title_key = ?",
+            [(user_id, title_key) for title_key in title_keys],
         )
+        if cursor.rowcount > 0:
+            self.db.versions.touch(("user", user_id), ("group", group_id))
         self.db.commit()
+        if group_id in self._index:
+            for title_key in title_keys:
+                self._index[group_id].remove(user_id, title_key)
         return cursor.rowcount
 
-    def get_all_movies(self) -> list[str]:
-        """Get all unique movie titles from all wishlists."""
+    def delete_from_all(self, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> int:
+        """Remove movie from all wishlists of a group. Returns count of deleted items."""
+        title_key = normalize_title(movie_title)
+        user_ids = [
+            row["user_id"]
+            for row in self.db.execute(
+                "DELETE FROM wishlist WHERE group_id = ? AND title_key = ? RETURNING user_id",
+                (group_id, title_key),
+            ).fetchall()
+        ]
+        if user_ids:
+            self.db.versions.touch(("group", group_id), *(("user", user_id) for user_id in user_ids))
+        self.db.commit()
+        if group_id in self._index:
+            self._index[group_id].remove_everywhere(title_key)
+        return len(user_ids)
+
+    def delete_many_from_all(self, movie_titles: list[str], group_id: int = DEFAULT_GROUP_ID) -> int:
+        """Remove several movies from all wishlists of a group in one statement.
+
+        Returns count of deleted items.
+        """
+        title_keys = list({normalize_title(title) for title in movie_titles})
+        if not title_keys:
+            return 0
+        placeholders = ", ".join("?" * len(title_keys))
+        rows = self.db.execute(
+            f"""DELETE FROM wishlist WHERE group_id = ? AND title_key IN ({placeholders})
+                RETURNING user_id""",
+            (group_id, *title_keys),
+        ).fetchall()
+        user_ids = {row["user_id"] for row in rows}
+        if user_ids:
+            self.db.versions.touch(("group", group_id), *(("user", user_id) for user_id in user_ids))
+        self.db.commit()
+        if group_id in self._index:
+            for title_key in title_keys:
+                self._index[group_id].remove_everywhere(title_key)
+        return len(rows)
+
+    def get_all_movies(self, group_id: int = DEFAULT_GROUP_ID) -> list[str]:
+        """Get all unique movie titles from all wishlists of a group."""
+        cursor = self.db.execute(
+            """SELECT MIN(movie_title) AS movie_title FROM wishlist
+               WHERE group_id = ? GROUP BY title_key ORDER BY title_key""",
+            (group_id,),
+        )
+        return [row["movie_title"] for row in cursor.fetchall()]
+
+    def iter_export(self, group_id: int, batch_size: int = 500) -> Iterator[sqlite3.Row]:
+        """Stream (user, movie_title, added_at) of all wishlists of a group in batches."""
+        cursor = self.db.execute(
+            """SELECT u.display_name AS user, w.movie_title, w.added_at
+               FROM wishlist w JOIN users u ON u.id = w.user_id
+               WHERE w.group_id = ? ORDER BY w.user_id, w.added_at, w.id""",
+            (group_id,),
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+
+    def get_active_user_count(self, group_id: int = DEFAULT_GROUP_ID) -> int:
+        """Get number of users with a non-empty wishlist in a group."""
+        cursor = self.db.execute(
+            "SELECT active_users FROM wishlist_group_stats WHERE group_id = ?",
+            (group_id,),
+        )
+        row = cursor.fetchone()
+        return row["active_users"] if row else 0
+
+    def get_shared_movies(self, group_id: int = DEFAULT_GROUP_ID) -> list[str]:
+        """Get titles present in every non-empty wishlist of a group.
+
+        Reads the trigger-maintained shared_wishlist table.
+        """
         cursor = self.db.execute(
-            "SELECT DISTINCT movie_title FROM wishlist ORDER BY movie_title"
+            """SELECT movie_title FROM shared_wishlist
+               WHERE group_id = ? AND user_count = (
+                   SELECT active_users FROM wishlist_group_stats WHERE group_id = ?
+               )
+               ORDER BY title_key""",
+            (group_id, group_id),
         )
         return [row["movie_title"] for row in cursor.fetchall()]
 
-    def get_movies_by_user(self) -> dict[int, list[str]]:
-        """Get movies grouped by user_id."""
+    def get_movies_by_user(self, group_id: int = DEFAULT_GROUP_ID) -> dict[int, list[str]]:
+        """Get movies of a group grouped by user_id."""
         cursor = self.db.execute(
-            "SELECT user_id, movie_title FROM wishlist ORDER BY user_id, added_at"
+            "SELECT user_id, movie_title FROM wishlist WHERE group_id = ? ORDER BY user_id, added_at",
+            (group_id,),
         )
         result: dict[int, list[str]] = {}
         for row in cursor.fetchall():
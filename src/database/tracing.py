@@ -0,0 +1,190 @@
+"""Opt-in SQL tracing: slow-query log with query plans and N+1 detection."""
+
+import contextvars
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.utils.metrics import UpdateStats, current_update_stats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatementTotals:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+def describe_plan(plan: list[str]) -> list[str]:
+    """Problems visible in EXPLAIN QUERY PLAN lines."""
+    # Scanning a materialized CTE or subquery is expected, not a table scan
+    derived = {line.split()[1] for line in plan if line.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+    problems = []
+    for line in plan:
+        # "SCAN wishlist" reads the whole table; "SCAN t USING INDEX" reads a
+        # whole index, "SEARCH" uses one for a lookup
+        if line.startswith("SCAN ") and " USING " not in line:
+            name = line.split()[1]
+            if name not in derived and name != "CONSTANT":
+                problems.append(f"full scan of {name}")
+        elif line.startswith("USE TEMP B-TREE"):
+            problems.append(line.lower())
+    return list(dict.fromkeys(problems))
+
+
+class QueryTracer:
+    """Times every statement run through Database.execute/executemany.
+
+    The time includes fetching the rows (see TracedCursor). Statements
+    slower than ``slow_ms`` are logged with their update, handler and
+    EXPLAIN QUERY PLAN, taken once per statement (full scans and temporary
+    sorts are pointed out). A statement run ``repeat_threshold`` times or
+    more while handling one update is reported as a likely N+1 pattern when
+    the update ends. Totals per statement are kept for ``summary``.
+    """
+
+    def __init__(self, slow_ms: float = 50.0, repeat_threshold: int = 10):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.totals: dict[str, StatementTotals] = {}
+        self._plans: dict[str, list[str]] = {}
+        self._lock = threading.Lock()  # Writer and reader threads record concurrently
+
+    def record(
+        self, connection: sqlite3.Connection, sql: str, params: Optional[tuple], seconds: float
+    ) -> None:
+        """Account one statement; params None means "do not explain" (executemany)."""
+        stats = current_update_stats.get()
+        if stats is not None:
+            stats.statements[sql] = stats.statements.get(sql, 0) + 1
+        with self._lock:
+            totals = self.totals.get(sql)
+            if totals is None:
+                totals = self.totals[sql] = StatementTotals()
+            totals.count += 1
+            totals.seconds += seconds
+            totals.max_seconds = max(totals.max_seconds, seconds)
+
+        if seconds * 1000 >= self.slow_ms:
+            plan = self._plan(connection, sql, params)
+            problems = describe_plan(plan)
+            logger.warning(
+                "Slow query %.1f ms [update %s, %s]%s: %s\n  plan: %s",
+                seconds * 1000,
+                stats.update_id if stats else "-",
+                stats.handler if stats else "-",
+                f" ({', '.join(problems)})" if problems else "",
+                " ".join(sql.split()),
+                " | ".join(plan) or "-",
+            )
+
+    def _plan(self, connection: sqlite3.Connection, sql: str, params: Optional[tuple]) -> list[str]:
+        with self._lock:
+            plan = self._plans.get(sql)
+        if plan is None:
+            plan = []
+            if params is not None:
+                try:
+                    rows = connection.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                    plan = [row[3] for row in rows]
+                except sqlite3.Error:
+                    pass  # e.g. PRAGMA or a multi-statement script
+            # Explained outside the lock; another thread may have been first
+            with self._lock:
+                plan = self._plans.setdefault(sql, plan)
+        return plan
+
+    def finish_update(self, stats: UpdateStats) -> None:
+        """Report statements repeated within one update."""
+        for sql, count in stats.statements.items():
+            if count >= self.repeat_threshold:
+                logger.warning(
+                    "Possible N+1: statement ran %d times in update %s (%s): %s",
+                    count,
+                    stats.update_id,
+                    stats.handler,
+                    " ".join(sql.split()),
+                )
+
+    def summary(self, top: int = 10) -> list[str]:
+        """The statements with the most total time, one line each."""
+        with self._lock:
+            ranked = sorted(self.totals.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+        return [
+            f"{totals.seconds * 1000:9.1f} ms total {totals.count:7d}x "
+            f"max {totals.max_seconds * 1000:7.1f} ms  {' '.join(sql.split())}"
+            for sql, totals in ranked
+        ]
+
+    def log_summary(self, top: int = 10) -> None:
+        lines = self.summary(top)
+        if lines:
+            logger.info("Statements by total time:\n%s", "\n".join(lines))
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times its statement together with fetching the rows.
+
+    The statement is recorded once its rows are exhausted, or when the
+    cursor is dropped with rows left unread (e.g. after one ``fetchone``).
+    """
+
+    _tracer: Optional[QueryTracer] = None
+
+    def run(self, tracer: QueryTracer, sql: str, params: tuple) -> "TracedCursor":
+        """Execute sql and record it with the tracer (in the caller's context)."""
+        self._tracer, self._sql, self._params = tracer, sql, params
+        self._context = contextvars.copy_context()
+        self._seconds = 0.0
+        try:
+            self._timed(self.execute, sql, params)
+        except BaseException:
+            self._finish()  # A failed statement is counted too
+            raise
+        if self.description is None:
+            self._finish()  # No rows to fetch
+        return self
+
+    def _timed(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self._seconds += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        size = self.arraysize if size is None else size
+        rows = self._timed(super().fetchmany, size)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def __del__(self):
+        self._finish()
+
+    def _finish(self) -> None:
+        tracer, self._tracer = self._tracer, None
+        if tracer is not None:
+            self._context.run(tracer.record, self.connection, self._sql, self._params, self._seconds)
@@ -0,0 +1,36 @@
+"""Change counters that let callers cache data derived from the database."""
+
+from typing import Hashable
+
+
+class DataVersions:
+    """Version number per scope, e.g. ``("user", id)`` or ``("group", id)``.
+
+    Repositories ``touch`` the scopes they write. A scope's version only
+    moves when the write is committed (or rolled back), so a value built from
+    committed data and stored with the version read before building it can
+    never outlive a later change: a reader that raced a pending write stores
+    it under a version the commit then replaces.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[Hashable, int] = {}
+        self._dirty: set[Hashable] = set()
+
+    def get(self, scope: Hashable) -> int:
+        return self._versions.get(scope, 0)
+
+    def touch(self, *scopes: Hashable) -> None:
+        """Mark scopes written by the current transaction."""
+        self._dirty.update(scopes)
+
+    def publish(self, committed: bool = True) -> None:
+        """Bump the touched scopes.
+
+        After a rollback the scopes stay marked: an enclosing transaction
+        may still commit earlier writes to them.
+        """
+        for scope in self._dirty:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+        if committed:
+            self._dirty.clear()
@@ -0,0 +1,186 @@
+"""Dedicated database thread for non-blocking access from the event loop."""
+
+import asyncio
+import contextvars
+import functools
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+from src.utils.metrics import current_update_stats
+from .connection import Database
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def read_only(func: F) -> F:
+    """Mark a service method as safe to run on a read-only connection."""
+    func.__db_read_only__ = True
+    return func
+
+
+@dataclass
+class WriteResult:
+    lastrowid: Optional[int]
+    rowcount: int
+
+
+class DatabaseWorker:
+    """Runs all database work on one dedicated thread.
+
+    The sqlite3 writer connection of the wrapped Database is created and used
+    only on that thread, so coroutines can await queries without stalling the
+    loop. With a read pool configured, ``run_read`` executes on reader threads
+    concurrently with the writer.
+
+    Every ``run_write`` call is one transaction, committed before the call
+    returns, so the write lock is never held while the caller awaits
+    anything else (e.g. a reply to Telegram). With ``commit_delay`` > 0 the
+    calls finishing within that many seconds share one commit (group
+    commit): each call is still a savepoint of its own, so a failing call
+    rolls back only its writes, and every caller resumes after the commit.
+    """
+
+    def __init__(self, db: Database, commit_delay: float = 0.0):
+        self.db = db
+        self.commit_delay = commit_delay
+        self._pending_commit: Optional[asyncio.Future] = None
+        self._commit_timer: Optional[asyncio.TimerHandle] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="moviebot-db")
+        self._read_executor: Optional[ThreadPoolExecutor] = None
+        if db.settings.read_pool_size > 0:
+            self._read_executor = ThreadPoolExecutor(
+                max_workers=db.settings.read_pool_size, thread_name_prefix="moviebot-db-read"
+            )
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a synchronous callable on the database thread and await its result."""
+        loop = asyncio.get_running_loop()
+        # Copy the caller's context so contextvars set by middlewares are visible
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def run_write(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a callable atomically on the database thread and commit it."""
+        group_commit = self.commit_delay > 0
+
+        def _write() -> T:
+            with self.db.transaction(commit=not group_commit):
+                return func(*args, **kwargs)
+
+        result = await self.run(_write)
+        if group_commit:
+            await self._group_commit()
+        return result
+
+    async def run_read(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a read-only callable on a pooled reader connection."""
+        if self._read_executor is None:
+            return await self.run(func, *args, **kwargs)
+
+        def _read() -> T:
+            with self.db.reader():
+                return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, _read)
+        return await loop.run_in_executor(self._read_executor, call)
+
+    async def execute(self, sql: str, params: tuple = ()) -> WriteResult:
+        """Execute SQL statement without fetching rows."""
+
+        def _execute() -> WriteResult:
+            cursor = self.db.execute(sql, params)
+            return WriteResult(lastrowid=cursor.lastrowid, rowcount=cursor.rowcount)
+
+        return await self.run(_execute)
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[sqlite3.Row]:
+        """Execute query and return the first row (committed data only with a read pool)."""
+        return await self.run_read(lambda: self.db.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        """Execute query and return all rows (committed data only with a read pool)."""
+        return await self.run_read(lambda: self.db.execute(sql, params).fetchall())
+
+    async def commit(self) -> None:
+        """Commit current transaction."""
+        await self.run(self.db.commit)
+
+    async def _group_commit(self) -> None:
+        """Wait for the commit shared by the calls ending within the delay."""
+        if self._pending_commit is None:
+            loop = asyncio.get_running_loop()
+            self._pending_commit = loop.create_future()
+            self._commit_timer = loop.call_later(
+                self.commit_delay, lambda: asyncio.ensure_future(self._flush())
+            )
+        seconds = await asyncio.shield(self._pending_commit)
+        # Every call of the group waited for the commit, so each is charged
+        stats = current_update_stats.get()
+        if stats is not None and self.db.instrumented:
+            stats.commit_seconds += seconds
+
+    async def _flush(self) -> None:
+        """Commit once for every call that ended during the delay."""
+        future, self._pending_commit = self._pending_commit, None
+        self._commit_timer = None
+        loop = asyncio.get_running_loop()
+        try:
+            # Not in a caller's context: the waiters account for the commit
+            seconds = await loop.run_in_executor(self._executor, self._commit_or_rollback)
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(seconds)
+
+    def _commit_or_rollback(self) -> float:
+        """Commit the group on the database thread and return its duration."""
+        started = time.perf_counter()
+        try:
+            self.db.commit()
+        except sqlite3.Error:
+            # Nothing of the batch is saved; the callers get the error
+            self.db.rollback()
+            raise
+        return time.perf_counter() - started
+
+    async def close(self) -> None:
+        """Commit pending writes, close the connection on its own thread and stop the worker."""
+        if self._commit_timer is not None:
+            self._commit_timer.cancel()
+            await self._flush()
+        if self._read_executor is not None:
+            self._read_executor.shutdown(wait=True)
+        await self.run(self.db.commit)
+        await self.run(self.db.close)
+        self._executor.shutdown(wait=True)
+
+
+class AsyncService(Generic[T]):
+    """Awaitable facade over a synchronous service or repository.
+
+    Every method call is forwarded to the database thread as one atomic
+    transaction, e.g. ``await wishlist_service.add_movie(user, title)``.
+    Methods marked with ``@read_only`` run on the read pool instead.
+    """
+
+    def __init__(self, target: T, worker: DatabaseWorker):
+        self._target = target
+        self._worker = worker
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        run = self._worker.run_read if getattr(attr, "__db_read_only__", False) else self._worker.run_write
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await run(attr, *args, **kwargs)
+
+        return call
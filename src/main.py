@@ -4,33 +4,33 @@
 import asyncio
 import logging
 
-from aiogram import Bot, Dispatcher
-from aiogram.client.default import DefaultBotProperties
-from aiogram.enums import ParseMode
-
-from src.config import BOT_TOKEN, DB_PATH
-from src.database import Database, run_migrations
-from src.database.repositories import (
-    UserRepository,
-    WishlistRepository,
-    HistoryRepository,
-    StateRepository,
-)
-from src.services import (
-    UserService,
-    WishlistService,
-    SelectionService,
-    WatchService,
-    HistoryService,
-)
-from src.bot.handlers import (
-    commands_router,
-    wishlist_router,
-    selection_router,
-    watching_router,
-    history_router,
-    fallback_router,
+from src.config import (
+    BOT_TOKEN,
+    BOT_MODE,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_SSL_CERT,
+    WEBHOOK_SSL_KEY,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_WORKERS,
+    DB_PATH,
+    CONVERSATION_TTL,
+    CONVERSATION_STATE_PATH,
+    WORKER_PROCESSES,
+    METRICS_HOST,
+    METRICS_PORT,
 )
+from src.app import create_bot, create_database, create_db_worker, create_dispatcher
+from src.database import run_migrations
+from src.bot.conversation import ConversationStore
+from src.bot.groups import warn_if_legacy_group_unassigned
+from src.bot.metrics import BotMetrics, start_metrics_server
+from src.bot.supervisor import Supervisor
+from src.bot.webhook import WebhookServer, run_webhook
+from src.utils import acquire_instance_lock
 
 
 # Configure logging
@@ -47,51 +47,96 @@ async def main():
         logger.error("BOT_TOKEN environment variable is not set!")
         logger.info("Create a .env file with BOT_TOKEN=your_token_here")
         return
+    if BOT_MODE == "webhook" and not (WEBHOOK_URL and WEBHOOK_SECRET):
+        logger.error("Webhook mode needs WEBHOOK_URL and WEBHOOK_SECRET to be set!")
+        return
+    # Caches and dialog state live in this process: a second instance on the
+    # same database would serve stale lists (scale with WORKER_PROCESSES)
+    instance_lock = acquire_instance_lock(f"{DB_PATH}.lock")
+    if instance_lock is None:
+        logger.error(f"Another MovieBot instance is already running on {DB_PATH}")
+        return
+
+    if WORKER_PROCESSES > 1:
+        await run_supervisor()
+        return
 
     # Initialize database
     logger.info(f"Initializing database at {DB_PATH}")
-    db = Database(DB_PATH)
-    run_migrations(db)
-
-    # Create repositories
-    user_repo = UserRepository(db)
-    wishlist_repo = WishlistRepository(db)
-    history_repo = HistoryRepository(db)
-    state_repo = StateRepository(db)
-
-    # Create services
-    user_service = UserService(user_repo)
-    wishlist_service = WishlistService(wishlist_repo, user_repo)
-    selection_service = SelectionService(wishlist_repo, history_repo, state_repo, user_repo)
-    watch_service = WatchService(user_repo, wishlist_repo, history_repo)
-    history_service = HistoryService(history_repo)
+    db_worker = create_db_worker(instrumented=METRICS_PORT is not None)
+    await db_worker.run(run_migrations, db_worker.db)
+    await db_worker.run(warn_if_legacy_group_unassigned, db_worker.db)
 
     # Initialize bot and dispatcher
-    bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    dp = Dispatcher()
-
-    # Register routers (order matters - fallback should be last)
-    dp.include_router(commands_router)
-    dp.include_router(wishlist_router)
-    dp.include_router(selection_router)
-    dp.include_router(watching_router)
-    dp.include_router(history_router)
-    dp.include_router(fallback_router)
-
-    # Inject dependencies
-    dp["user_service"] = user_service
-    dp["wishlist_service"] = wishlist_service
-    dp["selection_service"] = selection_service
-    dp["watch_service"] = watch_service
-    dp["history_service"] = history_service
-    dp["state_repo"] = state_repo
-
-    # Start polling
+    conversation = ConversationStore(ttl=CONVERSATION_TTL, path=CONVERSATION_STATE_PATH)
+    bot = create_bot()
+    metrics = BotMetrics() if METRICS_PORT else None
+    dp = create_dispatcher(db_worker, conversation, metrics=metrics)
+
     logger.info("Starting MovieBot...")
+    await conversation.start()
+    metrics_server = None
+    if metrics is not None:
+        metrics_server = await start_metrics_server(metrics.registry, METRICS_HOST, METRICS_PORT)
+    try:
+        if BOT_MODE == "webhook":
+            await serve_webhook(dp, bot)
+        else:
+            # Long polling drops a webhook left from a previous run
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        if metrics_server is not None:
+            await metrics_server.cleanup()
+        await conversation.stop()
+        await db_worker.close()
+        if db_worker.db.tracer is not None:
+            db_worker.db.tracer.log_summary()
+        logger.info("Bot stopped.")
+
+
+async def serve_webhook(dp, bot) -> None:
+    """Receive updates over HTTP and pass them to dp (a Dispatcher or Supervisor)."""
+    server = WebhookServer(
+        dp,
+        bot,
+        secret_token=WEBHOOK_SECRET,
+        path=WEBHOOK_PATH,
+        queue_size=WEBHOOK_QUEUE_SIZE,
+        workers=WEBHOOK_WORKERS,
+    )
+    await run_webhook(
+        server,
+        WEBHOOK_URL,
+        host=WEBHOOK_HOST,
+        port=WEBHOOK_PORT,
+        ssl_cert=WEBHOOK_SSL_CERT,
+        ssl_key=WEBHOOK_SSL_KEY,
+    )
+
+
+async def run_supervisor() -> None:
+    """Receive updates here and process them in WORKER_PROCESSES worker processes."""
+    # Migrate once, before workers open the database
+    logger.info(f"Initializing database at {DB_PATH}")
+    db = create_database()
+    run_migrations(db)
+    warn_if_legacy_group_unassigned(db)
+    db.close()
+
+    bot = create_bot()
+    supervisor = Supervisor(WORKER_PROCESSES)
+    logger.info(f"Starting MovieBot with {WORKER_PROCESSES} worker processes...")
+    supervisor.start()
     try:
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await serve_webhook(supervisor, bot)
+        else:
+            await bot.delete_webhook()
+            await supervisor.start_polling(bot)
     finally:
-        db.close()
+        await supervisor.stop()
+        await bot.session.close()
         logger.info("Bot stopped.")
 
 
@@ -3,6 +3,8 @@ from .wishlist_service import WishlistService
 from .selection_service import SelectionService
 from .watch_service import WatchService
 from .history_service import HistoryService
+from .stats_service import StatsService
+from .export_service import ExportService
 
 __all__ = [
     "UserService",
@@ -10,4 +12,6 @@ __all__ = [
     "SelectionService",
     "WatchService",
     "HistoryService",
+    "StatsService",
+    "ExportService",
 ]
@@ -0,0 +1,81 @@
+"""Export service - wishlists and watch history as CSV or JSON Lines files."""
+
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Iterable
+from src.database import DEFAULT_GROUP_ID, read_only
+from src.database.repositories import HistoryRepository, WishlistRepository
+
+EXPORT_FORMATS = ("csv", "jsonl")
+# Smaller files stay in memory, larger ones roll over to a temporary file
+SPOOL_MAX_SIZE = 1024 * 1024
+
+_FIELDS = {
+    "history": ("watched_at", "movie_title", "rating", "marked_by"),
+    "wishlists": ("user", "movie_title", "added_at"),
+}
+
+
+@dataclass
+class ExportFile:
+    file: IO[bytes]  # Positioned at the start; the caller closes it
+    filename: str
+    rows: int
+
+
+def write_rows(out: IO[bytes], fields: tuple[str, ...], rows: Iterable[sqlite3.Row], fmt: str) -> int:
+    """Encode rows one by one into a binary file. Returns the row count."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    # "utf-8-sig" lets spreadsheet programs detect the encoding of Cyrillic titles
+    text = io.TextIOWrapper(out, encoding="utf-8-sig" if fmt == "csv" else "utf-8", newline="")
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(text)
+        writer.writerow(fields)
+        for row in rows:
+            writer.writerow(row[name] for name in fields)
+            count += 1
+    else:
+        for row in rows:
+            text.write(json.dumps({name: row[name] for name in fields}, ensure_ascii=False) + "\n")
+            count += 1
+    text.flush()
+    text.detach()  # Keep the file open for the caller
+    return count
+
+
+class ExportService:
+    """Business logic for data export."""
+
+    def __init__(self, history_repo: HistoryRepository, wishlist_repo: WishlistRepository):
+        self.history_repo = history_repo
+        self.wishlist_repo = wishlist_repo
+
+    @read_only
+    def export(self, what: str, fmt: str, group_id: int = DEFAULT_GROUP_ID) -> ExportFile:
+        """Write a group's "history" or "wishlists" to a spooled temporary file.
+
+        Rows are read from a cursor in batches and encoded as they arrive,
+        so memory stays bounded by the batch and SPOOL_MAX_SIZE whatever the
+        size of the history.
+        """
+        if what == "history":
+            rows = self.history_repo.iter_export(group_id)
+        elif what == "wishlists":
+            rows = self.wishlist_repo.iter_export(group_id)
+        else:
+            raise ValueError(f"Unknown export: {what}")
+
+        out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            count = write_rows(out, _FIELDS[what], rows, fmt)
+        except BaseException:
+            out.close()
+            raise
+        out.seek(0)
+        return ExportFile(file=out, filename=f"{what}.{fmt}", rows=count)
@@ -1,9 +1,25 @@
 """History service for watch history operations."""
 
+import re
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from collections import defaultdict
-from src.database.repositories import HistoryRepository, HistoryItem
+from typing import Optional
+from src.database import DEFAULT_GROUP_ID, read_only
+from src.database.repositories import HistoryRepository, HistoryItem, HistoryCursor
+
+HISTORY_PAGE_SIZE = 20
+SEARCH_LIMIT = 10
+
+
+@dataclass
+class HistoryPeriod:
+    """Date range [since, until) of a history view."""
+
+    code: str  # "" (last year), "2025" or "2025-03"; stored in buttons
+    since: date
+    until: date
+    label: str  # e.g. "год", "2025 год", "март 2025"
 
 
 @dataclass
@@ -15,9 +31,12 @@ class MonthHistory:
 @dataclass
 class HistoryResult:
     months: list[MonthHistory]
-    total_count: int
+    total_count: int  # Whole period, not just this page
     average_rating: float
-    is_empty: bool
+    is_empty: bool  # Group has no history at all
+    period: Optional[HistoryPeriod] = None
+    newer: Optional[HistoryCursor] = None  # Set if there is a previous page
+    older: Optional[HistoryCursor] = None  # Set if there is a next page
 
 
 # Russian month names
@@ -52,18 +71,93 @@ SHORT_MONTH_NAMES = {
 }
 
 
+MONTH_NUMBERS = {name.lower(): number for number, name in MONTH_NAMES.items()}
+
+
 class HistoryService:
     """Business logic for history operations."""
 
     def __init__(self, history_repo: HistoryRepository):
         self.history_repo = history_repo
 
-    def get_history(self) -> HistoryResult:
-        """Get formatted watch history."""
-        items = self.history_repo.get_all()
+    @staticmethod
+    def get_period(code: str = "", today: Optional[date] = None) -> Optional[HistoryPeriod]:
+        """Build period from its code: "" (last year), "2025" or "2025-03"."""
+        today = today or date.today()
+        if not code:
+            # Last twelve calendar months, so totals come from monthly rollups
+            since = date(today.year - 1, today.month, 1) + timedelta(days=31)
+            until = date(today.year + (today.month == 12), today.month % 12 + 1, 1)
+            return HistoryPeriod(code="", since=since.replace(day=1), until=until, label="год")
+        match = re.fullmatch(r"(\d{4})(?:-(\d{1,2}))?", code)
+        if not match:
+            return None
+        year = int(match.group(1))
+        if not 1 <= year < 9999:
+            return None
+        if match.group(2) is None:
+            return HistoryPeriod(
+                code=code, since=date(year, 1, 1), until=date(year + 1, 1, 1), label=f"{year} год"
+            )
+        month = int(match.group(2))
+        if not 1 <= month <= 12:
+            return None
+        until = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return HistoryPeriod(
+            code=f"{year}-{month:02d}",
+            since=date(year, month, 1),
+            until=until,
+            label=f"{MONTH_NAMES[month].lower()} {year}",
+        )
 
-        if not items:
-            return HistoryResult(months=[], total_count=0, average_rating=0.0, is_empty=True)
+    @classmethod
+    def parse_period(cls, text: str, today: Optional[date] = None) -> Optional[HistoryPeriod]:
+        """Parse period argument of 'история': "", "2025", "март 2025" or "03.2025"."""
+        text = text.strip().lower()
+        if not text:
+            return cls.get_period("", today)
+        if re.fullmatch(r"\d{4}", text):
+            return cls.get_period(text, today)
+        match = re.fullmatch(r"(\d{1,2})\.(\d{4})", text)
+        if match:
+            return cls.get_period(f"{match.group(2)}-{match.group(1)}", today)
+        parts = text.split()
+        if len(parts) == 2 and parts[0] in MONTH_NUMBERS and re.fullmatch(r"\d{4}", parts[1]):
+            return cls.get_period(f"{parts[1]}-{MONTH_NUMBERS[parts[0]]}", today)
+        return None
+
+    @read_only
+    def get_history(
+        self,
+        group_id: int = DEFAULT_GROUP_ID,
+        period: Optional[HistoryPeriod] = None,
+        older_than: Optional[HistoryCursor] = None,
+        newer_than: Optional[HistoryCursor] = None,
+        page_size: int = HISTORY_PAGE_SIZE,
+    ) -> HistoryResult:
+        """Get one page of a group's watch history (default: the last year)."""
+        period = period or self.get_period()
+        stats = self.history_repo.get_period_stats(group_id, period.since, period.until)
+        if stats.count == 0:
+            return HistoryResult(
+                months=[],
+                total_count=0,
+                average_rating=0.0,
+                is_empty=self.history_repo.is_empty(group_id),
+                period=period,
+            )
+
+        # One extra row tells whether there is another page in that direction
+        items = self.history_repo.get_page(
+            group_id, period.since, period.until, page_size + 1, older_than, newer_than
+        )
+        has_more = len(items) > page_size
+        if newer_than is not None:
+            items = items[-page_size:] if has_more else items
+            has_newer, has_older = has_more, True
+        else:
+            items = items[:page_size]
+            has_newer, has_older = older_than is not None, has_more
 
         # Group by month
         by_month: dict[tuple[int, int], list[HistoryItem]] = defaultdict(list)
@@ -79,17 +173,21 @@ class HistoryService:
             month_name = f"{MONTH_NAMES[month]} {year}"
             months.append(MonthHistory(month_name=month_name, movies=by_month[(year, month)]))
 
-        # Calculate stats
-        total_count = len(items)
-        average_rating = sum(item.rating for item in items) / total_count
-
         return HistoryResult(
             months=months,
-            total_count=total_count,
-            average_rating=round(average_rating, 1),
+            total_count=stats.count,
+            average_rating=round(stats.average_rating, 1),
             is_empty=False,
+            period=period,
+            newer=HistoryCursor.of(items[0]) if has_newer and items else None,
+            older=HistoryCursor.of(items[-1]) if has_older and items else None,
         )
 
+    @read_only
+    def search(self, group_id: int, text: str) -> list[HistoryItem]:
+        """Find watched movies by words of the title (prefixes allowed)."""
+        return self.history_repo.search(text, group_id, limit=SEARCH_LIMIT)
+
     @staticmethod
     def format_date(d: date) -> str:
         """Format date as '12 янв'."""
@@ -3,12 +3,7 @@
 import random
 from dataclasses import dataclass
 from typing import Optional
-from src.database.repositories import (
-    WishlistRepository,
-    HistoryRepository,
-    StateRepository,
-    UserRepository,
-)
+from src.database.repositories import SelectionRepository, StateRepository, User
 
 
 @dataclass
@@ -26,109 +21,39 @@ class SelectionService:
 
     def __init__(
         self,
-        wishlist_repo: WishlistRepository,
-        history_repo: HistoryRepository,
+        selection_repo: SelectionRepository,
         state_repo: StateRepository,
-        user_repo: UserRepository,
         rng: random.Random = None,
     ):
-        self.wishlist_repo = wishlist_repo
-        self.history_repo = history_repo
+        self.selection_repo = selection_repo
         self.state_repo = state_repo
-        self.user_repo = user_repo
         self.rng = rng or random.Random()
 
-    def pick_movie(self, telegram_id: int) -> SelectionResult:
-        """Pick a movie for the evening."""
-        # 1. Get all movies from all wishlists
-        all_movies = self.wishlist_repo.get_all_movies()
+    def pick_movie(self, user: User) -> SelectionResult:
+        """Pick a movie for the evening.
 
-        if not all_movies:
-            return SelectionResult(movie=None, from_intersection=False, empty_reason="all_empty")
+        Filtering watched movies, the intersection of all lists, the empty-list
+        fallback and excluding the last pick all happen in SQL; only the
+        chosen title is loaded.
+        """
+        group_id = user.group_id
+        stats = self.selection_repo.get_pick_stats(group_id, user.id, self.LAST_SELECTED_KEY)
 
-        # 2. Filter out watched movies
-        watched = self.history_repo.get_watched_titles_lower()
-        pool = [m for m in all_movies if m.lower() not in watched]
+        if not stats.has_movies:
+            return SelectionResult(movie=None, from_intersection=False, empty_reason="all_empty")
 
-        if not pool:
+        if not stats.pool_size:
             return SelectionResult(movie=None, from_intersection=False, empty_reason="all_watched")
 
-        # 3. Try intersection first
-        intersection = self._get_intersection(pool)
-        from_intersection = bool(intersection)
-
-        if intersection:
-            pool = intersection
-        # else: use full filtered list (fallback)
-
-        # 4. Check for empty user list scenario
-        empty_user_info = self._check_empty_user(telegram_id)
-
-        # 5. Exclude last selected (if alternatives exist)
-        last = self.state_repo.get(self.LAST_SELECTED_KEY)
-        if last and len(pool) > 1:
-            pool = [m for m in pool if m.lower() != last.lower()]
-
-        # 6. Random pick
-        selected = self.rng.choice(pool)
+        # Random pick among the choices ordered by title
+        offset = self.rng.randrange(stats.choice_count)
+        selected = self.selection_repo.get_choice(group_id, self.LAST_SELECTED_KEY, offset)
 
-        # 7. Save as last selected
-        self.state_repo.set(self.LAST_SELECTED_KEY, selected)
+        # Save as last selected
+        self.state_repo.set(self.LAST_SELECTED_KEY, selected, group_id)
 
         return SelectionResult(
             movie=selected,
-            from_intersection=from_intersection,
-            other_user_name=empty_user_info,
+            from_intersection=stats.from_intersection,
+            other_user_name=stats.other_user_name,
         )
-
-    def _get_intersection(self, available_movies: list[str]) -> list[str]:
-        """Get movies that all users want from available pool."""
-        movies_by_user = self.wishlist_repo.get_movies_by_user()
-
-        if len(movies_by_user) < 2:
-            return []  # Need at least 2 users for intersection
-
-        # Filter to only available movies
-        available_lower = {m.lower() for m in available_movies}
-
-        user_sets = [
-            {title.lower() for title in titles if title.lower() in available_lower}
-            for titles in movies_by_user.values()
-        ]
-
-        # Remove empty sets (users with no available movies)
-        user_sets = [s for s in user_sets if s]
-
-        if len(user_sets) < 2:
-            return []
-
-        intersection_lower = user_sets[0]
-        for s in user_sets[1:]:
-            intersection_lower &= s
-
-        if not intersection_lower:
-            return []
-
-        return [m for m in available_movies if m.lower() in intersection_lower]
-
-    def _check_empty_user(self, current_telegram_id: int) -> Optional[str]:
-        """Check if current user has empty list, return other user's name."""
-        current_user = self.user_repo.get_by_telegram_id(current_telegram_id)
-        if not current_user:
-            return None
-
-        movies_by_user = self.wishlist_repo.get_movies_by_user()
-
-        # Check if current user has movies
-        current_has_movies = current_user.id in movies_by_user
-
-        if current_has_movies:
-            return None
-
-        # Find other user with movies
-        all_users = self.user_repo.get_all()
-        for user in all_users:
-            if user.id != current_user.id and user.id in movies_by_user:
-                return user.display_name
-
-        return None
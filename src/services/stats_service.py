@@ -0,0 +1,83 @@
+"""Statistics service - yearly watch statistics from the monthly rollups."""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from src.database import DEFAULT_GROUP_ID, read_only
+from src.database.repositories import HistoryRepository, MonthStats
+
+
+@dataclass
+class YearStats:
+    year: int
+    count: int
+    average_rating: float
+    best_movie: Optional[str]  # Highest rated, the latest one on ties
+    best_rating: Optional[int]
+    most_active_month: int  # 1-12
+    most_active_count: int
+
+
+@dataclass
+class StatsResult:
+    years: list[YearStats]  # Newest first
+    total_count: int
+    average_rating: float
+    is_empty: bool
+
+
+class StatsService:
+    """Business logic for watch statistics."""
+
+    def __init__(self, history_repo: HistoryRepository):
+        self.history_repo = history_repo
+
+    @read_only
+    def get_stats(self, group_id: int = DEFAULT_GROUP_ID, year: Optional[int] = None) -> StatsResult:
+        """Get per-year statistics of a group, optionally for one year only.
+
+        Counts, averages and months are summed from the monthly rollups, so
+        the cost depends on the number of months; the best movie of a year
+        is one index seek.
+        """
+        if year is None:
+            since, until = date.min, date.max
+        else:
+            since, until = date(year, 1, 1), date(year + 1, 1, 1)
+        years: dict[int, list[MonthStats]] = {}
+        for month in self.history_repo.get_monthly_stats(group_id, since, until):
+            years.setdefault(month.month.year, []).append(month)
+
+        result = []
+        for y, months in sorted(years.items(), reverse=True):
+            rated = sum(m.rated_count for m in months)
+            best_rating = max((r for m in months for r in m.histogram), default=None)
+            best_movie = None
+            if best_rating is not None:
+                best_movie = self.history_repo.get_latest_with_rating(
+                    group_id, best_rating, date(y, 1, 1), date(y + 1, 1, 1)
+                )
+            # Ties go to the later month
+            busiest = max(months, key=lambda m: (m.count, m.month))
+            result.append(
+                YearStats(
+                    year=y,
+                    count=sum(m.count for m in months),
+                    average_rating=round(sum(m.rating_sum for m in months) / rated, 1) if rated else 0.0,
+                    best_movie=best_movie,
+                    best_rating=best_rating,
+                    most_active_month=busiest.month.month,
+                    most_active_count=busiest.count,
+                )
+            )
+
+        all_months = [m for months in years.values() for m in months]
+        total = sum(m.count for m in all_months)
+        rated = sum(m.rated_count for m in all_months)
+        rating_sum = sum(m.rating_sum for m in all_months)
+        return StatsResult(
+            years=result,
+            total_count=total,
+            average_rating=round(rating_sum / rated, 1) if rated else 0.0,
+            is_empty=total == 0,
+        )
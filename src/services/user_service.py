@@ -1,6 +1,7 @@
 """User service for user management."""
 
 from dataclasses import dataclass
+from src.database import DEFAULT_GROUP_ID
 from src.database.repositories import UserRepository, User
 
 
@@ -16,19 +17,27 @@ class UserService:
     def __init__(self, user_repo: UserRepository):
         self.user_repo = user_repo
 
-    def register(self, telegram_id: int, display_name: str) -> RegisterResult:
-        """Register user or get existing one."""
-        existing = self.user_repo.get_by_telegram_id(telegram_id)
+    def register(
+        self, telegram_id: int, display_name: str, group_id: int = DEFAULT_GROUP_ID
+    ) -> RegisterResult:
+        """Register user in a group or get existing one.
+
+        The stored display name follows the current Telegram name.
+        """
+        existing = self.user_repo.get_by_telegram_id(telegram_id, group_id)
         if existing:
+            if existing.display_name != display_name:
+                self.user_repo.update_display_name(existing.id, display_name)
+                existing.display_name = display_name
             return RegisterResult(user=existing, is_new=False)
 
-        user = self.user_repo.create(telegram_id, display_name)
+        user = self.user_repo.create(telegram_id, display_name, group_id)
         return RegisterResult(user=user, is_new=True)
 
-    def get_user(self, telegram_id: int) -> User | None:
+    def get_user(self, telegram_id: int, group_id: int = DEFAULT_GROUP_ID) -> User | None:
         """Get user by Telegram ID."""
-        return self.user_repo.get_by_telegram_id(telegram_id)
+        return self.user_repo.get_by_telegram_id(telegram_id, group_id)
 
-    def get_all_users(self) -> list[User]:
-        """Get all registered users."""
-        return self.user_repo.get_all()
+    def get_all_users(self, group_id: int = DEFAULT_GROUP_ID) -> list[User]:
+        """Get all users registered in a group."""
+        return self.user_repo.get_all(group_id)
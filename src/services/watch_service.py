@@ -4,11 +4,13 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Optional
 from src.database.repositories import (
-    UserRepository,
+    User,
     WishlistRepository,
     HistoryRepository,
+    TitleRepository,
 )
 from src.services.wishlist_service import capitalize_title
+from src.utils import normalize_title
 
 
 @dataclass
@@ -16,6 +18,14 @@ class WatchResult:
     movie_title: str
     rating: Optional[int]
     needs_rating: bool  # True if rating was not provided
+    in_wishlist: bool = False  # True if movie was taken from a wishlist
+    suggestion: Optional[str] = None  # Known similar title; nothing was marked
+
+
+@dataclass
+class BulkWatchResult:
+    watched: list[WatchResult]
+    unrated: list[str]  # Titles without a rating from 1 to 10; not marked
 
 
 class WatchService:
@@ -23,30 +33,48 @@ class WatchService:
 
     def __init__(
         self,
-        user_repo: UserRepository,
         wishlist_repo: WishlistRepository,
         history_repo: HistoryRepository,
+        title_repo: Optional[TitleRepository] = None,
     ):
-        self.user_repo = user_repo
         self.wishlist_repo = wishlist_repo
         self.history_repo = history_repo
+        self.title_repo = title_repo or TitleRepository(wishlist_repo.db)
+
+    def _resolve_title(self, movie_title: str, group_id: int) -> tuple[str, bool]:
+        """Title to record and whether it is in a wishlist of the group."""
+        # Find original title from wishlist (compared by normalize_title)
+        wishlist_title = self.wishlist_repo.get_canonical_title(movie_title, group_id)
+        return wishlist_title or capitalize_title(movie_title), wishlist_title is not None
 
     def mark_watched(
         self,
-        telegram_id: int,
+        user: User,
         movie_title: str,
         rating: Optional[int] = None,
+        suggest: bool = True,
     ) -> WatchResult:
-        """Mark movie as watched with optional rating."""
-        user = self.user_repo.get_by_telegram_id(telegram_id)
-        if not user:
-            raise ValueError(f"User with telegram_id {telegram_id} not found")
+        """Mark movie as watched with optional rating.
+
+        With ``suggest`` a title that is in no wishlist but looks like a typo
+        of a known one is not marked; the result carries the known title.
+        """
+        original_title, in_wishlist = self._resolve_title(movie_title, user.group_id)
 
-        # Find original title from wishlist (case-insensitive)
-        original_title = self._find_original_title(movie_title)
+        if not in_wishlist and suggest:
+            suggestion = self.title_repo.find_closest(movie_title, user.group_id)
+            if suggestion:
+                return WatchResult(
+                    movie_title=original_title,
+                    rating=rating,
+                    needs_rating=rating is None,
+                    suggestion=suggestion,
+                )
 
         if rating is None:
-            return WatchResult(movie_title=original_title, rating=None, needs_rating=True)
+            return WatchResult(
+                movie_title=original_title, rating=None, needs_rating=True, in_wishlist=in_wishlist
+            )
 
         # Validate rating
         if not (1 <= rating <= 10):
@@ -58,18 +86,55 @@ class WatchService:
             rating=rating,
             watched_at=date.today(),
             user_id=user.id,
+            group_id=user.group_id,
         )
+        self.title_repo.add(original_title, user.group_id)
 
-        # Remove from all wishlists
-        self.wishlist_repo.delete_from_all(original_title)
+        # Remove from all wishlists of the group
+        if in_wishlist:
+            self.wishlist_repo.delete_from_all(original_title, user.group_id)
+
+        return WatchResult(
+            movie_title=original_title, rating=rating, needs_rating=False, in_wishlist=in_wishlist
+        )
+
+    def mark_watched_many(
+        self,
+        user: User,
+        movies: list[tuple[str, Optional[int]]],
+    ) -> BulkWatchResult:
+        """Mark several (title, rating) pairs as watched in one transaction.
 
-        return WatchResult(movie_title=original_title, rating=rating, needs_rating=False)
+        History rows are inserted with one executemany and the titles leave
+        all wishlists of the group with one DELETE. Typos are not questioned
+        here: a list of titles cannot be confirmed one by one.
+        """
+        watched: list[WatchResult] = []
+        unrated: list[str] = []
+        seen: set[str] = set()
+        for movie_title, rating in movies:
+            original_title, in_wishlist = self._resolve_title(movie_title, user.group_id)
+            if rating is None or not (1 <= rating <= 10):
+                unrated.append(original_title)
+                continue
+            key = normalize_title(original_title)
+            if key in seen:
+                continue
+            seen.add(key)
+            watched.append(
+                WatchResult(movie_title=original_title, rating=rating, needs_rating=False, in_wishlist=in_wishlist)
+            )
 
-    def _find_original_title(self, movie_title: str) -> str:
-        """Find original title with correct case from wishlists."""
-        all_movies = self.wishlist_repo.get_all_movies()
-        for m in all_movies:
-            if m.lower() == movie_title.lower():
-                return m
-        # Capitalize if not found in wishlists
-        return capitalize_title(movie_title)
+        with self.history_repo.db.transaction():
+            self.history_repo.add_many(
+                [(result.movie_title, result.rating) for result in watched],
+                watched_at=date.today(),
+                user_id=user.id,
+                group_id=user.group_id,
+            )
+            self.wishlist_repo.delete_many_from_all(
+                [result.movie_title for result in watched if result.in_wishlist], user.group_id
+            )
+        for result in watched:
+            self.title_repo.add(result.movie_title, user.group_id)
+        return BulkWatchResult(watched=watched, unrated=unrated)
@@ -1,23 +1,41 @@
 """Wishlist service for movie list management."""
 
 from dataclasses import dataclass
-from src.database.repositories import UserRepository, WishlistRepository
+from typing import Optional
+from src.database import DEFAULT_GROUP_ID, read_only
+from src.database.repositories import User, WishlistRepository, TitleRepository
+from src.utils import normalize_title
 
 
 @dataclass
 class AddMovieResult:
     movie_title: str
     already_exists: bool
+    suggestion: Optional[str] = None  # Known similar title; nothing was added
 
 
 @dataclass
 class DeleteMovieResult:
     movie_title: str
     deleted: bool
+    suggestion: Optional[str] = None  # Similar title in the user's wishlist
+
+
+@dataclass
+class BulkAddResult:
+    added: list[str]
+    skipped: list[str]  # Already in the wishlist or repeated in the request
+
+
+@dataclass
+class BulkDeleteResult:
+    deleted: list[str]
+    not_found: list[str]
 
 
 def capitalize_title(title: str) -> str:
-    """Capitalize first letter of movie title, preserve rest."""
+    """Capitalize first letter of movie title, collapse whitespace, preserve rest."""
+    title = " ".join(title.split())
     if not title:
         return title
     return title[0].upper() + title[1:]
@@ -26,85 +44,127 @@ def capitalize_title(title: str) -> str:
 class WishlistService:
     """Business logic for wishlist operations."""
 
-    def __init__(self, wishlist_repo: WishlistRepository, user_repo: UserRepository):
+    def __init__(
+        self,
+        wishlist_repo: WishlistRepository,
+        title_repo: Optional[TitleRepository] = None,
+    ):
         self.wishlist_repo = wishlist_repo
-        self.user_repo = user_repo
+        self.title_repo = title_repo or TitleRepository(wishlist_repo.db)
+
+    def add_movie(self, user: User, movie_title: str, suggest: bool = True) -> AddMovieResult:
+        """Add movie to user's wishlist.
 
-    def add_movie(self, telegram_id: int, movie_title: str) -> AddMovieResult:
-        """Add movie to user's wishlist."""
-        user = self.user_repo.get_by_telegram_id(telegram_id)
-        if not user:
-            raise ValueError(f"User with telegram_id {telegram_id} not found")
+        With ``suggest`` a new title that looks like a typo of a known one
+        is not added; the result carries the known title instead.
+        """
+        # Use existing title from any wishlist of the group for consistent case
+        existing_title = self.wishlist_repo.get_canonical_title(movie_title, user.group_id)
 
         # Check if user already has this movie
-        existing = self.wishlist_repo.find_by_title(user.id, movie_title)
-        if existing:
-            return AddMovieResult(movie_title=existing.movie_title, already_exists=True)
-
-        # Use existing title from any wishlist for consistent case
-        all_movies = self.wishlist_repo.get_all_movies()
-        for m in all_movies:
-            if m.lower() == movie_title.lower():
-                movie_title = m  # Use existing case
-                break
-        else:
-            # No existing movie found - capitalize
-            movie_title = capitalize_title(movie_title)
-
-        item = self.wishlist_repo.add(user.id, movie_title)
+        if existing_title and self.wishlist_repo.has_title(user.id, movie_title, user.group_id):
+            return AddMovieResult(movie_title=existing_title, already_exists=True)
+
+        if not existing_title and suggest:
+            suggestion = self.title_repo.find_closest(movie_title, user.group_id)
+            if suggestion:
+                return AddMovieResult(
+                    movie_title=capitalize_title(movie_title),
+                    already_exists=False,
+                    suggestion=suggestion,
+                )
+
+        # No existing movie found - capitalize
+        movie_title = existing_title or capitalize_title(movie_title)
+
+        item = self.wishlist_repo.add(user.id, movie_title, user.group_id)
+        self.title_repo.add(item.movie_title, user.group_id)
         return AddMovieResult(movie_title=item.movie_title, already_exists=False)
 
-    def get_user_wishlist(self, telegram_id: int) -> list[str]:
+    def add_movies(self, user: User, movie_titles: list[str]) -> BulkAddResult:
+        """Add several movies to user's wishlist in one transaction.
+
+        Titles are resolved against the group's in-memory title index and
+        inserted with one executemany. Typos are not questioned here: a
+        list of titles cannot be confirmed one by one.
+        """
+        added: list[str] = []
+        skipped: list[str] = []
+        seen: set[str] = set()
+        for movie_title in movie_titles:
+            key = normalize_title(movie_title)
+            # Use existing title from any wishlist of the group for consistent case
+            title = self.wishlist_repo.get_canonical_title(movie_title, user.group_id)
+            title = title or capitalize_title(movie_title)
+            if key in seen or self.wishlist_repo.has_title(user.id, movie_title, user.group_id):
+                skipped.append(title)
+                continue
+            seen.add(key)
+            added.append(title)
+
+        with self.wishlist_repo.db.transaction():
+            self.wishlist_repo.add_many(user.id, added, user.group_id)
+        for movie_title in added:
+            self.title_repo.add(movie_title, user.group_id)
+        return BulkAddResult(added=added, skipped=skipped)
+
+    @read_only
+    def get_user_wishlist(self, user: User) -> list[str]:
         """Get user's wishlist as list of movie titles."""
-        user = self.user_repo.get_by_telegram_id(telegram_id)
-        if not user:
-            return []
-
         items = self.wishlist_repo.get_user_wishlist(user.id)
         return [item.movie_title for item in items]
 
-    def delete_movie(self, telegram_id: int, movie_title: str) -> DeleteMovieResult:
+    def delete_movie(self, user: User, movie_title: str) -> DeleteMovieResult:
         """Remove movie from user's wishlist."""
-        user = self.user_repo.get_by_telegram_id(telegram_id)
-        if not user:
-            return DeleteMovieResult(movie_title=movie_title, deleted=False)
+        if not self.wishlist_repo.has_title(user.id, movie_title, user.group_id):
+            own_titles = {normalize_title(title) for title in self.get_user_wishlist(user)}
+            suggestion = self.title_repo.find_closest(movie_title, user.group_id, among=own_titles)
+            return DeleteMovieResult(movie_title=movie_title, deleted=False, suggestion=suggestion)
 
         # Find the original title (preserving case)
-        existing = self.wishlist_repo.find_by_title(user.id, movie_title)
-        original_title = existing.movie_title if existing else movie_title
+        original_title = self.wishlist_repo.get_canonical_title(movie_title, user.group_id)
 
-        deleted = self.wishlist_repo.delete(user.id, movie_title)
+        deleted = self.wishlist_repo.delete(user.id, movie_title, user.group_id)
         return DeleteMovieResult(movie_title=original_title, deleted=deleted)
 
-    def get_intersection(self) -> list[str]:
-        """Get movies that all users want (intersection of all wishlists)."""
-        movies_by_user = self.wishlist_repo.get_movies_by_user()
-
-        if not movies_by_user:
+    def delete_movies(self, user: User, movie_titles: list[str]) -> BulkDeleteResult:
+        """Remove several movies from user's wishlist in one transaction."""
+        deleted: list[str] = []
+        not_found: list[str] = []
+        seen: set[str] = set()
+        for movie_title in movie_titles:
+            key = normalize_title(movie_title)
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.wishlist_repo.has_title(user.id, movie_title, user.group_id):
+                deleted.append(self.wishlist_repo.get_canonical_title(movie_title, user.group_id))
+            else:
+                not_found.append(movie_title)
+
+        with self.wishlist_repo.db.transaction():
+            self.wishlist_repo.delete_many(user.id, deleted, user.group_id)
+        return BulkDeleteResult(deleted=deleted, not_found=not_found)
+
+    @read_only
+    def get_intersection(self, group_id: int = DEFAULT_GROUP_ID) -> list[str]:
+        """Get movies that all group members want (intersection of wishlists)."""
+        active_users = self.wishlist_repo.get_active_user_count(group_id)
+
+        if active_users == 0:
             return []
 
-        # Get sets of lowercase titles for each user
-        user_sets = [
-            {title.lower() for title in titles}
-            for titles in movies_by_user.values()
-        ]
-
-        # Find intersection
-        if len(user_sets) == 1:
+        if active_users == 1:
             # Only one user - return their list
-            return list(movies_by_user.values())[0]
-
-        intersection_lower = user_sets[0]
-        for s in user_sets[1:]:
-            intersection_lower &= s
+            return list(self.wishlist_repo.get_movies_by_user(group_id).values())[0]
 
-        if not intersection_lower:
-            return []
+        return self.wishlist_repo.get_shared_movies(group_id)
 
-        # Return original titles (with original case)
-        all_movies = self.wishlist_repo.get_all_movies()
-        return [m for m in all_movies if m.lower() in intersection_lower]
+    def is_in_wishlists(self, movie_title: str, group_id: int = DEFAULT_GROUP_ID) -> bool:
+        """Check if movie is in any wishlist of a group (compared by normalize_title)."""
+        return self.wishlist_repo.get_canonical_title(movie_title, group_id) is not None
 
-    def get_all_movies(self) -> list[str]:
-        """Get all movies from all wishlists."""
-        return self.wishlist_repo.get_all_movies()
+    @read_only
+    def get_all_movies(self, group_id: int = DEFAULT_GROUP_ID) -> list[str]:
+        """Get all movies from all wishlists of a group."""
+        return self.wishlist_repo.get_all_movies(group_id)
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Shared helpers without dependencies on Telegram or the database."""
+
+from .lru_cache import LRUCache
+from .fuzzy import TrigramIndex, edit_distance
+from .instance_lock import acquire_instance_lock
+from .metrics import CacheStats, MetricsRegistry
+from .titles import normalize_title
+
+__all__ = [
+    "CacheStats",
+    "LRUCache",
+    "MetricsRegistry",
+    "TrigramIndex",
+    "acquire_instance_lock",
+    "edit_distance",
+    "normalize_title",
+]
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""Text command parser - classifies a message once into a typed command."""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+
+@dataclass(frozen=True)
+class AskMovieTitle:
+    """'➕ Добавить фильм' button: the next message is a title."""
+
+
+@dataclass(frozen=True)
+class AddMovie:
+    title: str  # Empty if the user sent only "хочу посмотреть"
+
+
+@dataclass(frozen=True)
+class AddMovies:
+    """Several titles, one per line."""
+
+    titles: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DeleteMovie:
+    title: str
+
+
+@dataclass(frozen=True)
+class DeleteMovies:
+    titles: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ShowMyList:
+    pass
+
+
+@dataclass(frozen=True)
+class ShowOurList:
+    pass
+
+
+@dataclass(frozen=True)
+class PickMovie:
+    pass
+
+
+@dataclass(frozen=True)
+class MarkWatched:
+    title: str
+    rating: Optional[int]  # None if no rating was given; not range-checked
+
+
+@dataclass(frozen=True)
+class MarkWatchedMany:
+    movies: tuple[tuple[str, Optional[int]], ...]  # (title, rating or None)
+
+
+@dataclass(frozen=True)
+class ShowHistory:
+    period: str  # Raw period text, "" for the last year
+
+
+@dataclass(frozen=True)
+class SearchHistory:
+    query: str
+
+
+@dataclass(frozen=True)
+class ShowStats:
+    year: Optional[int]
+
+
+@dataclass(frozen=True)
+class ExportData:
+    what: str  # "history" or "wishlists"
+    fmt: str  # "csv" or "jsonl"
+
+
+Command = Union[
+    AskMovieTitle,
+    AddMovie,
+    AddMovies,
+    DeleteMovie,
+    DeleteMovies,
+    ShowMyList,
+    ShowOurList,
+    PickMovie,
+    MarkWatched,
+    MarkWatchedMany,
+    ShowHistory,
+    SearchHistory,
+    ShowStats,
+    ExportData,
+]
+
+# Button texts start with an emoji, typed commands do not
+_EMOJI_PREFIX = re.compile(r"^(?:➕|📋|💑|🎲|📚|📊)\s*")
+
+# Rating requires a comma before the number or a /10 suffix, so "Дюна 2" is
+# a title; the word "оценка" before the number is optional
+_RATING_AFTER_COMMA = re.compile(r"(.+?),\s*(?:оценка\s*)?(\d+)(?:/10)?$", re.IGNORECASE)
+_RATING_OUT_OF_TEN = re.compile(r"(.+?)\s+(?:оценка\s*)?(\d+)/10$", re.IGNORECASE)
+_RATING_ONLY = re.compile(r"(?:оценка\s*)?(\d{1,2})(?:/10)?", re.IGNORECASE)
+_YEAR = re.compile(r"\d{4}")
+
+
+def _whole(command: Command) -> Callable[[str], Optional[Command]]:
+    """Keyword that must be the whole message."""
+    return lambda rest: command if not rest else None
+
+
+def _split_titles(rest: str) -> list[str]:
+    """Items of a bulk command, one per line.
+
+    Commas are not separators: "Хороший, плохой, злой" is one title.
+    """
+    return [line.strip() for line in rest.splitlines() if line.strip()]
+
+
+def _add_movie(rest: str) -> Optional[Command]:
+    titles = _split_titles(rest)
+    return AddMovies(titles=tuple(titles)) if len(titles) > 1 else AddMovie(title=rest.strip())
+
+
+def _delete_movie(rest: str) -> Optional[Command]:
+    titles = _split_titles(rest)
+    return DeleteMovies(titles=tuple(titles)) if len(titles) > 1 else DeleteMovie(title=rest.strip())
+
+
+def _title_and_rating(text: str) -> tuple[str, Optional[int]]:
+    match = _RATING_AFTER_COMMA.match(text) or _RATING_OUT_OF_TEN.match(text)
+    if match:
+        return match.group(1).strip(), int(match.group(2))
+    return text, None
+
+
+def _mark_watched(rest: str) -> Optional[Command]:
+    # A last line that is only a rating applies to every title without one;
+    # other lines may carry their own ("Дюна, 9")
+    items = _split_titles(rest)
+    common = None
+    if len(items) > 1:
+        match = _RATING_ONLY.fullmatch(items[-1])
+        if match:
+            common = int(match.group(1))
+            items.pop()
+    if len(items) > 1:
+        movies = []
+        for item in items:
+            title, rating = _title_and_rating(item)
+            movies.append((title, rating if rating is not None else common))
+        return MarkWatchedMany(movies=tuple(movies))
+
+    title, rating = _title_and_rating(items[0] if items else "")
+    return MarkWatched(title=title, rating=rating if rating is not None else common)
+
+
+def _show_stats(rest: str) -> Optional[Command]:
+    rest = rest.strip()
+    if not rest:
+        return ShowStats(year=None)
+    return ShowStats(year=int(rest)) if _YEAR.fullmatch(rest) else None
+
+
+def _search_history(rest: str) -> Optional[Command]:
+    query = rest.strip().rstrip("?").strip()
+    return SearchHistory(query=query) if query else None
+
+
+_EXPORT_WORDS = {
+    "история": ("what", "history"),
+    "историю": ("what", "history"),
+    "истории": ("what", "history"),
+    "список": ("what", "wishlists"),
+    "списки": ("what", "wishlists"),
+    "списков": ("what", "wishlists"),
+    "csv": ("fmt", "csv"),
+    "json": ("fmt", "jsonl"),
+    "jsonl": ("fmt", "jsonl"),
+}
+
+
+def _export_data(rest: str) -> Optional[Command]:
+    options = {"what": "history", "fmt": "csv"}
+    for word in rest.lower().split():
+        option = _EXPORT_WORDS.get(word)
+        if option is None:
+            return None
+        options[option[0]] = option[1]
+    return ExportData(**options)
+
+
+# keyword -> (needs a word boundary after it, builds the command from the rest)
+_KEYWORDS: dict[str, tuple[bool, Callable[[str], Optional[Command]]]] = {
+    "добавить фильм": (True, _whole(AskMovieTitle())),
+    "мой список": (True, _whole(ShowMyList())),
+    "наш список": (True, _whole(ShowOurList())),
+    "что смотрим": (False, lambda rest: PickMovie()),
+    "хочу посмотреть": (False, _add_movie),
+    "удали": (True, _delete_movie),
+    "удалить": (True, _delete_movie),
+    "посмотрели": (True, _mark_watched),
+    "история": (True, lambda rest: ShowHistory(period=rest.strip())),
+    "статистика": (True, _show_stats),
+    "смотрели": (True, _search_history),
+    "мы смотрели": (True, _search_history),
+    "экспорт": (True, _export_data),
+}
+
+_END = ""  # Trie node key holding the keyword that ends there
+
+
+def _build_trie() -> dict:
+    root: dict = {}
+    for keyword in _KEYWORDS:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[_END] = keyword
+    return root
+
+
+_TRIE = _build_trie()
+
+
+def parse_command(text: Optional[str]) -> Optional[Command]:
+    """Classify a message, or None if it is not a text command.
+
+    The lowercased text is walked once through a trie of keywords; the
+    longest keyword that ends at a word boundary (if it needs one) wins and
+    its parser reads the arguments from the rest of the original text.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    prefix = _EMOJI_PREFIX.match(text)
+    if prefix:
+        text = text[prefix.end() :]
+    lowered = text.lower()
+
+    node = _TRIE
+    found: Optional[tuple[str, int]] = None
+    for position, char in enumerate(lowered):
+        node = node.get(char)
+        if node is None:
+            break
+        keyword = node.get(_END)
+        if keyword is not None:
+            end = position + 1
+            needs_boundary = _KEYWORDS[keyword][0]
+            if not needs_boundary or end == len(lowered) or lowered[end].isspace():
+                found = (keyword, end)
+    if found is None:
+        return None
+
+    keyword, end = found
+    return _KEYWORDS[keyword][1](text[end:])
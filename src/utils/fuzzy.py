@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Typo-tolerant string lookup: trigram index with bounded edit distance."""
+
+import re
+from typing import Callable, Optional
+
+_DIGITS = re.compile(r"\d+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Distinct character trigrams of text padded as "$$text$"."""
+    padded = f"$${text}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # A typo touches a few letters: only the differing middle needs the table
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(max(len(a), len(b)), limit + 1)
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] + (char_a != char_b)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def max_typos(text: str) -> int:
+    """Edits tolerated for a string of this length."""
+    if len(text) < 4:
+        return 0
+    return 1 if len(text) < 8 else 2
+
+
+class TrigramIndex:
+    """Inverted trigram index over a set of strings.
+
+    Postings are split by string length, so a lookup only reads strings
+    at most k characters longer or shorter than the query. ``closest``
+    only verifies strings sharing one of the rarest ``3k + 1`` trigrams of
+    the query: one edit destroys at most three trigrams, so a string within
+    k edits must contain one of them. The candidates are then filtered by
+    trigram overlap before the edit distance is computed.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[tuple[str, int], set[str]] = {}  # (trigram, length) -> keys
+        self._grams: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._grams
+
+    def add(self, key: str) -> None:
+        if key in self._grams:
+            return
+        grams = trigrams(key)
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings.setdefault((gram, len(key)), set()).add(key)
+
+    def discard(self, key: str) -> None:
+        grams = self._grams.pop(key, None)
+        if grams is None:
+            return
+        for gram in grams:
+            posting = self._postings[gram, len(key)]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram, len(key)]
+
+    def closest(
+        self,
+        query: str,
+        max_distance: Optional[int] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
+        """Nearest key within max_distance edits (default: ``max_typos``).
+
+        Keys whose numbers differ from the query's are never returned, so
+        "Дюна 2" is not offered for "Дюна 3". ``accept`` narrows the keys
+        considered. Ties go to the key sharing more trigrams.
+        """
+        limit = max_typos(query) if max_distance is None else max_distance
+        grams = trigrams(query)
+        # The prefix filter needs at least one trigram to survive k edits
+        limit = min(limit, (len(grams) - 1) // 3)
+        if limit <= 0:
+            return None
+
+        lengths = range(max(len(query) - limit, 1), len(query) + limit + 1)
+        empty: set[str] = set()
+        postings = {
+            gram: [self._postings.get((gram, length), empty) for length in lengths]
+            for gram in grams
+        }
+        rarest = sorted(grams, key=lambda gram: sum(map(len, postings[gram])))
+        candidates: set[str] = set()
+        for gram in rarest[: 3 * limit + 1]:
+            candidates.update(*postings[gram])
+        candidates.discard(query)
+
+        numbers = _DIGITS.findall(query)
+        need = len(grams) - 3 * limit
+        best: Optional[str] = None
+        best_rank = (limit + 1, 0)
+        for key in candidates:
+            shared = len(grams & self._grams[key])
+            if shared < need:
+                continue
+            if accept is not None and not accept(key):
+                continue
+            if _DIGITS.findall(key) != numbers:
+                continue
+            distance = edit_distance(query, key, best_rank[0])
+            rank = (distance, -shared)
+            if distance <= limit and rank < best_rank:
+                best, best_rank = key, rank
+        return best
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Single-instance guard: one bot process (or supervisor) per database."""
+
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, the guard is skipped
+    fcntl = None
+
+
+def acquire_instance_lock(path: str) -> Optional[IO]:
+    """Lock path exclusively for the life of the process.
+
+    Returns the open lock file (keep a reference to hold the lock), or None
+    if another process already holds it.
+    """
+    lock_file = open(path, "a")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
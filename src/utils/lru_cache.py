@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Bounded least-recently-used cache."""
+
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from .metrics import CacheStats
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Mapping with a size limit that evicts the least recently used entry.
+
+    With ``max_weight`` the total ``weigh(value)`` of the entries (e.g. their
+    size in bytes) is capped as well; a value heavier than the cap is not kept.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[V], int]] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        if (max_weight is None) != (weigh is None):
+            raise ValueError("max_weight and weigh go together")
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, key: K) -> Optional[V]:
+        """Get value and mark it as recently used."""
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return self._data[key]
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or replace value, evicting the oldest entries if full."""
+        if self.weigh is not None:
+            self.pop(key)
+            weight = self.weigh(value)
+            if weight > self.max_weight:
+                return
+            self.weight += weight
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight):
+            _, evicted = self._data.popitem(last=False)
+            if self.weigh is not None:
+                self.weight -= self.weigh(evicted)
+
+    def pop(self, key: K) -> Optional[V]:
+        """Remove key. Returns its value if it was cached."""
+        value = self._data.pop(key, None)
+        if value is not None and self.weigh is not None:
+            self.weight -= self.weigh(value)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
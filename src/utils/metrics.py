@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Minimal metrics registry rendered in the Prometheus text format."""
+
+import bisect
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+
+# Seconds, from a dictionary hit to a slow Telegram request
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}"
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (count per bucket with +Inf last, sum)
+        self.values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        entry = self.values.get(label_values)
+        if entry is None:
+            entry = self.values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterable[str]:
+        for label_values, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_number(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts of an in-memory cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MetricsRegistry:
+    """Named metrics and caches; ``render`` produces the /metrics page.
+
+    Metrics are updated from the event loop only, so they need no locks;
+    cache counters are plain integers read as they are at render time.
+    """
+
+    def __init__(self, prefix: str = "moviebot_"):
+        self.prefix = prefix
+        self._metrics: dict[str, "Counter | Histogram"] = {}
+        self._caches: dict[str, CacheStats] = {}
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(self.prefix + name, help_text, labels))
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(self.prefix + name, help_text, labels, buckets))
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def track_cache(self, name: str, stats: CacheStats) -> None:
+        """Report hits, misses and hit ratio of a cache under the given name."""
+        self._caches[name] = stats
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        if self._caches:
+            caches = sorted(self._caches.items())
+            for suffix, kind, help_text, value in [
+                ("cache_hits_total", "counter", "Lookups answered from memory.", lambda s: s.hits),
+                ("cache_misses_total", "counter", "Lookups that had to load from the database.", lambda s: s.misses),
+                ("cache_hit_ratio", "gauge", "Share of lookups answered from memory.", lambda s: s.hit_ratio),
+            ]:
+                name = self.prefix + suffix
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(
+                    f"{name}{_format_labels(('cache',), (cache,))} {_format_number(value(stats))}"
+                    for cache, stats in caches
+                )
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class UpdateStats:
+    """Database work done while handling one update."""
+
+    update_id: Optional[int] = None
+    handler: str = "unhandled"
+    queries: int = 0
+    rows_read: int = 0
+    rows_written: int = 0
+    commit_seconds: float = 0.0
+    statements: dict[str, int] = field(default_factory=dict)  # SQL -> runs, when traced
+
+
+# Set by the metrics middleware for the update being handled; the database
+# worker copies the context, so queries on its thread count here too
+current_update_stats: ContextVar[Optional[UpdateStats]] = ContextVar("moviebot_update_stats", default=None)
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""Comparison key for movie titles."""
+
+import unicodedata
+
+
+def normalize_title(title: str) -> str:
+    """Key under which spellings of one title compare equal.
+
+    NFKC folds Unicode variants (full-width letters, ligatures, composed
+    and decomposed "й"), casefold ignores case, "ё" is written as "е" and
+    runs of whitespace become one space: "  ЁЛКИ 2 " -> "елки 2".
+    """
+    text = unicodedata.normalize("NFKC", title).casefold().replace("ё", "е")
+    return " ".join(text.split())
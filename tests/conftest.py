@@ -2,15 +2,19 @@
 """Pytest configuration and fixtures for BDD tests."""
 
 import pytest
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from src.database import Database, run_migrations
+from src.database import Database, DatabaseSettings, DatabaseWorker, run_migrations
 from src.database.repositories import (
     UserRepository,
     WishlistRepository,
     HistoryRepository,
     StateRepository,
+    SelectionRepository,
+    TitleRepository,
 )
 from src.services import (
     UserService,
@@ -82,6 +86,28 @@ def db(tmp_path: Path):
     database.close()
 
 
+@pytest.fixture
+def database_worker(tmp_path: Path):
+    """Start a worker over a fresh migrated database inside a test's event loop.
+
+    ``async with database_worker() as worker:``; keyword arguments go to
+    Database (e.g. ``instrumented=True``), ``commit_delay`` to the worker.
+    """
+
+    @asynccontextmanager
+    async def start(
+        settings: Optional[DatabaseSettings] = None, commit_delay: float = 0.0, **options
+    ) -> AsyncIterator[DatabaseWorker]:
+        worker = DatabaseWorker(Database(str(tmp_path / "worker.db"), settings, **options), commit_delay)
+        await worker.run(run_migrations, worker.db)
+        try:
+            yield worker
+        finally:
+            await worker.close()
+
+    return start
+
+
 @pytest.fixture
 def user_repo(db: Database) -> UserRepository:
     return UserRepository(db)
@@ -102,6 +128,16 @@ def state_repo(db: Database) -> StateRepository:
     return StateRepository(db)
 
 
+@pytest.fixture
+def selection_repo(db: Database) -> SelectionRepository:
+    return SelectionRepository(db)
+
+
+@pytest.fixture
+def title_repo(db: Database) -> TitleRepository:
+    return TitleRepository(db)
+
+
 @pytest.fixture
 def user_service(user_repo: UserRepository) -> UserService:
     return UserService(user_repo)
@@ -109,32 +145,29 @@ def user_service(user_repo: UserRepository) -> UserService:
 
 @pytest.fixture
 def wishlist_service(
-    wishlist_repo: WishlistRepository,
-    user_repo: UserRepository,
+    wishlist_repo: WishlistRepository, title_repo: TitleRepository
 ) -> WishlistService:
-    return WishlistService(wishlist_repo, user_repo)
+    return WishlistService(wishlist_repo, title_repo)
 
 
 @pytest.fixture
 def selection_service(
-    wishlist_repo: WishlistRepository,
-    history_repo: HistoryRepository,
+    selection_repo: SelectionRepository,
     state_repo: StateRepository,
-    user_repo: UserRepository,
 ) -> SelectionService:
     import random
     # Fixed seed for deterministic tests
     rng = random.Random(42)
-    return SelectionService(wishlist_repo, history_repo, state_repo, user_repo, rng=rng)
+    return SelectionService(selection_repo, state_repo, rng=rng)
 
 
 @pytest.fixture
 def watch_service(
-    user_repo: UserRepository,
     wishlist_repo: WishlistRepository,
     history_repo: HistoryRepository,
+    title_repo: TitleRepository,
 ) -> WatchService:
-    return WatchService(user_repo, wishlist_repo, history_repo)
+    return WatchService(wishlist_repo, history_repo, title_repo)
 
 
 @pytest.fixture
@@ -182,15 +215,15 @@ def users_connected():
 def add_movie_to_wishlist(user_service, wishlist_service, user_name: str, movie: str):
     """Add movie to user's wishlist."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
-    wishlist_service.add_movie(user.telegram_id, movie)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
+    wishlist_service.add_movie(db_user, movie)
 
 
 @given(parsers.parse('в списке желаний "{user_name}" есть фильмы:'))
 def add_movies_to_wishlist(user_service, wishlist_service, user_name: str, datatable):
     """Add multiple movies to user's wishlist from data table."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
 
     # Skip header row if present
     data_rows = datatable
@@ -211,7 +244,7 @@ def add_movies_to_wishlist(user_service, wishlist_service, user_name: str, datat
         else:
             movie = row[0] if row else None
         if movie:
-            wishlist_service.add_movie(user.telegram_id, movie)
+            wishlist_service.add_movie(db_user, movie)
 
 
 @given(parsers.parse('список желаний "{user_name}" пуст'))
@@ -225,8 +258,8 @@ def empty_wishlist(user_service, user_name: str):
 def movie_in_any_wishlist(user_service, wishlist_service, movie: str):
     """Add movie to first user's wishlist."""
     user = _ANDREY
-    user_service.register(user.telegram_id, user.display_name)
-    wishlist_service.add_movie(user.telegram_id, movie)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
+    wishlist_service.add_movie(db_user, movie)
 
 
 @given(parsers.parse('в списках желаний нет фильма "{movie}"'))
@@ -64,3 +64,14 @@
     И в списке желаний "Маши" есть фильм "Барби"
     Когда пользователь "Маша" отправляет сообщение "наш список"
     Тогда бот отвечает "💑 Пока нет фильмов которые хотите оба"
+
+  Сценарий: Опечатка в названии известного фильма
+    Допустим в списке желаний "Маши" есть фильм "Оппенгеймер"
+    Когда пользователь "Андрей" отправляет сообщение "хочу посмотреть Опенгеймер"
+    Тогда бот отвечает "🤔 Похоже на «Оппенгеймер». Добавить его вместо «Опенгеймер»?"
+    И фильм "Опенгеймер" отсутствует в списке желаний "Андрея"
+
+  Сценарий: Опечатка при удалении
+    Допустим в списке желаний "Маши" есть фильм "Барби"
+    Когда пользователь "Маша" отправляет сообщение "удали Барбм"
+    Тогда бот отвечает "🤷 «Барбм» нет в твоём списке. Может, «Барби»?"
@@ -35,3 +35,22 @@
     Допустим история просмотров пуста
     Когда пользователь "Маша" отправляет сообщение "история"
     Тогда бот отвечает "📚 История пуста. Самое время что-нибудь посмотреть! 🍿"
+
+  Сценарий: Поиск по истории
+    Допустим в истории просмотров есть фильмы:
+      | название            | оценка | дата       |
+      | Дюна                | 8      | 2021-10-30 |
+      | Барби               | 7      | 2023-07-21 |
+      | Дюна: Часть вторая  | 9      | 2024-03-02 |
+    Когда пользователь "Маша" ищет в истории "мы смотрели дюн?"
+    Тогда бот отвечает:
+      """
+      🔍 Да, смотрели:
+      • Дюна — 8/10 (30 окт 2021)
+      • Дюна: Часть вторая — 9/10 (2 мар 2024)
+      """
+
+  Сценарий: Поиск фильма которого нет в истории
+    Допустим история просмотров пуста
+    Когда пользователь "Маша" ищет в истории "мы смотрели Матрицу?"
+    Тогда бот отвечает "🤷 «Матрицу» ещё не смотрели"
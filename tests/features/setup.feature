@@ -30,5 +30,11 @@
       • «что смотрим?» — выбрать фильм на вечер
       • «посмотрели [название], [оценка]» — отметить просмотр
       • «история» — что смотрели за год
+      • «статистика» — итоги по годам
+      • «мы смотрели [название]?» — поиск по истории
       • «удали [название]» — убрать из списка
+      • «экспорт [история|списки] [csv|json]» — выгрузить файлом
+
+      Несколько фильмов пишите каждый с новой строки после команды; общую оценку
+      для «посмотрели» — последней строкой
       """
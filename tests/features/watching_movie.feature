@@ -32,3 +32,9 @@
     Когда пользователь "Андрей" отправляет сообщение "посмотрели Аватар, 7/10"
     Тогда бот отвечает "✅ Добавил «Аватар» в архив с оценкой 7/10"
     И фильм "Аватар" добавляется в историю с оценкой 7
+
+  Сценарий: Опечатка в названии фильма из списка
+    Допустим в списке желаний есть фильм "Оппенгеймер"
+    Когда пользователь "Андрей" отправляет сообщение "посмотрели Опенгеймер, 8/10"
+    Тогда бот отвечает "🤔 Похоже на «Оппенгеймер». Отметить его вместо «Опенгеймер»?"
+    И фильм "Оппенгеймер" отсутствует в истории
@@ -12,21 +12,23 @@ scenarios("../features/adding_movies.feature")
 def user_sends_message(user_service, wishlist_service, fake_bot: FakeBot, user_name: str, message: str):
     """User sends a message to the bot."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
 
     if message.startswith("хочу посмотреть"):
         movie_name = message[len("хочу посмотреть"):].strip()
         if not movie_name:
             fake_bot.send(Messages.EMPTY_MOVIE_NAME)
         else:
-            result = wishlist_service.add_movie(user.telegram_id, movie_name)
-            if result.already_exists:
+            result = wishlist_service.add_movie(db_user, movie_name)
+            if result.suggestion:
+                fake_bot.send(Messages.movie_suggestion(result.movie_title, result.suggestion))
+            elif result.already_exists:
                 fake_bot.send(Messages.movie_already_exists(result.movie_title))
             else:
                 fake_bot.send(Messages.movie_added(result.movie_title))
 
     elif message == "мой список":
-        movies = wishlist_service.get_user_wishlist(user.telegram_id)
+        movies = wishlist_service.get_user_wishlist(db_user)
         fake_bot.send(Messages.format_my_list(movies))
 
     elif message == "наш список":
@@ -35,24 +37,28 @@ def user_sends_message(user_service, wishlist_service, fake_bot: FakeBot, user_n
 
     elif message.startswith("удали"):
         movie_name = message[len("удали"):].strip()
-        result = wishlist_service.delete_movie(user.telegram_id, movie_name)
+        result = wishlist_service.delete_movie(db_user, movie_name)
         if result.deleted:
             fake_bot.send(Messages.movie_deleted(result.movie_title))
+        elif result.suggestion:
+            fake_bot.send(Messages.movie_not_found_suggestion(result.movie_title, result.suggestion))
 
 
 @then(parsers.parse('фильм "{movie}" появляется в списке желаний "{user_name}"'))
-def movie_in_wishlist(wishlist_service, movie: str, user_name: str):
+def movie_in_wishlist(user_service, wishlist_service, movie: str, user_name: str):
     """Check movie is in user's wishlist."""
     user = get_test_user(user_name)
-    movies = wishlist_service.get_user_wishlist(user.telegram_id)
+    db_user = user_service.get_user(user.telegram_id)
+    movies = wishlist_service.get_user_wishlist(db_user)
     movie_titles_lower = [m.lower() for m in movies]
     assert movie.lower() in movie_titles_lower, f"Movie '{movie}' not found in wishlist: {movies}"
 
 
 @then(parsers.parse('фильм "{movie}" отсутствует в списке желаний "{user_name}"'))
-def movie_not_in_wishlist(wishlist_service, movie: str, user_name: str):
+def movie_not_in_wishlist(user_service, wishlist_service, movie: str, user_name: str):
     """Check movie is NOT in user's wishlist."""
     user = get_test_user(user_name)
-    movies = wishlist_service.get_user_wishlist(user.telegram_id)
+    db_user = user_service.get_user(user.telegram_id)
+    movies = wishlist_service.get_user_wishlist(db_user)
     movie_titles_lower = [m.lower() for m in movies]
     assert movie.lower() not in movie_titles_lower, f"Movie '{movie}' should not be in wishlist: {movies}"
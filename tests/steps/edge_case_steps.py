@@ -20,7 +20,7 @@ def user_sends_edge_case_message(
 ):
     """Handle edge case messages."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
 
     message_lower = message.lower().strip()
 
@@ -29,7 +29,7 @@ def user_sends_edge_case_message(
         if not movie_name:
             fake_bot.send(Messages.EMPTY_MOVIE_NAME)
         else:
-            result = wishlist_service.add_movie(user.telegram_id, movie_name)
+            result = wishlist_service.add_movie(db_user, movie_name)
             if result.already_exists:
                 fake_bot.send(Messages.movie_already_exists(result.movie_title))
             else:
@@ -39,7 +39,7 @@ def user_sends_edge_case_message(
         movie_name = message[len("удали"):].strip()
         from src.services.wishlist_service import capitalize_title
         movie_title = capitalize_title(movie_name)
-        result = wishlist_service.delete_movie(user.telegram_id, movie_name)
+        result = wishlist_service.delete_movie(db_user, movie_name)
         if result.deleted:
             fake_bot.send(Messages.movie_deleted(result.movie_title))
         else:
@@ -65,7 +65,7 @@ def user_sends_edge_case_message(
                     original_title = m
                     break
 
-            result = watch_service.mark_watched(user.telegram_id, original_title, rating)
+            result = watch_service.mark_watched(db_user, original_title, rating)
             fake_bot.send(Messages.movie_watched(result.movie_title, rating))
         else:
             fake_bot.send(Messages.ASK_RATING)
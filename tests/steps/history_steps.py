@@ -83,4 +83,15 @@ def user_asks_history(user_service, history_service, fake_bot: FakeBot, user_nam
         fake_bot.send("\n".join(lines))
 
 
+@when(parsers.parse('пользователь "{user_name}" ищет в истории "{message}"'))
+def user_searches_history(user_service, history_service, fake_bot: FakeBot, user_name: str, message: str):
+    """User asks whether a movie was watched."""
+    user = get_test_user(user_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
+
+    query = message.removeprefix("мы смотрели").strip().rstrip("?")
+    items = history_service.search(db_user.group_id, query)
+    fake_bot.send(Messages.format_search_results(query, items))
+
+
 # Step 'бот отвечает "{expected}"' defined in conftest.py
@@ -12,9 +12,9 @@ scenarios("../features/selecting_movie.feature")
 def user_asks_what_to_watch(user_service, selection_service, fake_bot: FakeBot, user_name: str):
     """User asks for movie recommendation."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
 
-    result = selection_service.pick_movie(user.telegram_id)
+    result = selection_service.pick_movie(db_user)
 
     if result.movie is None:
         fake_bot.send(Messages.ALL_LISTS_EMPTY)
@@ -91,30 +91,59 @@ def test_exclude_watched_from_pool(db, user_service, wishlist_service, selection
     from datetime import date
 
     # Setup user
-    user_service.register(_ANDREY.telegram_id, _ANDREY.display_name)
+    andrey = user_service.register(_ANDREY.telegram_id, _ANDREY.display_name).user
 
     # Add movie to wishlist
-    wishlist_service.add_movie(_ANDREY.telegram_id, "Дюна")
+    wishlist_service.add_movie(andrey, "Дюна")
 
     # Add same movie to history (already watched)
     history_repo.add("Дюна", rating=8, watched_at=date.today(), user_id=1)
 
     # Try to pick - should get empty result
-    result = selection_service.pick_movie(_ANDREY.telegram_id)
+    result = selection_service.pick_movie(andrey)
     assert result.movie is None or result.movie.lower() != "дюна"
 
 
 def test_no_repeat_last_when_alternatives(db, user_service, wishlist_service, selection_service, state_repo):
     """Should not repeat last selected movie when alternatives exist."""
-    user_service.register(_ANDREY.telegram_id, _ANDREY.display_name)
+    andrey = user_service.register(_ANDREY.telegram_id, _ANDREY.display_name).user
 
     # Add two movies
-    wishlist_service.add_movie(_ANDREY.telegram_id, "Дюна")
-    wishlist_service.add_movie(_ANDREY.telegram_id, "Барби")
+    wishlist_service.add_movie(andrey, "Дюна")
+    wishlist_service.add_movie(andrey, "Барби")
 
     # Set last selected
     state_repo.set("last_selected_movie", "Дюна")
 
     # Pick should not return Дюна
-    result = selection_service.pick_movie(_ANDREY.telegram_id)
+    result = selection_service.pick_movie(andrey)
     assert result.movie.lower() != "дюна"
+
+
+def test_intersection_computed_over_unwatched_titles(db, user_service, wishlist_service, selection_service, history_repo):
+    """Watched titles do not count towards the shared list."""
+    from datetime import date
+
+    andrey = user_service.register(_ANDREY.telegram_id, _ANDREY.display_name).user
+    katya = user_service.register(1003, "Катя").user
+    for user in (andrey, katya):
+        wishlist_service.add_movie(user, "Дюна")
+        wishlist_service.add_movie(user, "Барби")
+    wishlist_service.add_movie(andrey, "Оппенгеймер")
+
+    history_repo.add("Барби", rating=7, watched_at=date.today(), user_id=1)
+
+    result = selection_service.pick_movie(andrey)
+    assert result.from_intersection
+    assert result.movie == "Дюна"
+
+
+def test_last_pick_excluded_case_insensitively(db, user_service, wishlist_service, selection_service, state_repo):
+    """Last pick is compared ignoring case of Cyrillic titles."""
+    andrey = user_service.register(_ANDREY.telegram_id, _ANDREY.display_name).user
+    wishlist_service.add_movie(andrey, "Дюна")
+    wishlist_service.add_movie(andrey, "Барби")
+
+    for _ in range(5):
+        state_repo.set("last_selected_movie", "ДЮНА")
+        assert selection_service.pick_movie(andrey).movie == "Барби"
@@ -19,7 +19,7 @@ def bot_asked_for_rating(movie: str, fake_bot: FakeBot):
 def user_sends_watched_message(user_service, watch_service, wishlist_service, fake_bot: FakeBot, user_name: str, message: str):
     """User sends a 'watched' message."""
     user = get_test_user(user_name)
-    user_service.register(user.telegram_id, user.display_name)
+    db_user = user_service.register(user.telegram_id, user.display_name).user
 
     if message.startswith("посмотрели"):
         text = message[len("посмотрели"):].strip()
@@ -34,10 +34,11 @@ def user_sends_watched_message(user_service, watch_service, wishlist_service, fa
             if rating < 1 or rating > 10:
                 fake_bot.send("🤔 Оценка должна быть от 1 до 10. Попробуй ещё раз")
             else:
-                in_wishlist = movie_name.lower() in [m.lower() for m in wishlist_service.get_all_movies()]
-                result = watch_service.mark_watched(user.telegram_id, movie_name, rating)
+                result = watch_service.mark_watched(db_user, movie_name, rating)
 
-                if in_wishlist:
+                if result.suggestion:
+                    fake_bot.send(Messages.watched_suggestion(result.movie_title, result.suggestion))
+                elif result.in_wishlist:
                     fake_bot.send(Messages.movie_watched(result.movie_title, rating))
                 else:
                     fake_bot.send(Messages.movie_added_to_history(result.movie_title, rating))
@@ -84,3 +85,9 @@ def movie_added_to_history(history_repo, movie: str, rating: int):
     item = history_repo.find_by_title(movie)
     assert item is not None
     assert item.rating == rating
+
+
+@then(parsers.parse('фильм "{movie}" отсутствует в истории'))
+def movie_not_in_history(history_repo, movie: str):
+    """Check nothing was recorded for the movie."""
+    assert history_repo.find_by_title(movie) is None
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Tests for the synthetic dataset and regression check of the benchmark suite."""
+
+import json
+from argparse import Namespace
+from collections import Counter
+
+from benchmarks.dataset import DatasetSpec, generate
+from benchmarks.services import compare
+from src.database import Database
+
+
+def test_dataset_is_zipfian_and_in_sync(db: Database):
+    spec = DatasetSpec(users=3, titles=500, wishlist_size=40, history_rows=2000)
+    users = generate(db, spec)
+
+    assert len(users) == 3
+    for user in users:
+        count = db.execute("SELECT COUNT(*) FROM wishlist WHERE user_id = ?", (user.id,)).fetchone()[0]
+        assert count == 40
+    # Popular titles are in several wishlists, so the shared list is not empty
+    shared = db.execute("SELECT COUNT(*) FROM shared_wishlist").fetchone()[0]
+    assert shared > 0
+
+    titles = Counter(row[0] for row in db.execute("SELECT title_key FROM watch_history"))
+    assert sum(titles.values()) == 2000
+    assert titles.most_common(1)[0][1] > 2000 / 500 * 10
+    # Triggers kept the full-text index up to date
+    assert db.execute("SELECT COUNT(*) FROM history_fts").fetchone()[0] == 2000
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    def save(name, results):
+        path = tmp_path / name
+        path.write_text(json.dumps({"results": results}), "utf-8")
+        return str(path)
+
+    baseline = save("old.json", {"1000": {"get_history": {"median_ms": 1.0}, "pick_movie": {"median_ms": 0.01}}})
+    same = save("same.json", {"1000": {"get_history": {"median_ms": 1.1}, "pick_movie": {"median_ms": 0.03}}})
+    slower = save("slow.json", {"1000": {"get_history": {"median_ms": 1.5}, "pick_movie": {"median_ms": 0.01}}})
+
+    # pick_movie tripled, but by less than the noise floor
+    assert compare(Namespace(baseline=baseline, current=same, threshold=0.25)) == 0
+    assert compare(Namespace(baseline=baseline, current=slower, threshold=0.25)) == 1
+    assert "REGRESSION" in capsys.readouterr().out
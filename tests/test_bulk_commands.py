@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Tests for commands with several titles."""
+
+from src.bot.messages import Messages
+from src.services.watch_service import BulkWatchResult
+from src.utils.commands import (
+    AddMovie,
+    AddMovies,
+    DeleteMovie,
+    DeleteMovies,
+    MarkWatched,
+    MarkWatchedMany,
+    parse_command,
+)
+
+
+def test_bulk_commands_are_parsed():
+    assert parse_command("хочу посмотреть Дюна\nбарби") == AddMovies(("Дюна", "барби"))
+    assert parse_command("хочу посмотреть\nЛюбовь, смерть и роботы\nДюна") == AddMovies(
+        ("Любовь, смерть и роботы", "Дюна")
+    )
+    assert parse_command("хочу посмотреть Дюна\n\n") == AddMovie("Дюна")
+    assert parse_command("удали Дюна\nБарби") == DeleteMovies(("Дюна", "Барби"))
+    assert parse_command("удали Дюна") == DeleteMovie("Дюна")
+
+    # A last rating line applies to every title without its own
+    assert parse_command("посмотрели Дюна\nБарби\n8") == MarkWatchedMany((("Дюна", 8), ("Барби", 8)))
+    assert parse_command("посмотрели\nДюна, 9\nБарби\nоценка 7") == MarkWatchedMany((("Дюна", 9), ("Барби", 7)))
+    assert parse_command("посмотрели Дюна\n1917") == MarkWatchedMany((("Дюна", None), ("1917", None)))
+    assert parse_command("посмотрели Дюна 2\n8") == MarkWatched("Дюна 2", 8)
+    assert parse_command("посмотрели Дюна 2, 8") == MarkWatched("Дюна 2", 8)
+
+
+def test_commas_stay_in_single_line_titles():
+    assert parse_command("хочу посмотреть Хороший, плохой, злой") == AddMovie("Хороший, плохой, злой")
+    assert parse_command("хочу посмотреть Спасибо, что живой") == AddMovie("Спасибо, что живой")
+    assert parse_command("удали Хороший, плохой, злой") == DeleteMovie("Хороший, плохой, злой")
+    assert parse_command("посмотрели Спасибо, что живой") == MarkWatched("Спасибо, что живой", None)
+    assert parse_command("посмотрели Спасибо, что живой, 9") == MarkWatched("Спасибо, что живой", 9)
+    assert parse_command("посмотрели\nХороший, плохой, злой\nСпасибо, что живой, 8") == MarkWatchedMany(
+        (("Хороший, плохой, злой", None), ("Спасибо, что живой", 8))
+    )
+
+
+def test_unrated_hint_example_marks_two_titles():
+    hint = Messages.movies_watched(BulkWatchResult(watched=[], unrated=["Дюна"]))
+    assert hint.endswith(Messages.BULK_WATCH_EXAMPLE)
+    assert parse_command(Messages.BULK_WATCH_EXAMPLE) == MarkWatchedMany((("Дюна", 8), ("Барби", 8)))
+
+
+def test_bulk_add_and_delete(user_repo, wishlist_service):
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+    wishlist_service.add_movie(masha, "Дюна")
+    wishlist_service.add_movie(andrey, "Барби")
+
+    result = wishlist_service.add_movies(andrey, ["дюна", "барби", "оппенгеймер", "Оппенгеймер"])
+    assert result.added == ["Дюна", "Оппенгеймер"]  # Masha's spelling is reused
+    assert result.skipped == ["Барби", "Оппенгеймер"]
+    assert wishlist_service.get_user_wishlist(andrey) == ["Барби", "Дюна", "Оппенгеймер"]
+    assert Messages.movies_added(result) == (
+        "✅ Добавил в твой список: «Дюна», «Оппенгеймер»\nℹ️ Уже есть в списке: «Барби», «Оппенгеймер»"
+    )
+
+    result = wishlist_service.delete_movies(andrey, ["ДЮНА", "барби", "Аватар"])
+    assert (result.deleted, result.not_found) == (["Дюна", "Барби"], ["Аватар"])
+    assert wishlist_service.get_user_wishlist(andrey) == ["Оппенгеймер"]
+    assert wishlist_service.get_user_wishlist(masha) == ["Дюна"]
+
+
+def test_bulk_watched(user_repo, wishlist_service, watch_service, history_repo):
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+    wishlist_service.add_movies(andrey, ["Дюна", "Барби"])
+    wishlist_service.add_movie(masha, "Дюна")
+
+    result = watch_service.mark_watched_many(andrey, [("дюна", 9), ("Аватар", 7), ("Барби", None), ("Дюна", 8)])
+    assert [(item.movie_title, item.rating, item.in_wishlist) for item in result.watched] == [
+        ("Дюна", 9, True),
+        ("Аватар", 7, False),
+    ]
+    assert result.unrated == ["Барби"]
+    assert sorted((item.movie_title, item.rating) for item in history_repo.get_all()) == [
+        ("Аватар", 7),
+        ("Дюна", 9),
+    ]
+    # Watched titles leave every wishlist of the group
+    assert wishlist_service.get_user_wishlist(andrey) == ["Барби"]
+    assert wishlist_service.get_user_wishlist(masha) == []
+    assert Messages.movies_watched(result).startswith("✅ В архиве:\n• Дюна — 9/10\n• Аватар — 7/10\n🤔")
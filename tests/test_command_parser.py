@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Tests for the text command parser and its dispatcher integration."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+
+from src.bot.filters import IsCommand
+from src.bot.middlewares import CommandMiddleware
+from src.utils.commands import (
+    AddMovie,
+    AskMovieTitle,
+    DeleteMovie,
+    MarkWatched,
+    PickMovie,
+    SearchHistory,
+    ShowHistory,
+    ShowMyList,
+    ShowStats,
+    parse_command,
+)
+
+RECORDED_UPDATE = json.loads((Path(__file__).parent / "data" / "webhook_update.json").read_text("utf-8"))
+
+
+def test_messages_are_classified():
+    assert parse_command("Хочу посмотреть  Дюна ") == AddMovie("Дюна")
+    assert parse_command("хочу посмотреть") == AddMovie("")
+    assert parse_command("➕ Добавить фильм") == AskMovieTitle()
+    assert parse_command("📋 Мой список") == ShowMyList()
+    assert parse_command("мой список фильмов") is None
+    assert parse_command("🎲 Что смотрим?") == PickMovie()
+    assert parse_command("удали Барби") == DeleteMovie("Барби")
+    assert parse_command("удалить Барби") == DeleteMovie("Барби")
+    assert parse_command("удалиБарби") is None
+    assert parse_command("📚 История март 2025") == ShowHistory("март 2025")
+    assert parse_command("статистика 2025") == ShowStats(2025)
+    assert parse_command("статистика за год") is None
+    assert parse_command("Мы смотрели Дюну?") == SearchHistory("Дюну")
+    assert parse_command("смотрели ?") is None
+    assert parse_command("/start") is None
+    assert parse_command(None) is None
+
+
+def test_rating_is_parsed_from_watched_message():
+    assert parse_command("посмотрели Дюна 2") == MarkWatched("Дюна 2", None)
+    assert parse_command("посмотрели Дюна 2, 8") == MarkWatched("Дюна 2", 8)
+    assert parse_command("Посмотрели Барби, оценка 7/10") == MarkWatched("Барби", 7)
+    assert parse_command("посмотрели Оппенгеймер 9/10") == MarkWatched("Оппенгеймер", 9)
+    assert parse_command("посмотрели Дюна, 11/10") == MarkWatched("Дюна", 11)
+
+
+def test_handlers_receive_parsed_command():
+    """The middleware parses once; IsCommand routes and injects the command."""
+
+    async def scenario():
+        received = []
+        dp = Dispatcher()
+        dp.message.outer_middleware(CommandMiddleware())
+
+        @dp.message(IsCommand(DeleteMovie))
+        async def delete(message: Message, text_command: DeleteMovie):
+            received.append(("delete", text_command))
+
+        @dp.message(IsCommand(AddMovie))
+        async def add(message: Message, text_command: AddMovie):
+            received.append(("add", text_command))
+
+        @dp.message()
+        async def fallback(message: Message, text_command):
+            received.append(("fallback", text_command))
+
+        bot = Bot(token="42:TEST")
+        for text in ["хочу посмотреть Дюна", "удали Дюна", "привет"]:
+            data = dict(RECORDED_UPDATE, message=dict(RECORDED_UPDATE["message"], text=text))
+            await dp.feed_update(bot, Update.model_validate(data, context={"bot": bot}))
+        await bot.session.close()
+
+        assert received == [
+            ("add", AddMovie("Дюна")),
+            ("delete", DeleteMovie("Дюна")),
+            ("fallback", None),
+        ]
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Tests for the in-memory conversation store."""
+
+from pathlib import Path
+
+from src.bot.conversation import ConversationStore
+from src.database.repositories import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+ANDREY = User(id=1, telegram_id=1001, display_name="Андрей")
+ANDREY_IN_GROUP = User(id=2, telegram_id=1001, display_name="Андрей", group_id=-100)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    store = ConversationStore(ttl=60, clock=clock)
+    store.set(ANDREY, ConversationStore.PENDING_MOVIE, "Дюна")
+
+    clock.now += 59
+    assert store.get(ANDREY, ConversationStore.PENDING_MOVIE) == "Дюна"
+    assert store.get(ANDREY_IN_GROUP, ConversationStore.PENDING_MOVIE) is None
+
+    clock.now += 1
+    assert store.get(ANDREY, ConversationStore.PENDING_MOVIE) is None
+    assert store.sweep() == 1
+    assert len(store) == 0
+
+
+def test_pop_takes_value_once():
+    store = ConversationStore()
+    store.set(ANDREY, ConversationStore.AWAITING_MOVIE, "1")
+    assert store.pop(ANDREY, ConversationStore.AWAITING_MOVIE) == "1"
+    assert store.pop(ANDREY, ConversationStore.AWAITING_MOVIE) is None
+
+
+def test_snapshot_survives_restart(tmp_path: Path):
+    clock = FakeClock()
+    path = str(tmp_path / "conversations.json")
+    store = ConversationStore(ttl=60, path=path, clock=clock)
+    store.set(ANDREY_IN_GROUP, ConversationStore.PENDING_MOVIE, "Дюна")
+    store.set(ANDREY, ConversationStore.AWAITING_MOVIE, "1")
+    clock.now += 30
+    store.set(ANDREY, ConversationStore.PENDING_MOVIE, "Барби")
+    store.save()
+
+    clock.now += 40  # first two entries are expired by now
+    restored = ConversationStore(ttl=60, path=path, clock=clock)
+    restored.load()
+    assert len(restored) == 1
+    assert restored.get(ANDREY, ConversationStore.PENDING_MOVIE) == "Барби"
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Tests for the dedicated database worker thread."""
+
+import asyncio
+import threading
+
+from src.database import AsyncService, DatabaseSettings, read_only
+from src.database.repositories import UserRepository
+from src.services import UserService
+
+
+def test_worker_runs_queries_off_the_event_loop(database_worker):
+    """Queries execute on the worker thread and results come back to the loop."""
+
+    async def scenario():
+        async with database_worker() as worker:
+            loop_thread = threading.get_ident()
+            db_thread = await worker.run(threading.get_ident)
+            assert db_thread != loop_thread
+
+            result = await worker.execute(
+                "INSERT INTO users (telegram_id, display_name) VALUES (?, ?)", (1001, "Андрей")
+            )
+            await worker.commit()
+            assert result.rowcount == 1
+
+            row = await worker.fetchone("SELECT display_name FROM users WHERE id = ?", (result.lastrowid,))
+            assert row["display_name"] == "Андрей"
+
+    asyncio.run(scenario())
+
+
+def test_async_service_forwards_calls(database_worker):
+    """AsyncService exposes awaitable versions of service methods."""
+
+    async def scenario():
+        async with database_worker() as worker:
+            user_service = AsyncService(UserService(UserRepository(worker.db)), worker)
+
+            first = await user_service.register(1001, "Андрей")
+            second = await user_service.register(1001, "Андрей")
+            assert first.is_new and not second.is_new
+            assert [u.telegram_id for u in await user_service.get_all_users()] == [1001]
+
+    asyncio.run(scenario())
+
+
+def test_read_only_methods_use_reader_pool(database_worker):
+    """With WAL and a read pool, @read_only calls run on reader threads."""
+
+    async def scenario():
+        settings = DatabaseSettings(journal_mode="WAL", synchronous="NORMAL", read_pool_size=2)
+        async with database_worker(settings) as worker:
+            db = worker.db
+            assert (await worker.fetchone("PRAGMA journal_mode"))[0] == "wal"
+
+            class Probe:
+                def write(self):
+                    db.execute("INSERT INTO users (telegram_id, display_name) VALUES (1001, 'Андрей')")
+                    db.commit()
+                    return threading.current_thread().name
+
+                @read_only
+                def read(self):
+                    names = [r["display_name"] for r in db.execute("SELECT display_name FROM users")]
+                    return threading.current_thread().name, names
+
+            probe = AsyncService(Probe(), worker)
+            writer_thread = await probe.write()
+            reader_thread, names = await probe.read()
+            assert writer_thread.startswith("moviebot-db_")
+            assert reader_thread.startswith("moviebot-db-read")
+            assert names == ["Андрей"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Tests for streaming CSV / JSON Lines export."""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import date
+
+from aiogram import Dispatcher
+from aiohttp.test_utils import TestServer
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from src.app import create_bot
+from src.bot.handlers.export import router as export_router
+from src.bot.middlewares import CommandMiddleware
+from src.database import AsyncService
+from src.database.repositories import HistoryRepository, UserRepository, WishlistRepository
+from src.services import ExportService
+from src.services import export_service as export_module
+
+
+def test_history_is_encoded_in_batches(monkeypatch, user_repo, history_repo, wishlist_repo):
+    andrey = user_repo.create(1001, "Андрей")
+    for day in range(1, 8):
+        history_repo.add(f"Фильм {day}", day, date(2026, 3, day), andrey.id)
+    wishlist_repo.add(andrey.id, "Дюна, часть вторая")
+
+    fetched = []
+    original = history_repo.iter_export
+    monkeypatch.setattr(history_repo, "iter_export", lambda group_id: original(group_id, batch_size=3))
+    monkeypatch.setattr(export_module, "SPOOL_MAX_SIZE", 64)  # Roll over to a real file
+    service = ExportService(history_repo, wishlist_repo)
+
+    export = service.export("history", "csv")
+    assert (export.filename, export.rows) == ("history.csv", 7)
+    assert export.file._rolled  # Written to disk, not kept in memory
+    rows = list(csv.reader(io.TextIOWrapper(export.file, encoding="utf-8-sig", newline="")))
+    assert rows[0] == ["watched_at", "movie_title", "rating", "marked_by"]
+    assert rows[1] == ["2026-03-01", "Фильм 1", "1", "Андрей"]
+    assert len(rows) == 8
+
+    export = service.export("wishlists", "jsonl")
+    lines = export.file.read().decode("utf-8").splitlines()
+    export.file.close()
+    assert json.loads(lines[0])["movie_title"] == "Дюна, часть вторая"
+    assert json.loads(lines[0])["user"] == "Андрей"
+
+
+def test_export_is_sent_as_document(database_worker):
+    async def scenario():
+        async with database_worker() as worker:
+            db = worker.db
+            user = await worker.run_write(UserRepository(db).create, 1001, "Андрей")
+            history = HistoryRepository(db)
+            await worker.run_write(history.add, "Дюна", 9, date(2026, 3, 1), user.id)
+
+            dp = Dispatcher()
+            dp.message.outer_middleware(CommandMiddleware())
+            dp["user"] = user
+            dp["export_service"] = AsyncService(ExportService(history, WishlistRepository(db)), worker)
+            dp.include_router(export_router)
+
+            server = FakeTelegramServer()
+            async with TestServer(server.create_app()) as http:
+                bot = create_bot("42:TEST", api_url=str(http.make_url("")).rstrip("/"))
+                polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=1))
+                try:
+                    reply = await asyncio.wait_for(server.send_message(1001, "экспорт история json"), 5)
+                    empty = await asyncio.wait_for(server.send_message(1001, "экспорт списки"), 5)
+                finally:
+                    await dp.stop_polling()
+                    await polling
+                    await bot.session.close()
+        return reply, empty
+
+    reply, empty = asyncio.run(scenario())
+    assert reply.method == "sendDocument"
+    assert reply.params["result"]["document"]["file_name"] == "history.jsonl"
+    assert reply.params["caption"] == "📦 История просмотров, строк: 1"
+    assert json.loads(reply.params["document"]) == {
+        "watched_at": "2026-03-01",
+        "movie_title": "Дюна",
+        "rating": 9,
+        "marked_by": "Андрей",
+    }
+    assert empty.text == "📭 Выгружать пока нечего"
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Tests for the fake Bot API server used by the load generator."""
+
+import asyncio
+
+from aiogram import Dispatcher, F
+from aiogram.types import CallbackQuery, Message
+from aiohttp.test_utils import TestServer
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from src.app import create_bot
+from src.bot.keyboards import rating_keyboard
+
+
+def test_bot_polls_and_replies_through_fake_api():
+    """A bot created with api_url talks to the fake server end to end."""
+
+    async def scenario():
+        dp = Dispatcher()
+
+        @dp.message()
+        async def ask_rating(message: Message):
+            await message.answer(f"Оценка для «{message.text}»?", reply_markup=rating_keyboard())
+
+        @dp.callback_query(F.data.startswith("rate:"))
+        async def rate(callback: CallbackQuery):
+            await callback.message.edit_text(f"Оценка {callback.data[5:]}")
+            await callback.answer()
+
+        server = FakeTelegramServer()
+        async with TestServer(server.create_app()) as http:
+            bot = create_bot("42:TEST", api_url=str(http.make_url("")).rstrip("/"))
+            polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=1))
+            try:
+                reply = await asyncio.wait_for(server.send_message(1001, "Дюна"), 5)
+                assert reply.method == "sendMessage"
+                assert reply.text == "Оценка для «Дюна»?"
+                assert reply.reply_markup["inline_keyboard"][1][-1]["callback_data"] == "rate:10"
+
+                edit = await asyncio.wait_for(server.press_button(reply, "rate:9"), 5)
+                assert (edit.method, edit.text) == ("editMessageText", "Оценка 9")
+            finally:
+                await dp.stop_polling()
+                await polling
+                await bot.session.close()
+        assert server.calls["getMe"] == 1
+
+    asyncio.run(scenario())
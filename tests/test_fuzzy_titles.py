@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Tests for typo-tolerant title matching."""
+
+from src.utils import TrigramIndex, edit_distance
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("оппенгеймер", "опенгеймер", 2) == 1
+    assert edit_distance("барби", "барби", 1) == 0
+    assert edit_distance("дюна", "интерстеллар", 2) == 3
+
+
+def test_index_finds_closest_title():
+    index = TrigramIndex()
+    for title in ["оппенгеймер", "интерстеллар", "дюна", "дюна 2", "барби"]:
+        index.add(title)
+
+    assert index.closest("опенгеймер") == "оппенгеймер"
+    assert index.closest("интерстелар") == "интерстеллар"
+    assert index.closest("дюна 3") is None  # Another part, not a typo
+    assert index.closest("бар") is None  # Too short to guess
+    assert index.closest("матрица") is None
+
+    index.discard("оппенгеймер")
+    assert index.closest("опенгеймер") is None
+
+
+def test_services_use_known_titles(user_repo, wishlist_service, watch_service, history_repo):
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+    wishlist_service.add_movie(masha, "Оппенгеймер")
+    watch_service.mark_watched(masha, "Интерстеллар", 9)
+
+    # Typo of a history title is suggested, nothing is added
+    result = wishlist_service.add_movie(andrey, "интерстелар")
+    assert result.suggestion == "Интерстеллар"
+    assert wishlist_service.get_user_wishlist(andrey) == []
+
+    # The user may insist on their spelling
+    result = wishlist_service.add_movie(andrey, "интерстелар", suggest=False)
+    assert result.suggestion is None
+    assert wishlist_service.get_user_wishlist(andrey) == ["Интерстелар"]
+
+    # "посмотрели" with a typo suggests the wishlist title, nothing is marked
+    result = watch_service.mark_watched(andrey, "опенгеймер", 8)
+    assert result.suggestion == "Оппенгеймер"
+    assert [item.movie_title for item in history_repo.get_all()] == ["Интерстеллар"]
+
+    # The confirmed title is marked and leaves the wishlists
+    result = watch_service.mark_watched(andrey, result.suggestion, 8, suggest=False)
+    assert result.movie_title == "Оппенгеймер"
+    assert result.in_wishlist
+    assert wishlist_service.get_all_movies() == ["Интерстелар"]
+    assert {item.movie_title for item in history_repo.get_all()} == {"Интерстеллар", "Оппенгеймер"}
+
+
+def test_bulk_watch_keeps_typed_titles(user_repo, wishlist_service, watch_service, history_repo):
+    """A list is not questioned title by title: typos are never replaced."""
+    masha = user_repo.create(1002, "Маша")
+    wishlist_service.add_movie(masha, "Оппенгеймер")
+
+    result = watch_service.mark_watched_many(masha, [("опенгеймер", 8), ("оппенгеймер", 9)])
+    assert [item.movie_title for item in result.watched] == ["Опенгеймер", "Оппенгеймер"]
+    assert wishlist_service.get_all_movies() == []
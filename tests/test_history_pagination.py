@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Tests for keyset-paginated, period-scoped history."""
+
+from datetime import date, timedelta
+
+from src.database import Database
+from src.database.repositories import HistoryCursor, HistoryRepository, UserRepository
+from src.services import HistoryService
+
+TODAY = date(2026, 1, 15)
+
+
+def fill_history(history_repo: HistoryRepository, count: int) -> None:
+    """One movie per day going back from TODAY, two on TODAY itself."""
+    history_repo.add("Сегодня ещё", 5, TODAY, user_id=1)
+    for i in range(count - 1):
+        history_repo.add(f"Фильм {i}", i % 10 + 1, TODAY - timedelta(days=i), user_id=1)
+
+
+def titles(result) -> list[str]:
+    return [movie.movie_title for month in result.months for movie in month.movies]
+
+
+def test_pages_walk_both_ways(db: Database):
+    UserRepository(db).create(1001, "Андрей")
+    history_repo = HistoryRepository(db)
+    fill_history(history_repo, 45)
+    service = HistoryService(history_repo)
+    period = service.get_period("", TODAY)
+
+    first = service.get_history(period=period, page_size=20)
+    assert first.total_count == 45 and first.newer is None
+    second = service.get_history(period=period, older_than=first.older, page_size=20)
+    third = service.get_history(period=period, older_than=second.older, page_size=20)
+    assert len(titles(third)) == 5 and third.older is None
+
+    seen = titles(first) + titles(second) + titles(third)
+    assert len(set(seen)) == 45
+    # Same-day items are ordered by id, newest first
+    assert seen[:2] == ["Фильм 0", "Сегодня ещё"]
+
+    back = service.get_history(period=period, newer_than=third.newer, page_size=20)
+    assert titles(back) == titles(second)
+    assert titles(service.get_history(period=period, newer_than=back.newer, page_size=20)) == titles(first)
+
+
+def test_period_filters_and_stats(db: Database):
+    UserRepository(db).create(1001, "Андрей")
+    history_repo = HistoryRepository(db)
+    history_repo.add("Дюна 2", 9, date(2025, 12, 22), user_id=1)
+    history_repo.add("Барби", 7, date(2026, 1, 5), user_id=1)
+    history_repo.add("Старое кино", 4, date(2024, 3, 1), user_id=1)
+    service = HistoryService(history_repo)
+
+    last_year = service.get_history(period=service.get_period("", TODAY))
+    assert last_year.total_count == 2 and last_year.average_rating == 8.0
+
+    december = service.get_history(period=service.parse_period("декабрь 2025", TODAY))
+    assert titles(december) == ["Дюна 2"]
+    assert december.period.label == "декабрь 2025"
+
+    empty_year = service.get_history(period=service.parse_period("2023", TODAY))
+    assert empty_year.total_count == 0 and not empty_year.is_empty
+
+    assert service.parse_period("03.2024", TODAY).since == date(2024, 3, 1)
+    assert service.parse_period("завтра", TODAY) is None
+
+
+def test_page_query_uses_group_date_index(db: Database):
+    """EXPLAIN the queries get_page runs for every page direction."""
+    history_repo = HistoryRepository(db)
+    queries = []
+    execute = db.execute
+
+    def capture(sql, params=()):
+        queries.append((sql, params))
+        return execute(sql, params)
+
+    db.execute = capture
+    edge = HistoryCursor(watched_at=date(2025, 6, 1), id=10)
+    for page in ({}, {"older_than": edge}, {"newer_than": edge}):
+        history_repo.get_page(0, date(2025, 1, 1), date(2026, 1, 1), 21, **page)
+    db.execute = execute
+
+    pages = [(sql, params) for sql, params in queries if "LIMIT" in sql]
+    assert len(pages) == 3
+    for sql, params in pages:
+        plan = db.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        details = " ".join(row["detail"] for row in plan)
+        assert "idx_history_group_date" in details
+        assert "TEMP B-TREE" not in details
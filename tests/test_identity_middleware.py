@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Tests for the identity middleware user cache."""
+
+import asyncio
+import logging
+from datetime import date
+
+from aiogram.types import Chat, User as TelegramUser
+
+from src.bot import groups
+from src.bot.middlewares import IdentityMiddleware
+from src.database import AsyncService, Database, DEFAULT_GROUP_ID
+from src.database.repositories import HistoryRepository, UserRepository
+from src.services import UserService
+
+
+class CountingUserService(UserService):
+    """UserService that counts register calls."""
+
+    def __init__(self, user_repo: UserRepository):
+        super().__init__(user_repo)
+        self.calls = 0
+
+    def register(self, *args, **kwargs):
+        self.calls += 1
+        return super().register(*args, **kwargs)
+
+
+def test_user_resolved_from_cache(database_worker):
+    """Only misses and name changes reach the database."""
+
+    async def scenario():
+        async with database_worker() as worker:
+            service = CountingUserService(UserRepository(worker.db))
+            middleware = IdentityMiddleware(AsyncService(service, worker), maxsize=8)
+
+            async def handler(event, data):
+                return data["user"]
+
+            chat = Chat(id=-100, type="group")
+
+            async def send(name: str, telegram_id: int = 1001, chat: Chat = chat):
+                from_user = TelegramUser(id=telegram_id, is_bot=False, first_name=name)
+                return await middleware(handler, None, {"event_from_user": from_user, "event_chat": chat})
+
+            first = await send("Андрей")
+            second = await send("Андрей")
+            assert first.group_id == -100 and second.id == first.id
+            assert service.calls == 1
+
+            renamed = await send("Андрюша")
+            assert renamed.display_name == "Андрюша"
+            assert service.calls == 2
+            assert (await worker.run(service.get_user, 1001, -100)).display_name == "Андрюша"
+
+            # Private chats of different people do not share a group
+            andrey = await send("Андрей", 1001, Chat(id=1001, type="private"))
+            masha = await send("Маша", 1002, Chat(id=1002, type="private"))
+            assert (andrey.group_id, masha.group_id) == (1001, 1002)
+
+    asyncio.run(scenario())
+
+
+def test_legacy_chat_gets_the_default_group(monkeypatch):
+    """Lists recorded before chats were partitioned stay reachable from one chat."""
+    monkeypatch.setattr(groups, "LEGACY_GROUP_CHAT_ID", -200)
+    assert groups.chat_group_id(Chat(id=-200, type="group")) == DEFAULT_GROUP_ID
+    assert groups.chat_group_id(Chat(id=1001, type="private")) == 1001
+
+
+def test_unassigned_legacy_data_is_warned_about(db: Database, monkeypatch, caplog):
+    monkeypatch.setattr(groups, "LEGACY_GROUP_CHAT_ID", None)
+    with caplog.at_level(logging.WARNING, logger="src.bot.groups"):
+        groups.warn_if_legacy_group_unassigned(db)
+        assert not caplog.records  # Nothing recorded yet
+
+        user = UserRepository(db).create(1001, "Андрей")
+        HistoryRepository(db).add("Дюна", 8, date(2025, 1, 5), user_id=user.id)
+        groups.warn_if_legacy_group_unassigned(db)
+        assert "LEGACY_GROUP_CHAT_ID" in caplog.records[0].getMessage()
+
+        monkeypatch.setattr(groups, "LEGACY_GROUP_CHAT_ID", -200)
+        groups.warn_if_legacy_group_unassigned(db)
+    assert len(caplog.records) == 1
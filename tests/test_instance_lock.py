@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Tests for the one-instance-per-database guard."""
+
+from pathlib import Path
+
+from src.utils import acquire_instance_lock
+
+
+def test_second_instance_is_refused(tmp_path: Path):
+    path = str(tmp_path / "moviebot.db.lock")
+    first = acquire_instance_lock(path)
+    assert first is not None
+    assert acquire_instance_lock(path) is None
+
+    first.close()
+    again = acquire_instance_lock(path)
+    assert again is not None
+    again.close()
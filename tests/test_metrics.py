@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Tests for per-handler metrics and their Prometheus rendering."""
+
+import asyncio
+from datetime import date
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message, Update
+
+from src.bot.metrics import BotMetrics
+from src.bot.middlewares import HandlerNameMiddleware, MetricsMiddleware
+from src.database.repositories import HistoryRepository, UserRepository
+from src.utils import LRUCache
+from src.utils.metrics import UpdateStats, current_update_stats
+
+
+def make_update(bot: Bot, text: str) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": 1,
+            "message": {
+                "message_id": 1,
+                "date": 1760800000,
+                "chat": {"id": 1001, "type": "private"},
+                "from": {"id": 1001, "is_bot": False, "first_name": "Андрей"},
+                "text": text,
+            },
+        },
+        context={"bot": bot},
+    )
+
+
+def test_queries_and_errors_are_counted_per_handler(database_worker):
+    async def scenario():
+        async with database_worker(instrumented=True) as worker:
+            db = worker.db
+            user = await worker.run_write(UserRepository(db).create, 1001, "Андрей")
+            history = HistoryRepository(db)
+            metrics = BotMetrics()
+            cache = LRUCache(4)
+            metrics.registry.track_cache("users", cache.stats)
+
+            dp = Dispatcher()
+            dp.update.outer_middleware(MetricsMiddleware(metrics))
+            dp.message.middleware(HandlerNameMiddleware())
+
+            async def mark_watched(message: Message):
+                await worker.run_write(history.add, message.text, 8, date(2026, 1, 5), user.id)
+                await worker.run(history.find_by_title, message.text)
+
+            async def broken(message: Message):
+                raise RuntimeError("boom")
+
+            dp.message.register(broken, lambda message: message.text == "сломай")
+            dp.message.register(mark_watched)
+
+            bot = Bot(token="42:TEST")
+            await dp.feed_update(bot, make_update(bot, "Дюна"))
+            await dp.feed_update(bot, make_update(bot, "Барби"))
+            try:
+                await dp.feed_update(bot, make_update(bot, "сломай"))
+            except RuntimeError:
+                pass
+            cache.put("a", 1)
+            cache.get("a"), cache.get("b")
+        await bot.session.close()
+        return metrics.registry.render()
+
+    text = asyncio.run(scenario())
+    assert 'moviebot_update_seconds_count{handler="mark_watched"} 2' in text
+    assert 'moviebot_update_errors_total{handler="broken"} 1' in text
+    # INSERT + SELECT per update
+    assert 'moviebot_sql_queries_total{handler="mark_watched"} 4' in text
+    assert 'moviebot_sql_rows_total{handler="mark_watched",kind="read"} 2' in text
+    assert 'moviebot_sql_rows_total{handler="mark_watched",kind="written"} 2' in text
+    assert 'moviebot_update_sql_queries_bucket{handler="mark_watched",le="2"} 2' in text
+    assert 'moviebot_cache_hit_ratio{cache="users"} 0.5' in text
+    assert "# TYPE moviebot_update_seconds histogram" in text
+
+
+def test_group_commit_is_charged_to_every_update(database_worker):
+    """Each update whose writes shared a commit records its duration."""
+
+    async def scenario():
+        async with database_worker(commit_delay=0.02, instrumented=True) as worker:
+            users = UserRepository(worker.db)
+
+            async def update(telegram_id: int) -> UpdateStats:
+                stats = UpdateStats()
+                current_update_stats.set(stats)
+                await worker.run_write(users.create, telegram_id, "Андрей")
+                return stats
+
+            return await asyncio.gather(*(asyncio.create_task(update(1000 + i)) for i in range(3)))
+
+    stats = asyncio.run(scenario())
+    assert all(update.commit_seconds > 0 for update in stats)
+    assert len({update.commit_seconds for update in stats}) == 1
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Tests for schema migrations and group partitioning."""
+
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+from src.database import Database, DEFAULT_GROUP_ID, run_migrations
+from src.database.migrations import SCHEMA, MIGRATIONS, get_schema_version
+from src.database.repositories import HistoryRepository, UserRepository, WishlistRepository
+from src.services import UserService, WishlistService
+
+
+def test_legacy_database_is_migrated_without_data_loss(tmp_path: Path):
+    """Rows created before group scoping land in the default group."""
+    db_path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("PRAGMA foreign_keys = ON")
+    legacy.executescript(SCHEMA)
+    legacy.execute("INSERT INTO users (telegram_id, display_name) VALUES (1001, 'Андрей')")
+    legacy.executemany(
+        "INSERT INTO wishlist (user_id, movie_title, movie_title_lower) VALUES (1, ?, ?)",
+        [("Дюна", "дюна"), ("Ёлки", "ёлки"), ("Елки", "елки")],
+    )
+    legacy.execute("INSERT INTO bot_state (key, value) VALUES ('last_selected_movie', 'Дюна')")
+    legacy.execute("INSERT INTO bot_state (key, value) VALUES ('pending_movie:1001', 'Дюна')")
+    legacy.execute(
+        """INSERT INTO watch_history (movie_title, movie_title_lower, rating, watched_at)
+           VALUES ('Барби', 'барби', 7, '2025-07-21')"""
+    )
+    legacy.commit()
+    legacy.close()
+
+    db = Database(str(db_path))
+    run_migrations(db)
+    run_migrations(db)  # idempotent
+
+    assert get_schema_version(db) == len(MIGRATIONS)
+    user = UserRepository(db).get_by_telegram_id(1001, DEFAULT_GROUP_ID)
+    assert user is not None and user.display_name == "Андрей"
+    # Spellings of one title are merged into the first one
+    assert WishlistRepository(db).get_all_movies(DEFAULT_GROUP_ID) == ["Дюна", "Ёлки"]
+    assert WishlistRepository(db).get_shared_movies(DEFAULT_GROUP_ID) == ["Дюна", "Ёлки"]
+    stats = HistoryRepository(db).get_period_stats(DEFAULT_GROUP_ID, date(2025, 7, 1), date(2025, 8, 1))
+    assert (stats.count, stats.average_rating) == (1, 7.0)
+    assert [item.movie_title for item in HistoryRepository(db).search("барб")] == ["Барби"]
+    # Dialog state no longer lives in bot_state
+    keys = [row["key"] for row in db.execute("SELECT key FROM bot_state")]
+    assert keys == ["last_selected_movie"]
+    db.close()
+
+
+def test_groups_do_not_see_each_other(db: Database):
+    """Wishlists and intersections are scoped to their group."""
+    user_service = UserService(UserRepository(db))
+    wishlist_service = WishlistService(WishlistRepository(db))
+
+    in_first = user_service.register(1001, "Андрей", group_id=-100).user
+    in_second = user_service.register(1001, "Андрей", group_id=-200).user
+    wishlist_service.add_movie(in_first, "Дюна")
+    wishlist_service.add_movie(in_second, "Барби")
+
+    assert wishlist_service.get_all_movies(group_id=-100) == ["Дюна"]
+    assert wishlist_service.get_user_wishlist(in_second) == ["Барби"]
+    assert wishlist_service.get_intersection(group_id=DEFAULT_GROUP_ID) == []
+
+
+def test_shared_wishlist_follows_wishlist_writes(db: Database):
+    """Triggers keep the materialized intersection in sync."""
+    users = UserRepository(db)
+    wishlist = WishlistRepository(db)
+    andrey = users.create(1001, "Андрей")
+    masha = users.create(1002, "Маша")
+
+    wishlist.add(andrey.id, "Дюна")
+    wishlist.add(masha.id, "Дюна")
+    wishlist.add(masha.id, "Барби")
+    assert wishlist.get_active_user_count() == 2
+    assert wishlist.get_shared_movies() == ["Дюна"]
+
+    wishlist.delete(andrey.id, "Дюна")
+    assert wishlist.get_active_user_count() == 1
+
+    db.execute("DELETE FROM users WHERE id = ?", (masha.id,))  # cascades to wishlist
+    assert wishlist.get_active_user_count() == 0
+    assert db.execute("SELECT COUNT(*) FROM shared_wishlist").fetchone()[0] == 0
+
+
+def test_history_rollups_follow_history_writes(db: Database):
+    """Monthly rollups match a full scan after inserts, updates and deletes."""
+    andrey = UserRepository(db).create(1001, "Андрей")
+    history = HistoryRepository(db)
+    dune = history.add("Дюна 2", 9, date(2025, 12, 22), user_id=andrey.id)
+    history.add("Барби", 7, date(2026, 1, 5), user_id=andrey.id)
+    history.add("Оппенгеймер", 9, date(2026, 1, 12), user_id=andrey.id)
+    db.execute("UPDATE watch_history SET watched_at = '2026-01-02', rating = 8 WHERE id = ?", (dune.id,))
+    db.execute("DELETE FROM watch_history WHERE movie_title = 'Барби'")
+
+    months = history.get_monthly_stats(DEFAULT_GROUP_ID, date(2025, 1, 1), date(2027, 1, 1))
+    assert [(m.month, m.count, m.histogram) for m in months] == [(date(2026, 1, 1), 2, {8: 1, 9: 1})]
+
+    rollup = history.get_period_stats(DEFAULT_GROUP_ID, date(2026, 1, 1), date(2026, 2, 1))
+    scan = history.get_period_stats(DEFAULT_GROUP_ID, date(2026, 1, 1), date(2026, 1, 31))
+    assert rollup.count == scan.count == 2
+    assert rollup.average_rating == scan.average_rating == 8.5
+
+
+def test_history_search_follows_history_writes(db: Database):
+    """The full-text index is built by triggers and scoped to the group."""
+    andrey = UserRepository(db).create(1001, "Андрей")
+    history = HistoryRepository(db)
+    history.add("Дюна", 8, date(2021, 10, 30), user_id=andrey.id)
+    dune = history.add("Дюна: Часть вторая", 9, date(2024, 3, 2), user_id=andrey.id)
+    history.add("Барби", 7, date(2023, 7, 21), user_id=andrey.id)
+    history.add("Дюна", 6, date(2024, 5, 1), user_id=andrey.id, group_id=-100)
+
+    assert [i.movie_title for i in history.search("ДЮН")] == ["Дюна", "Дюна: Часть вторая"]
+    assert [i.movie_title for i in history.search("дюна вто")] == ["Дюна: Часть вторая"]
+    assert [i.rating for i in history.search("дюна", group_id=-100)] == [6]
+    assert history.search("!?") == []
+
+    db.execute(
+        "UPDATE watch_history SET movie_title = 'Дюна 2', title_key = 'дюна 2' WHERE id = ?", (dune.id,)
+    )
+    db.execute("DELETE FROM watch_history WHERE movie_title = 'Барби'")
+    assert [i.movie_title for i in history.search("дюна 2")] == ["Дюна 2"]
+    assert history.search("вторая") == []
+    assert history.search("барби") == []
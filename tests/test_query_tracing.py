@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Tests for the slow-query log and N+1 detection."""
+
+import logging
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.database import Database, QueryTracer, run_migrations
+from src.utils.metrics import UpdateStats, current_update_stats
+
+
+def test_slow_query_logged_with_plan(tmp_path: Path, caplog):
+    tracer = QueryTracer(slow_ms=0)
+    db = Database(str(tmp_path / "trace.db"))
+    run_migrations(db)
+    db.tracer = tracer
+    stats = UpdateStats(update_id=7, handler="our_list")
+    token = current_update_stats.set(stats)
+    try:
+        with caplog.at_level(logging.WARNING, logger="src.database.tracing"):
+            db.execute("SELECT DISTINCT movie_title FROM wishlist ORDER BY movie_title").fetchall()
+            db.execute("SELECT * FROM users WHERE id = ?", (1,)).fetchall()
+    finally:
+        current_update_stats.reset(token)
+
+    scan, lookup = [r.getMessage() for r in caplog.records]
+    assert "[update 7, our_list]" in scan
+    assert "full scan of wishlist" in scan
+    assert "use temp b-tree" in scan
+    assert "full scan" not in lookup and "SEARCH users" in lookup
+    assert tracer.totals["SELECT * FROM users WHERE id = ?"].count == 1
+    db.close()
+
+
+def test_repeated_statement_reported_as_n_plus_one(tmp_path: Path, caplog):
+    tracer = QueryTracer(slow_ms=1000, repeat_threshold=3)
+    db = Database(str(tmp_path / "trace.db"))
+    run_migrations(db)
+    db.tracer = tracer
+    stats = UpdateStats(update_id=8, handler="my_list")
+    token = current_update_stats.set(stats)
+    try:
+        for user_id in range(5):
+            db.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchall()
+        db.execute("SELECT COUNT(*) FROM wishlist").fetchall()
+    finally:
+        current_update_stats.reset(token)
+
+    with caplog.at_level(logging.WARNING, logger="src.database.tracing"):
+        tracer.finish_update(stats)
+    assert [r.getMessage() for r in caplog.records] == [
+        "Possible N+1: statement ran 5 times in update 8 (my_list): SELECT * FROM users WHERE id = ?"
+    ]
+    assert "SELECT * FROM users WHERE id = ?" in tracer.summary(top=1)[0]
+    db.close()
+
+
+def test_statement_time_includes_fetching_rows(tmp_path: Path):
+    tracer = QueryTracer(slow_ms=1000)
+    db = Database(str(tmp_path / "trace.db"))
+    db.tracer = tracer
+    # The first row is ready at once; the rest are computed while fetching
+    sql = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n LIMIT 200000) SELECT i FROM n"
+    started = time.perf_counter()
+    cursor = db.execute(sql)
+    executed = time.perf_counter()
+    assert sql not in tracer.totals
+    assert len(cursor.fetchall()) == 200000
+    fetched = time.perf_counter() - executed
+
+    assert tracer.totals[sql].seconds > executed - started
+    assert tracer.totals[sql].seconds > fetched / 2
+
+    # A cursor dropped with rows left is recorded too
+    assert db.execute("SELECT 1 UNION ALL SELECT 2").fetchone()[0] == 1
+    assert tracer.totals["SELECT 1 UNION ALL SELECT 2"].count == 1
+    db.close()
+
+
+def test_failed_statement_is_counted(tmp_path: Path, monkeypatch):
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    tracer = QueryTracer(slow_ms=1000)
+    db = Database(str(tmp_path / "trace.db"))
+    run_migrations(db)
+    db.tracer = tracer
+    sql = "INSERT INTO users (id, telegram_id, display_name) VALUES (1, 1001, 'Андрей')"
+    db.execute(sql)
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute(sql)
+
+    assert tracer.totals[sql].count == 2
+    assert unraisable == []
+    db.close()
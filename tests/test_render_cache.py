@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Tests for data versions and the rendered reply cache."""
+
+import asyncio
+import pytest
+
+from src.bot.messages import Messages
+from src.bot.render_cache import RenderCache
+from src.database import Database
+from src.utils import LRUCache
+
+
+def test_versions_move_on_commit_and_rollback(db: Database, user_repo, wishlist_repo, history_repo):
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+    versions = db.versions
+    assert versions.get(("user", andrey.id)) == 0
+
+    with db.transaction():
+        wishlist_repo.add(andrey.id, "Дюна")
+        wishlist_repo.add(masha.id, "Дюна")
+        # Not committed yet: readers still see the old data
+        assert versions.get(("user", andrey.id)) == 0
+    assert versions.get(("user", andrey.id)) == 1
+    assert versions.get(("group", 0)) == 1
+
+    # Removing a watched title changes the lists of everyone who had it
+    wishlist_repo.delete_from_all("дюна")
+    assert (versions.get(("user", andrey.id)), versions.get(("user", masha.id))) == (2, 2)
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            wishlist_repo.add(masha.id, "Барби")
+            raise RuntimeError
+    assert versions.get(("user", masha.id)) > 2
+    assert versions.get(("user", andrey.id)) == 2
+
+
+def test_list_rendered_once_per_version(db: Database, user_repo, wishlist_repo, wishlist_service):
+    andrey = user_repo.create(1001, "Андрей")
+    cache = RenderCache(db.versions)
+    builds = []
+
+    async def build() -> str:
+        builds.append(1)
+        return Messages.format_my_list(wishlist_service.get_user_wishlist(andrey))
+
+    def view() -> str:
+        return asyncio.run(cache.render(("my_list", andrey.id), ("user", andrey.id), build))
+
+    assert view() == Messages.EMPTY_WISHLIST
+    assert view() == Messages.EMPTY_WISHLIST
+    assert len(builds) == 1
+
+    wishlist_service.add_movie(andrey, "Дюна")
+    assert view() == "📋 Твой список:\n1. Дюна"
+    assert view() == "📋 Твой список:\n1. Дюна"
+    assert len(builds) == 2
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+
+def test_lru_cache_weight_limit():
+    cache: LRUCache[str, str] = LRUCache(10, max_weight=100, weigh=len)
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    cache.get("a")
+    cache.put("c", "x" * 40)  # over 100: evicts "b", the least recently used
+    assert ("a" in cache, "b" in cache, "c" in cache) == (True, False, True)
+    assert cache.weight == 80
+
+    cache.put("a", "x" * 10)  # replacing re-weighs
+    assert cache.weight == 50
+    cache.put("huge", "x" * 101)
+    assert "huge" not in cache and cache.weight == 50
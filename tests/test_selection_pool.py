@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Tests for the SQL selection pools."""
+
+from datetime import date
+
+
+def test_watched_only_list_does_not_veto_intersection(user_repo, wishlist_repo, history_repo, selection_service):
+    """Users whose list holds only watched titles are left out of the intersection."""
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+    petya = user_repo.create(1003, "Петя")
+    wishlist_repo.add(andrey.id, "Дюна")
+    history_repo.add("Дюна", 8, date(2026, 1, 5), andrey.id)
+    for user in (masha, petya):
+        wishlist_repo.add(user.id, "Барби")
+    wishlist_repo.add(masha.id, "Оппенгеймер")
+
+    result = selection_service.pick_movie(masha)
+    assert (result.movie, result.from_intersection) == ("Барби", True)
+
+    # Once Andrey wants an unwatched title too, he takes part again
+    wishlist_repo.add(andrey.id, "Оппенгеймер")
+    assert not selection_service.pick_movie(masha).from_intersection
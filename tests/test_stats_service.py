@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Tests for yearly statistics over the monthly rollups."""
+
+from datetime import date
+
+from src.bot.messages import Messages
+from src.database import Database
+from src.database.repositories import HistoryRepository, UserRepository
+from src.services import StatsService
+
+
+def test_yearly_stats(db: Database):
+    user = UserRepository(db).create(1001, "Андрей")
+    history = HistoryRepository(db)
+    history.add("Дюна 2", 9, date(2025, 12, 22), user_id=user.id)
+    history.add("Барби", 7, date(2026, 1, 5), user_id=user.id)
+    history.add("Оппенгеймер", 8, date(2026, 1, 12), user_id=user.id)
+    history.add("Мастер и Маргарита", 8, date(2026, 3, 1), user_id=user.id)
+    service = StatsService(history)
+
+    result = service.get_stats()
+    assert [y.year for y in result.years] == [2026, 2025]
+    this_year = result.years[0]
+    assert (this_year.count, this_year.average_rating) == (3, 7.7)
+    # Ties go to the latest movie
+    assert (this_year.best_movie, this_year.best_rating) == ("Мастер и Маргарита", 8)
+    assert (this_year.most_active_month, this_year.most_active_count) == (1, 2)
+    assert (result.total_count, result.average_rating) == (4, 8.0)
+
+    assert Messages.format_stats(service.get_stats(year=2025)) == (
+        "📊 Статистика:\n\n2025:\n"
+        "• Посмотрели: 1, средняя оценка: 9.0\n"
+        "• Лучший фильм: «Дюна 2» — 9/10\n"
+        "• Самый активный месяц: декабрь (1)"
+    )
+
+
+def test_stats_follow_inserts_and_deletes(db: Database):
+    user = UserRepository(db).create(1001, "Андрей")
+    history = HistoryRepository(db)
+    service = StatsService(history)
+    assert service.get_stats().is_empty
+
+    history.add("Дюна 2", 9, date(2025, 12, 22), user_id=user.id)
+    assert service.get_stats().total_count == 1
+    history.add("Барби", 7, date(2025, 12, 23), user_id=user.id)
+    history.add("Без оценки", None, date(2025, 12, 24), user_id=user.id)
+    result = service.get_stats()
+    assert result.total_count == 3 and result.average_rating == 8.0
+    assert result.years[0].best_movie == "Дюна 2"
+
+    db.execute("DELETE FROM watch_history WHERE movie_title = 'Дюна 2'")
+    result = service.get_stats()
+    assert result.total_count == 2 and result.years[0].best_movie == "Барби"
+
+
+def test_best_movie_query_seeks_the_rating_index(db: Database):
+    """EXPLAIN the query get_latest_with_rating runs."""
+    queries = []
+    execute = db.execute
+
+    def capture(sql, params=()):
+        queries.append((sql, params))
+        return execute(sql, params)
+
+    db.execute = capture
+    HistoryRepository(db).get_latest_with_rating(0, 9, date(2025, 1, 1), date(2026, 1, 1))
+    db.execute = execute
+
+    [(sql, params)] = queries
+    plan = db.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    details = " ".join(row["detail"] for row in plan)
+    assert "idx_history_group_rating_date" in details
+    assert "TEMP B-TREE" not in details
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Tests for update sharding and worker restarts in supervisor mode."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from aiogram import Bot
+from aiogram.types import Update
+
+import src.app
+import src.bot.supervisor
+import src.main
+from src.bot.supervisor import Supervisor, order_key, shard_for
+
+RECORDED_UPDATE = json.loads((Path(__file__).parent / "data" / "webhook_update.json").read_text("utf-8"))
+
+
+def private_message(telegram_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": telegram_id,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": telegram_id, "type": "private"},
+                "from": {"id": telegram_id, "is_bot": False, "first_name": "Маша"},
+                "text": "мой список",
+            },
+        }
+    )
+
+
+def group_callback(chat_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": 2,
+            "callback_query": {
+                "id": "1",
+                "chat_instance": "x",
+                "data": "rate:8",
+                "from": {"id": 1002, "is_bot": False, "first_name": "Маша"},
+                "message": {"message_id": 5, "date": 0, "chat": {"id": chat_id, "type": "group"}},
+            },
+        }
+    )
+
+
+def test_updates_are_sharded_by_group():
+    """A group's messages and callbacks share a worker; a private chat is its own group."""
+    group_message = Update.model_validate(RECORDED_UPDATE)
+    group_id = RECORDED_UPDATE["message"]["chat"]["id"]
+
+    assert shard_for(group_message, 4) == group_id % 4
+    assert shard_for(group_callback(group_id), 4) == shard_for(group_message, 4)
+    assert shard_for(private_message(1001), 4) == 1001 % 4
+    assert shard_for(private_message(1002), 4) == 1002 % 4
+    assert order_key(private_message(1001)) != order_key(private_message(1002))
+
+
+def test_feed_update_puts_update_on_its_worker_queue():
+    async def scenario():
+        supervisor = Supervisor(workers=3)
+        update = Update.model_validate(RECORDED_UPDATE)
+        await supervisor.feed_update(Bot(token="42:TEST"), update)
+
+        index = shard_for(update, 3)
+        data = await asyncio.to_thread(supervisor.queues[index].get, True, 5)
+        assert Update.model_validate_json(data).message.text == "хочу посмотреть Дюна"
+        assert all(q.empty() for q in supervisor.queues)
+
+    asyncio.run(scenario())
+
+
+def exit_immediately(index, updates, heartbeat, heartbeat_interval):
+    """Worker target that dies right away."""
+
+
+def test_exited_workers_are_restarted():
+    async def scenario():
+        supervisor = Supervisor(workers=1, heartbeat_timeout=0.6, target=exit_immediately)
+        supervisor.start()
+        for _ in range(100):
+            await asyncio.sleep(0.1)
+            if supervisor.restarts >= 2:
+                break
+        await supervisor.stop(timeout=1)
+        assert supervisor.restarts >= 2
+
+    asyncio.run(scenario())
+
+
+def test_stop_does_not_block_on_a_full_queue():
+    """A worker that never drains its queue is killed after the timeout."""
+
+    async def scenario():
+        supervisor = Supervisor(workers=1, queue_size=1)
+        await supervisor.feed_update(Bot(token="42:TEST"), private_message(1001))
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        await supervisor.stop(timeout=0.5)
+        ticker.cancel()
+        assert ticks >= 5
+
+    asyncio.run(scenario())
+
+
+def test_entry_points_build_the_same_database_worker(monkeypatch, tmp_path):
+    """main() and supervisor workers share DB_COMMIT_DELAY_MS and the SQLite settings."""
+    monkeypatch.setattr(src.app, "DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(src.main, "DB_PATH", str(tmp_path / "bot.db"))
+    monkeypatch.setattr(src.app, "DB_COMMIT_DELAY_MS", 5)
+    monkeypatch.setattr(src.main, "BOT_TOKEN", "42:TEST")
+    monkeypatch.setattr(src.main, "BOT_MODE", "polling")
+    monkeypatch.setattr(src.main, "WORKER_PROCESSES", 1)
+    built = []
+
+    class Built(Exception):
+        pass
+
+    def record(**kwargs):
+        built.append(src.app.create_db_worker(**kwargs))
+        raise Built
+
+    monkeypatch.setattr(src.main, "create_db_worker", record)
+    monkeypatch.setattr(src.bot.supervisor, "create_db_worker", record)
+    for entry_point in (src.main.main(), src.bot.supervisor._run_worker(0, None, None, 1.0)):
+        with pytest.raises(Built):
+            asyncio.run(entry_point)
+
+    main_worker, process_worker = built
+    assert main_worker.commit_delay == process_worker.commit_delay == 0.005
+    assert main_worker.db.settings == process_worker.db.settings
+    for worker in built:
+        asyncio.run(worker.close())
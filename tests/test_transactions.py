@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Tests for atomic service calls and their commits."""
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.database import AsyncService, Database, DatabaseSettings
+from src.database.repositories import HistoryRepository, UserRepository, WishlistRepository
+from src.services import UserService, WatchService, WishlistService
+
+
+def committed_titles(db_path: Path) -> list[str]:
+    """Read wishlist titles through a separate connection."""
+    connection = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in connection.execute("SELECT movie_title FROM wishlist ORDER BY id")]
+    finally:
+        connection.close()
+
+
+def test_mark_watched_is_atomic(db: Database):
+    """A failure while cleaning wishlists also undoes the history entry."""
+    wishlist_repo = WishlistRepository(db)
+    history_repo = HistoryRepository(db)
+    user = UserService(UserRepository(db)).register(1001, "Андрей").user
+    WishlistService(wishlist_repo).add_movie(user, "Дюна")
+
+    def broken_delete(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    wishlist_repo.delete_from_all = broken_delete
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            WatchService(wishlist_repo, history_repo).mark_watched(user, "Дюна", 8)
+
+    assert history_repo.is_empty()
+    assert WishlistRepository(db).get_all_movies() == ["Дюна"]
+
+
+def test_each_write_is_committed_before_it_returns(database_worker):
+    """No transaction stays open between service calls of one update."""
+
+    async def scenario():
+        async with database_worker(DatabaseSettings(journal_mode="WAL", read_pool_size=2)) as worker:
+            users = AsyncService(UserService(UserRepository(worker.db)), worker)
+            wishlist = AsyncService(WishlistService(WishlistRepository(worker.db)), worker)
+
+            user = (await users.register(1001, "Андрей")).user
+            await wishlist.add_movie(user, "Дюна")
+            assert committed_titles(worker.db.db_path) == ["Дюна"]
+            assert not await worker.run(lambda: worker.db.connect().in_transaction)
+
+    asyncio.run(scenario())
+
+
+def test_group_commit_coalesces_concurrent_writes(database_worker):
+    """Writes ending within the commit delay share one commit."""
+
+    async def scenario():
+        async with database_worker(commit_delay=0.02) as worker:
+            db = worker.db
+            users = AsyncService(UserService(UserRepository(db)), worker)
+
+            commits = 0
+            real_commit = db.commit
+
+            def counting_commit():
+                nonlocal commits
+                if db.connect().in_transaction and db._tx_depth == 0:
+                    commits += 1
+                real_commit()
+
+            db.commit = counting_commit
+
+            await asyncio.gather(*(users.register(1000 + i, f"User {i}") for i in range(10)))
+            assert commits == 1
+            # Every caller resumed only after the shared commit
+            assert not await worker.run(lambda: db.connect().in_transaction)
+            assert len(await users.get_all_users()) == 10
+
+    asyncio.run(scenario())
+
+
+def test_failed_write_in_a_group_rolls_back_alone(database_worker):
+    """A failing call undoes only its own writes, the others are committed."""
+
+    async def scenario():
+        async with database_worker(commit_delay=0.02) as worker:
+            db = worker.db
+            users = AsyncService(UserService(UserRepository(db)), worker)
+
+            def broken_register():
+                UserRepository(db).create(2002, "Мария")
+                raise RuntimeError("disk full")
+
+            results = await asyncio.gather(
+                users.register(1001, "Андрей"),
+                worker.run_write(broken_register),
+                return_exceptions=True,
+            )
+            assert isinstance(results[1], RuntimeError)
+            assert [user.telegram_id for user in await users.get_all_users()] == [1001]
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Tests for the webhook server."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.bot.webhook import SECRET_HEADER, WebhookServer
+
+RECORDED_UPDATE = json.loads((Path(__file__).parent / "data" / "webhook_update.json").read_text("utf-8"))
+
+
+def test_webhook_feeds_recorded_update_to_dispatcher():
+    """Valid requests reach handlers; bad secret or payload is rejected."""
+
+    async def scenario():
+        received = []
+        dp = Dispatcher()
+
+        @dp.message()
+        async def record(message: Message):
+            received.append(message.text)
+
+        server = WebhookServer(dp, Bot(token="42:TEST"), secret_token="s3cret", workers=2)
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.post("/webhook", json=RECORDED_UPDATE)
+            assert response.status == 401
+
+            response = await client.post(
+                "/webhook", data="not json", headers={SECRET_HEADER: "s3cret"}
+            )
+            assert response.status == 400
+
+            response = await client.post(
+                "/webhook", json=RECORDED_UPDATE, headers={SECRET_HEADER: "s3cret"}
+            )
+            assert response.status == 200
+            await server.queue.join()
+            assert received == ["хочу посмотреть Дюна"]
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_updates():
+    """Updates beyond the queue capacity get 503 so Telegram retries them."""
+
+    async def scenario():
+        server = WebhookServer(Dispatcher(), Bot(token="42:TEST"), secret_token="s3cret", queue_size=1)
+        # Without startup no consumer drains the queue
+        app = server.create_app()
+        app.on_startup.clear()
+        app.on_shutdown.clear()
+        async with TestClient(TestServer(app)) as client:
+            headers = {SECRET_HEADER: "s3cret"}
+            first = await client.post("/webhook", json=RECORDED_UPDATE, headers=headers)
+            second = await client.post("/webhook", json=RECORDED_UPDATE, headers=headers)
+            assert (first.status, second.status) == (200, 503)
+            health = await (await client.get("/healthz")).json()
+            assert health == {"queued": 1, "capacity": 1}
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for the write-through wishlist title index."""
+
+from src.database import Database
+from src.database.repositories import WishlistRepository
+
+
+def test_index_follows_writes(db: Database, user_repo, wishlist_repo: WishlistRepository):
+    """Canonical titles and refcounts stay in sync with add/delete."""
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+
+    assert wishlist_repo.get_canonical_title("дюна") is None
+    wishlist_repo.add(andrey.id, "Дюна")
+    wishlist_repo.add(masha.id, "Дюна")
+    wishlist_repo.add(masha.id, "Барби")
+
+    assert wishlist_repo.get_canonical_title("ДЮНА") == "Дюна"
+    assert wishlist_repo.has_title(andrey.id, "дюна")
+    assert not wishlist_repo.has_title(andrey.id, "барби")
+
+    wishlist_repo.delete(andrey.id, "дюна")
+    assert wishlist_repo.get_canonical_title("дюна") == "Дюна"  # still in Masha's list
+
+    wishlist_repo.delete_from_all("Дюна")
+    assert wishlist_repo.get_canonical_title("дюна") is None
+    assert not wishlist_repo.has_title(masha.id, "дюна")
+
+    # A fresh repository rebuilds the same index from the table
+    reloaded = WishlistRepository(db)
+    assert reloaded.get_canonical_title("барби") == "Барби"
+    assert reloaded.get_canonical_title("дюна") is None
+
+
+def test_title_variants_are_one_movie(user_repo, wishlist_service, watch_service, history_repo):
+    """Case, "ё", Unicode forms and extra spaces do not make a new title."""
+    andrey = user_repo.create(1001, "Андрей")
+    masha = user_repo.create(1002, "Маша")
+
+    assert wishlist_service.add_movie(andrey, "Ёлки  2").movie_title == "Ёлки 2"
+    result = wishlist_service.add_movie(andrey, "ЕЛКИ 2")
+    assert result.already_exists and result.movie_title == "Ёлки 2"
+    assert wishlist_service.add_movie(masha, "елки 2").movie_title == "Ёлки 2"
+    assert wishlist_service.get_intersection() == ["Ёлки 2"]
+
+    assert watch_service.mark_watched(masha, "ＥＬＫＩ", 7).movie_title == "ＥＬＫＩ"  # NFKC: "elki"
+    assert history_repo.find_by_title("elki").movie_title == "ＥＬＫＩ"
+    assert watch_service.mark_watched(masha, " елки 2 ", 8).in_wishlist
+    assert wishlist_service.get_all_movies() == []
+    assert [item.movie_title for item in history_repo.search("ёлки")] == ["Ёлки 2"]